@@ -0,0 +1,392 @@
+"""
+Load-test harness for the forecast API.
+
+Boots the app under uvicorn (against the in-process DB stand-in by default, or
+a local Postgres seeded with synthetic data), drives a weighted mix of
+`/data-range`, `/predict-tuning-db` and `/predict-tuning` requests at a fixed
+concurrency, and reports throughput, latency percentiles, error rates and the
+CPU/RSS of every server process:
+
+    python -m benchmarks.load_test --workers 2 --concurrency 8 --duration 60
+    python -m benchmarks.load_test --db postgres --seed-rows 20000
+    python -m benchmarks.load_test --target http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import (
+    DEFAULT_START,
+    frame_to_csv_bytes,
+    make_hourly_frame,
+)
+
+DEFAULT_MIX = "data-range=0.7,predict-tuning-db=0.2,predict-tuning=0.1"
+ENDPOINTS = ("data-range", "predict-tuning-db", "predict-tuning")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parses 'data-range=0.7,predict-tuning=0.3' into normalized weights."""
+    weights = {}
+    for item in value.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint in mix: {name}")
+        weights[name] = float(weight or 1.0)
+    total = sum(weights.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("Mix weights must sum to a positive value")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def summarize_latencies(
+    latencies_s: List[float], errors: int, elapsed_s: float
+) -> Dict[str, Any]:
+    count = len(latencies_s)
+    summary = {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput_rps": round(count / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+    }
+    if count:
+        values_ms = np.asarray(latencies_s) * 1000.0
+        for pct in PERCENTILES:
+            summary[f"p{pct}_ms"] = round(float(np.percentile(values_ms, pct)), 3)
+        summary["max_ms"] = round(float(values_ms.max()), 3)
+        summary["mean_ms"] = round(float(values_ms.mean()), 3)
+    return summary
+
+
+class ProcessMonitor:
+    """
+    Samples CPU time and RSS of a server process and its children (uvicorn
+    workers) from /proc, reporting per-process CPU utilisation and peak RSS.
+    """
+
+    def __init__(self, root_pid: int, interval_s: float = 0.5):
+        self.root_pid = root_pid
+        self.interval_s = interval_s
+        self._clock_ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+        self._samples: Dict[int, List[tuple]] = defaultdict(list)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _children(self) -> List[int]:
+        children = []
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            if int(fields[1]) == self.root_pid:
+                children.append(int(entry))
+        return children
+
+    def _sample(self, pid: int) -> Optional[tuple]:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{pid}/statm") as f:
+                rss_pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        cpu_s = (int(fields[11]) + int(fields[12])) / self._clock_ticks
+        return time.monotonic(), cpu_s, rss_pages * self._page_size
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_s):
+            for pid in [self.root_pid] + self._children():
+                sample = self._sample(pid)
+                if sample is not None:
+                    self._samples[pid].append(sample)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def report(self) -> List[Dict[str, Any]]:
+        processes = []
+        for pid, samples in sorted(self._samples.items()):
+            if len(samples) < 2:
+                continue
+            (t0, cpu0, _), (t1, cpu1, rss_last) = samples[0], samples[-1]
+            processes.append(
+                {
+                    "pid": pid,
+                    "role": "master" if pid == self.root_pid else "worker",
+                    "cpu_pct": round(100.0 * (cpu1 - cpu0) / max(t1 - t0, 1e-9), 2),
+                    "rss_peak_mb": round(max(s[2] for s in samples) / 1024**2, 2),
+                    "rss_last_mb": round(rss_last / 1024**2, 2),
+                }
+            )
+        return processes
+
+
+def seed_postgres(n_rows: int):
+    """
+    Creates the feature table (a hypertable when TimescaleDB is available)
+    and fills it.
+    """
+    import psycopg2
+
+    from src.data.data_loader import get_db_connection_params
+
+    host, database, user, password, schema_name, table_name, time_column = (
+        get_db_connection_params()
+    )
+    data = make_hourly_frame(n_rows)
+    connection = psycopg2.connect(
+        user=user, password=password, host=host, port="5432", database=database
+    )
+    try:
+        with connection, connection.cursor() as cursor:
+            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema_name}";')
+            cursor.execute(f'DROP TABLE IF EXISTS "{schema_name}"."{table_name}";')
+            cursor.execute(
+                f'CREATE TABLE "{schema_name}"."{table_name}" ('
+                f'"{time_column}" TIMESTAMPTZ NOT NULL, users DOUBLE PRECISION, '
+                "holiday DOUBLE PRECISION, weather TEXT, temp DOUBLE PRECISION, "
+                "atemp DOUBLE PRECISION, hum DOUBLE PRECISION, "
+                "windspeed DOUBLE PRECISION);"
+            )
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb';")
+            if cursor.fetchone():
+                cursor.execute(
+                    "SELECT create_hypertable(%s, %s);",
+                    (f"{schema_name}.{table_name}", time_column),
+                )
+            csv_body = data.to_csv(header=False, date_format="%Y-%m-%d %H:%M:%S%z")
+            cursor.copy_expert(
+                f'COPY "{schema_name}"."{table_name}" FROM STDIN WITH (FORMAT csv)',
+                io.StringIO(csv_body),
+            )
+    finally:
+        connection.close()
+    return data.index.min(), data.index.max()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def boot_server(db: str, workers: int, port: int, seed_rows: int) -> subprocess.Popen:
+    app_path = "benchmarks.standin_app:app" if db == "standin" else "src.api.main:app"
+    env = dict(os.environ, LOADTEST_ROWS=str(seed_rows))
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        app_path,
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+    ]
+    return subprocess.Popen(command, env=env)
+
+
+def wait_until_ready(base_url: str, timeout_s: float = 120.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/", timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not become ready in {timeout_s}s")
+
+
+class TrafficDriver:
+    def __init__(
+        self,
+        base_url: str,
+        mix: Dict[str, float],
+        data_start: pd.Timestamp,
+        data_stop: pd.Timestamp,
+        forecast_hours: int,
+        window_sizes: int,
+        upload_rows: int,
+        seed: int = 2025,
+    ):
+        self.base_url = base_url
+        self.mix = mix
+        self.forecast_hours = forecast_hours
+        self.window_sizes = window_sizes
+        self.db_params = {
+            "forecast_hours": forecast_hours,
+            "window_sizes": window_sizes,
+            "start_time": data_start.strftime("%Y-%m-%d %H:%M:%S%z"),
+            "stop_time": data_stop.strftime("%Y-%m-%d %H:%M:%S%z"),
+        }
+        self.upload_content = frame_to_csv_bytes(make_hourly_frame(upload_rows))
+        self.random = random.Random(seed)
+        self.results: Dict[str, List[tuple]] = defaultdict(list)
+
+    async def _request(self, client: httpx.AsyncClient, endpoint: str):
+        if endpoint == "data-range":
+            return await client.get("/data-range")
+        if endpoint == "predict-tuning-db":
+            return await client.post("/predict-tuning-db", params=self.db_params)
+        return await client.post(
+            "/predict-tuning",
+            params={
+                "forecast_hours": self.forecast_hours,
+                "window_sizes": self.window_sizes,
+            },
+            files={"file": ("synthetic.csv", self.upload_content, "text/csv")},
+        )
+
+    async def _worker(self, client, deadline: float, remaining: List[int]):
+        names, weights = zip(*self.mix.items())
+        while time.monotonic() < deadline:
+            if remaining[0] is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            endpoint = self.random.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await self._request(client, endpoint)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            self.results[endpoint].append((time.perf_counter() - start, ok))
+
+    async def run(
+        self, concurrency: int, duration_s: float, total_requests: Optional[int]
+    ) -> float:
+        deadline = time.monotonic() + duration_s
+        remaining = [total_requests]
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(
+            base_url=self.base_url, timeout=None, limits=limits
+        ) as client:
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(self._worker(client, deadline, remaining) for _ in range(concurrency))
+            )
+            return time.perf_counter() - start
+
+    def report(self, elapsed_s: float) -> Dict[str, Any]:
+        endpoints = {}
+        all_latencies, all_errors = [], 0
+        for endpoint, samples in sorted(self.results.items()):
+            latencies = [latency for latency, _ in samples]
+            errors = sum(1 for _, ok in samples if not ok)
+            endpoints[endpoint] = summarize_latencies(latencies, errors, elapsed_s)
+            all_latencies.extend(latencies)
+            all_errors += errors
+        return {
+            "elapsed_s": round(elapsed_s, 3),
+            "overall": summarize_latencies(all_latencies, all_errors, elapsed_s),
+            "endpoints": endpoints,
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the forecast API.")
+    parser.add_argument("--target", help="Use an already running server at this URL")
+    parser.add_argument("--db", choices=["standin", "postgres"], default="standin")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed-rows", type=int, default=5000)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--forecast-hours", type=int, default=24)
+    parser.add_argument("--window-sizes", type=int, default=24)
+    parser.add_argument("--upload-rows", type=int, default=2000)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    data_start = pd.Timestamp(DEFAULT_START)
+    data_stop = data_start + pd.Timedelta(hours=args.seed_rows - 1)
+    if args.db == "postgres" and not args.target:
+        data_start, data_stop = seed_postgres(args.seed_rows)
+
+    server, monitor = None, None
+    base_url = args.target
+    if base_url is None:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = boot_server(args.db, args.workers, port, args.seed_rows)
+    try:
+        wait_until_ready(base_url)
+        if server is not None:
+            monitor = ProcessMonitor(server.pid)
+            monitor.start()
+
+        driver = TrafficDriver(
+            base_url,
+            args.mix,
+            data_start,
+            data_stop,
+            args.forecast_hours,
+            args.window_sizes,
+            args.upload_rows,
+        )
+        elapsed = asyncio.run(
+            driver.run(args.concurrency, args.duration, args.requests)
+        )
+        report = driver.report(elapsed)
+        report["config"] = {
+            "db": args.db,
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "mix": args.mix,
+            "seed_rows": args.seed_rows,
+        }
+    finally:
+        if monitor is not None:
+            monitor.stop()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report["processes"] = monitor.report() if monitor is not None else []
+    serialized = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(serialized)
+    else:
+        print(serialized)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+"""
+Offline benchmark for the end-to-end forecast pipeline.
+
+Times every stage (and its peak RSS growth) on synthetic hourly datasets of
+increasing size and writes a JSON report that can be compared across commits:
+
+    python -m benchmarks.pipeline_benchmark --preset quick --output bench.json
+    python -m benchmarks.pipeline_benchmark --preset quick --baseline bench.json
+
+With --baseline, the run exits with status 1 when any stage is slower than the
+baseline by more than --threshold (relative, default 0.2).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import frame_to_csv_bytes, make_hourly_frame, make_upload_file
+
+PRESETS = {
+    "quick": [(1_000, 1), (10_000, 1), (10_000, 10)],
+    "standard": [(1_000, 1), (10_000, 1), (100_000, 1), (100_000, 100)],
+    "full": [
+        (1_000, 1),
+        (10_000, 1),
+        (100_000, 1),
+        (100_000, 100),
+        (1_000_000, 1),
+        (1_000_000, 500),
+    ],
+}
+STAGES = [
+    "load_data_from_csv",
+    "prepare_time_series_data",
+    "tuning",
+    "training",
+    "predict_future",
+    "combine_forecast_with_truth",
+    "serialization",
+]
+DEFAULT_PARAMS = {
+    "n_estimators": 300,
+    "max_depth": 6,
+    "min_child_samples": 50,
+    "learning_rate": 0.1,
+    "feature_fraction": 0.8,
+    "num_leaves": 31,
+    "reg_alpha": 0.0,
+    "reg_lambda": 0.0,
+    "max_bin": 255,
+    "random_state": 2025,
+    "verbose": -1,
+}
+DEFAULT_LAGS = [1, 2, 3, 23, 24, 25, 167, 168, 169]
+# Stages faster than this are too noisy to flag as regressions
+MIN_COMPARABLE_SECONDS = 0.01
+
+
+class PeakRSSMonitor:
+    """Polls /proc/self/statm to record the peak RSS reached while active."""
+
+    def __init__(self, interval_s: float = 0.005):
+        self.interval_s = interval_s
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.start_bytes = None
+        self.peak_bytes = None
+
+    def _rss_bytes(self) -> Optional[int]:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * self._page_size
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_s):
+            rss = self._rss_bytes()
+            if rss is not None and rss > self.peak_bytes:
+                self.peak_bytes = rss
+
+    def __enter__(self):
+        self.start_bytes = self._rss_bytes()
+        self.peak_bytes = self.start_bytes
+        if self.start_bytes is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            rss = self._rss_bytes()
+            if rss is not None and rss > self.peak_bytes:
+                self.peak_bytes = rss
+
+    @property
+    def peak_delta_mb(self) -> Optional[float]:
+        if self.start_bytes is None:
+            return None
+        return round((self.peak_bytes - self.start_bytes) / 1024**2, 3)
+
+
+def measure(func: Callable, *args, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """Runs `func` once, returning its result plus wall time and peak RSS growth."""
+    with PeakRSSMonitor() as monitor:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+    return result, {"seconds": round(seconds, 6), "peak_rss_mb": monitor.peak_delta_mb}
+
+
+def _accumulate(stages: Dict[str, Dict[str, Any]], name: str, stats: Dict[str, Any]):
+    current = stages.setdefault(name, {"seconds": 0.0, "peak_rss_mb": None})
+    current["seconds"] = round(current["seconds"] + stats["seconds"], 6)
+    if stats["peak_rss_mb"] is not None:
+        current["peak_rss_mb"] = max(
+            current["peak_rss_mb"] or 0.0, stats["peak_rss_mb"]
+        )
+
+
+def run_case(
+    n_rows: int,
+    n_series: int,
+    forecast_hours: int = 36,
+    window_sizes: int = 72,
+    n_trials: int = 2,
+    max_tune_rows: int = 20_000,
+) -> Dict[str, Any]:
+    """
+    Runs the pipeline stages on one synthetic dataset. Series are processed
+    one after another, as the service does today; stage times are summed
+    across series and peak RSS growth is the maximum over series.
+    """
+    from src.data.data_loader import create_encoder, load_data_from_csv
+    from src.data.postprocessing import combine_forecast_with_truth
+    from src.data.preprocessing import prepare_time_series_data
+    from src.data.validation import get_validation_cutoff
+    from src.model.forecast_model import (
+        run_bayesian_hyperparameter_search_and_fit,
+        train_forecaster_with_best_params,
+    )
+    from src.model.predict_utils import predict_future
+    from src.model.rolling import IncrementalRollingFeatures
+
+    content = frame_to_csv_bytes(make_hourly_frame(n_rows, n_series))
+    stages: Dict[str, Dict[str, Any]] = {}
+
+    loaded, stats = measure(load_data_from_csv, make_upload_file(content))
+    _accumulate(stages, "load_data_from_csv", stats)
+
+    if n_series > 1:
+        series_frames = [
+            frame.drop(columns=["series_id"])
+            for _, frame in loaded.groupby("series_id")
+        ]
+    else:
+        series_frames = [loaded]
+
+    for raw in series_frames:
+        data, stats = measure(prepare_time_series_data, raw)
+        _accumulate(stages, "prepare_time_series_data", stats)
+
+        exog_features = [col for col in data.columns if col != "users"]
+        end_validation_dt = get_validation_cutoff(data, forecast_hours)
+        end_validation = end_validation_dt.strftime("%Y-%m-%d %H:%M:%S%z")
+        window_features = IncrementalRollingFeatures(
+            stats=["mean"], window_sizes=window_sizes
+        )
+        encoder = create_encoder()
+
+        if len(data) <= max_tune_rows:
+            result, stats = measure(
+                run_bayesian_hyperparameter_search_and_fit,
+                data=data,
+                end_validation=end_validation,
+                exog_features=exog_features,
+                window_features=window_features,
+                transformer_exog=encoder,
+                n_trials=n_trials,
+                steps=forecast_hours,
+                initial_train_size=round(len(data) * 0.9),
+                random_state=2025,
+            )
+            _accumulate(stages, "tuning", stats)
+            best_params, best_lags = result["best_params"], result["best_lags"]
+        else:
+            stages.setdefault("tuning", {"seconds": 0.0, "peak_rss_mb": None})
+            stages["tuning"]["skipped"] = True
+            best_params, best_lags = DEFAULT_PARAMS, DEFAULT_LAGS
+
+        model, stats = measure(
+            train_forecaster_with_best_params,
+            data=data,
+            end_validation=end_validation,
+            exog_features=exog_features,
+            window_features=window_features,
+            transformer_exog=encoder,
+            best_params=best_params,
+            best_lags=best_lags,
+        )
+        _accumulate(stages, "training", stats)
+
+        (predictions, exog_pred, _), stats = measure(
+            predict_future,
+            model,
+            data,
+            exog_features,
+            end_validation_dt,
+            forecast_hours,
+        )
+        _accumulate(stages, "predict_future", stats)
+
+        forecast_df, stats = measure(
+            combine_forecast_with_truth, predictions, exog_pred, data
+        )
+        _accumulate(stages, "combine_forecast_with_truth", stats)
+
+        forecast_df.index = forecast_df.index.strftime("%Y-%m-%d %H:%M:%S")
+        _, stats = measure(
+            lambda df: json.dumps(df.to_dict(orient="index"), default=str), forecast_df
+        )
+        _accumulate(stages, "serialization", stats)
+
+    return {
+        "case": f"{n_rows}x{n_series}",
+        "rows": n_rows,
+        "series": n_series,
+        "stages": stages,
+        "total_seconds": round(sum(s["seconds"] for s in stages.values()), 6),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "cases": cases,
+    }
+
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.2,
+    min_seconds: float = MIN_COMPARABLE_SECONDS,
+) -> List[Dict[str, Any]]:
+    """
+    Returns the stages of `current` that are slower than the same case/stage in
+    `baseline` by more than `threshold` (relative). Cases or stages missing from
+    either report, skipped stages and stages faster than `min_seconds` in the
+    baseline are not compared.
+    """
+    baseline_cases = {case["case"]: case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in current.get("cases", []):
+        reference = baseline_cases.get(case["case"])
+        if reference is None:
+            continue
+        for stage, stats in case["stages"].items():
+            old = reference["stages"].get(stage)
+            if old is None or old.get("skipped") or stats.get("skipped"):
+                continue
+            if old["seconds"] < min_seconds:
+                continue
+            change = stats["seconds"] / old["seconds"] - 1.0
+            if change > threshold:
+                regressions.append(
+                    {
+                        "case": case["case"],
+                        "stage": stage,
+                        "baseline_seconds": old["seconds"],
+                        "current_seconds": stats["seconds"],
+                        "change": round(change, 4),
+                    }
+                )
+    return regressions
+
+
+def parse_cases(value: str) -> List[Tuple[int, int]]:
+    """Parses '1000x1,10000x10' into [(1000, 1), (10000, 10)]."""
+    cases = []
+    for item in value.split(","):
+        rows, _, series = item.strip().partition("x")
+        cases.append((int(rows), int(series or 1)))
+    return cases
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--cases", type=parse_cases, help="e.g. 1000x1,100000x100")
+    parser.add_argument("--forecast-hours", type=int, default=36)
+    parser.add_argument("--window-sizes", type=int, default=72)
+    parser.add_argument("--n-trials", type=int, default=2)
+    parser.add_argument(
+        "--max-tune-rows",
+        type=int,
+        default=20_000,
+        help="Skip tuning (use fixed params) for series longer than this",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--baseline", help="Compare against a previous JSON report")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    cases = []
+    for n_rows, n_series in args.cases or PRESETS[args.preset]:
+        print(f"Running case {n_rows} rows x {n_series} series...", file=sys.stderr)
+        cases.append(
+            run_case(
+                n_rows,
+                n_series,
+                forecast_hours=args.forecast_hours,
+                window_sizes=args.window_sizes,
+                n_trials=args.n_trials,
+                max_tune_rows=args.max_tune_rows,
+            )
+        )
+    report = build_report(cases)
+
+    serialized = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(serialized)
+    else:
+        print(serialized)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, args.threshold)
+        for item in regressions:
+            print(
+                f"REGRESSION {item['case']} {item['stage']}: "
+                f"{item['baseline_seconds']:.4f}s -> {item['current_seconds']:.4f}s "
+                f"(+{item['change']:.0%})",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
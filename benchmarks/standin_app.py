@@ -0,0 +1,83 @@
+"""
+`src.api.main:app` wired to an in-process stand-in for TimescaleDB.
+
+The DB access functions of `src.data.data_loader` (and of the parallel
+loader it switches to for long windows) are replaced by versions that
+serve a synthetic hourly frame from memory, so the full request path
+(validation, tuning, training, prediction) runs without a database:
+
+    uvicorn benchmarks.standin_app:app --workers 4
+
+LOADTEST_ROWS sets the size of the seeded frame and LOADTEST_DB_LATENCY_MS
+adds a fixed delay per query to mimic network round trips.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_hourly_frame
+from src.api.main import app  # noqa: F401  (re-exported for uvicorn)
+from src.data import data_loader, parallel_loader
+
+LOADTEST_ROWS = int(os.getenv("LOADTEST_ROWS", "5000"))
+LOADTEST_DB_LATENCY_MS = float(os.getenv("LOADTEST_DB_LATENCY_MS", "0"))
+
+STANDIN_DATA = make_hourly_frame(LOADTEST_ROWS)
+
+
+def _simulate_latency():
+    if LOADTEST_DB_LATENCY_MS > 0:
+        time.sleep(LOADTEST_DB_LATENCY_MS / 1000.0)
+
+
+def standin_get_min_max_time_from_db():
+    _simulate_latency()
+    return STANDIN_DATA.index.min(), STANDIN_DATA.index.max()
+
+
+def standin_get_data_as_dataframe_filtered(
+    host,
+    database,
+    user,
+    password,
+    schema_name,
+    table_name,
+    time_column="date_time",
+    columns_to_select="*",
+    start_time=None,
+    stop_time=None,
+    **kwargs,
+):
+    _simulate_latency()
+    data = STANDIN_DATA
+    if start_time:
+        data = data.loc[pd.to_datetime(start_time, utc=True) :]
+    if stop_time:
+        data = data.loc[: pd.to_datetime(stop_time, utc=True)]
+    data = data.copy()
+    data.index.name = time_column
+    return data
+
+
+def _rebind(module, name, replacement):
+    """Replaces `name` in every loaded src module that holds the original object."""
+    original = getattr(module, name)
+    for module_name, loaded in list(sys.modules.items()):
+        if module_name.startswith("src") and getattr(loaded, name, None) is original:
+            setattr(loaded, name, replacement)
+
+
+_rebind(data_loader, "get_min_max_time_from_db", standin_get_min_max_time_from_db)
+# The stand-in rows are hourly already, so every range loader serves them as is
+for loader in ("get_data_as_dataframe_filtered", "get_hourly_data_from_db"):
+    _rebind(data_loader, loader, standin_get_data_as_dataframe_filtered)
+_rebind(
+    parallel_loader,
+    "get_data_as_dataframe_parallel",
+    standin_get_data_as_dataframe_filtered,
+)
@@ -0,0 +1,81 @@
+"""
+Synthetic hourly bike-sharing data shaped like `application.feature`, used by
+the offline benchmarks and the load-test harness.
+"""
+
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from fastapi import UploadFile
+
+WEATHER_CATEGORIES = ["clear", "mist", "rain"]
+DEFAULT_START = "2011-01-01 00:00:00+00:00"
+
+
+def make_hourly_frame(
+    n_rows: int,
+    n_series: int = 1,
+    start: str = DEFAULT_START,
+    seed: int = 2025,
+) -> pd.DataFrame:
+    """
+    Builds `n_rows` hourly observations split evenly across `n_series` series.
+
+    Each series has daily and weekly seasonality, weather-dependent demand and
+    the same columns as the production table. A `series_id` column is added
+    when more than one series is requested.
+    """
+    rng = np.random.default_rng(seed)
+    rows_per_series = max(n_rows // n_series, 1)
+    index = pd.date_range(start=start, periods=rows_per_series, freq="h")
+    hours = np.arange(rows_per_series)
+
+    frames = []
+    for series_id in range(n_series):
+        scale = rng.uniform(50, 300)
+        phase = rng.uniform(0, 2 * np.pi)
+        daily = np.sin(2 * np.pi * hours / 24 + phase)
+        weekly = np.sin(2 * np.pi * hours / 168)
+        temp = (
+            15
+            + 10 * np.sin(2 * np.pi * hours / (24 * 365))
+            + rng.normal(0, 2, rows_per_series)
+        )
+        weather = rng.choice(
+            WEATHER_CATEGORIES, size=rows_per_series, p=[0.63, 0.29, 0.08]
+        )
+        weather_factor = np.select(
+            [weather == "clear", weather == "mist"], [1.0, 0.8], default=0.4
+        )
+        holiday = ((hours // 24) % 30 == 0).astype(float)
+        users = scale * (1.2 + daily + 0.3 * weekly) * weather_factor
+        users = np.maximum(users + rng.normal(0, scale * 0.1, rows_per_series), 0)
+
+        frame = pd.DataFrame(
+            {
+                "users": np.round(users),
+                "holiday": holiday,
+                "weather": weather,
+                "temp": temp.round(2),
+                "atemp": (temp + rng.normal(3, 1, rows_per_series)).round(3),
+                "hum": rng.integers(20, 100, rows_per_series).astype(float),
+                "windspeed": rng.uniform(0, 30, rows_per_series).round(4),
+            },
+            index=index,
+        )
+        frame.index.name = "date_time"
+        if n_series > 1:
+            frame.insert(0, "series_id", series_id)
+        frames.append(frame)
+
+    return pd.concat(frames) if n_series > 1 else frames[0]
+
+
+def frame_to_csv_bytes(data: pd.DataFrame) -> bytes:
+    """Serializes a frame the way users upload it to /predict-tuning."""
+    return data.to_csv(date_format="%Y-%m-%d %H:%M:%S%z").encode("utf-8")
+
+
+def make_upload_file(content: bytes, filename: str = "synthetic.csv") -> UploadFile:
+    return UploadFile(file=BytesIO(content), filename=filename)
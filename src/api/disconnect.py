@@ -0,0 +1,64 @@
+import asyncio
+import math
+
+import anyio
+
+from src.data.connections import QueryScope, active_queries
+
+
+class CancelQueriesOnDisconnect:
+    """
+    ASGI middleware that cancels the database queries of a request whose
+    client disconnects before the response is complete.
+
+    Each request gets a QueryScope in `active_queries`; connections opened
+    while handling it (also from the threadpool, which copies the context)
+    register their cancel callbacks there. A watcher task reads the client
+    messages ahead of the application so it sees `http.disconnect` even while
+    a sync endpoint is blocked on a query.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = QueryScope()
+        response_complete = False
+        to_app, from_client = anyio.create_memory_object_stream(math.inf)
+
+        async def watch():
+            async with to_app:
+                while True:
+                    message = await receive()
+                    if message["type"] == "http.disconnect":
+                        if not response_complete:
+                            queries.cancel()
+                        await to_app.send(message)
+                        return
+                    await to_app.send(message)
+
+        async def receive_from_watcher():
+            try:
+                return await from_client.receive()
+            except anyio.EndOfStream:
+                return {"type": "http.disconnect"}
+
+        async def send_and_track(message):
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                response_complete = True
+            await send(message)
+
+        token = active_queries.set(queries)
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await self.app(scope, receive_from_watcher, send_and_track)
+        finally:
+            watcher.cancel()
+            active_queries.reset(token)
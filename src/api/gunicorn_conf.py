@@ -0,0 +1,38 @@
+"""
+Gunicorn settings for multi-worker serving:
+
+    gunicorn -c src/api/gunicorn_conf.py src.api.main:app
+
+The app (ML stack and every model in MODEL_DIR) is imported once in the
+master and workers are forked from it, so fitted models are shared
+copy-on-write instead of being loaded once per worker. `kill -HUP <master>`
+reloads the models in the master and gracefully replaces the workers.
+"""
+
+import gc
+import os
+
+os.environ.setdefault("PRELOAD_MODELS", "True")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Tuning requests can run for minutes
+timeout = int(os.getenv("WORKER_TIMEOUT", "600"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "60"))
+keepalive = 5
+
+
+def on_reload(server):
+    from src.model.registry import registry
+
+    names = registry.reload()
+    server.log.info(f"Reloaded {len(names)} model(s) before replacing workers")
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach: the GC would
+    # otherwise write to those objects' headers in each worker and un-share
+    # the pages
+    gc.freeze()
@@ -1,21 +1,53 @@
 import os
 import sys
 import time
+from contextlib import asynccontextmanager
 from functools import wraps
-
-from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from typing import List, Literal, Optional
+
+import pandas as pd
+from fastapi import (
+    FastAPI,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
 from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
 from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.data.data_loader import *
-from src.model.forecast_model import *
+from src.api.disconnect import CancelQueriesOnDisconnect
+from src.api.observability import (
+    configure_logging,
+    configure_tracing,
+    get_observability_counters,
+)
+from src.api.profiling import (
+    PROFILE_ID_HEADER,
+    get_profile_path,
+    profile_call,
+    should_profile,
+)
+from src.api.startup import PREWARM_MODEL_STACK, model_stack
+from src.data.async_loader import (
+    async_db_available,
+    close_pool,
+    get_min_max_time_from_db_async,
+)
+from src.data.data_loader import get_min_max_time_from_db
+from src.data.parallel_loader import close_pools
+from src.data.summary import SummaryNotConfiguredError, get_data_summary
+from src.data.validation import DataValidationError
+from src.model.registry import ModelNotFoundError, registry, validate_model_name
 
 resource = Resource.create(
     {
@@ -30,56 +62,101 @@ IS_TESTING = os.getenv("ENV", "").lower() == "test"
 
 
 if not IS_TESTING:
-    # Create a TracerProvider with the defined resource
-    provider = TracerProvider(resource=resource)
-    otlp_endpoint = os.getenv(
-        "OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
-    )
-    otlp_exporter = OTLPSpanExporter(endpoint=otlp_endpoint)
-    span_processor = BatchSpanProcessor(otlp_exporter)
+    # Global TracerProvider with per-endpoint sampling and bounded span batching
+    configure_tracing(resource)
 
-    # Add the span processor to the provider
-    provider.add_span_processor(span_processor)
+tracer = trace.get_tracer("application.tracer")
 
-    # Set the global tracer provider
-    trace.set_tracer_provider(provider)
+configure_logging(os.getenv("APP_ENV", "development"))
 
-    tracer = trace.get_tracer("application.tracer")
+# Upper bound on bootstrap paths a single request may ask for
+MAX_N_BOOT = int(os.getenv("MAX_N_BOOT", "2000"))
+MAX_BACKTEST_FOLDS = int(os.getenv("MAX_BACKTEST_FOLDS", "100"))
+# Longest tuning deadline a request may ask for, in seconds
+MAX_TUNING_BUDGET_S = float(os.getenv("MAX_TUNING_BUDGET_S", "3600"))
 
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-ENABLE_DIAGNOSE = (
-    os.getenv("ENABLE_DIAGNOSE", "False").lower() == "true"
-)  # avoid exploding logs size
+# Set by the gunicorn config: load everything before workers are forked so the
+# ML stack and fitted models are shared copy-on-write between workers
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "False").lower() == "true"
+if PRELOAD_MODELS:
+    model_stack.load()
+    registry.load_all()
 
-# 1. Remove all default handlers to have full control
-logger.remove()
 
-# 2. Add a single sink: sys.stderr (or sys.stdout, usually stderr for errors/warnings)
-logger.add(
-    sys.stderr,  # Use stderr for error/warning logs
-    level=LOG_LEVEL,
-    serialize=True,
-    enqueue=True,
-    backtrace=True,
-    diagnose=ENABLE_DIAGNOSE,
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The port opens as soon as this yields; the ML stack keeps loading meanwhile
+    if PREWARM_MODEL_STACK:
+        model_stack.warm_in_background()
+    yield
+    await close_pool()
+    close_pools()
 
 
-logger.configure(
-    extra={
-        "app_name": "ForecastApp",
-        "environment": os.getenv("APP_ENV", "development"),
-    }
-)
-
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.mount("/static", StaticFiles(directory="src/static"), name="static")
 
 
-def apply_logger_catch(func):
-    if not IS_TESTING:
-        return logger.catch(func)
-    return func
+def forecast_with_tuning(*args, **kwargs):
+    return model_stack.load().forecast_with_tuning(*args, **kwargs)
+
+
+def forecast_with_tuning_db(*args, **kwargs):
+    return model_stack.load().forecast_with_tuning_db(*args, **kwargs)
+
+
+def forecast_with_registered_model(*args, **kwargs):
+    return model_stack.load().forecast_with_registered_model(*args, **kwargs)
+
+
+def backtest_with_db(*args, **kwargs):
+    return model_stack.load().backtest_with_db(*args, **kwargs)
+
+
+def check_model_name(name: Optional[str]):
+    if name is None:
+        return
+    try:
+        validate_model_name(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def parse_quantiles(value: Optional[str]) -> Optional[List[float]]:
+    """Parses '0.1,0.5,0.9' into a sorted list of quantiles; 400 when invalid."""
+    if not value:
+        return None
+    try:
+        quantiles = sorted({float(item) for item in value.split(",") if item.strip()})
+    except ValueError:
+        quantiles = []
+    if not quantiles or not all(0 < q < 1 for q in quantiles):
+        raise HTTPException(
+            status_code=400,
+            detail="quantiles must be a comma-separated list of numbers in (0, 1).",
+        )
+    return quantiles
+
+
+def parse_lags(value: str):
+    """Parses '72' into 72 and '1,2,24' into [1, 2, 24]; 400 when invalid."""
+    try:
+        lags = [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        lags = []
+    if not lags or min(lags) < 1:
+        raise HTTPException(
+            status_code=400,
+            detail="lags must be a positive integer or a comma-separated list of them.",
+        )
+    return lags[0] if len(lags) == 1 and "," not in value else lags
+
+
+def data_validation_response(error: DataValidationError, span) -> JSONResponse:
+    """422 listing the failed data checks, returned before any tuning ran."""
+    span.set_attribute("error", True)
+    span.set_attribute("error.message", str(error))
+    return JSONResponse(status_code=422, content={"detail": error.to_dict()})
 
 
 def log_request_middleware(func):
@@ -115,22 +192,56 @@ async def dispatch_middleware(request: Request, call_next):
     return await call_next(request)
 
 
+# Outermost, so that it sees the client disconnect before any other middleware
+app.add_middleware(CancelQueriesOnDisconnect)
+
+
 @app.get("/")
 def root():
     logger.info("Root endpoint called")
     return {"message": "Hello World"}
 
 
+@app.get("/healthz")
+def liveness():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+def readiness():
+    """
+    Readiness probe: ready once the ML stack has been pre-warmed (or
+    immediately when PREWARM_MODEL_STACK is off and it loads on first use).
+    """
+    body = {"status": model_stack.state, "load_seconds": model_stack.load_seconds}
+    if model_stack.is_ready or not PREWARM_MODEL_STACK:
+        return body
+    return JSONResponse(status_code=503, content=body)
+
+
+@app.get("/metrics/observability")
+def observability_metrics():
+    """
+    Returns counters of exported, failed and dropped spans and of log records
+    dropped by the log sampler, since process start.
+    """
+    return get_observability_counters()
+
+
 @app.get("/data-range")
 @logger.catch
-def get_data_range():
+async def get_data_range():
     """
     Returns the minimum and maximum timestamps available in the database.
     """
     with tracer.start_as_current_span("get-data-range-request") as span:
         logger.info("Request received for data range.")
         try:
-            min_time, max_time = get_min_max_time_from_db()
+            if async_db_available():
+                min_time, max_time = await get_min_max_time_from_db_async()
+            else:
+                min_time, max_time = await run_in_threadpool(get_min_max_time_from_db)
             logger.info(
                 "Successfully retrieved data range.",
                 min_time=min_time,
@@ -151,14 +262,78 @@ def get_data_range():
             )
 
 
+@app.get("/data-summary")
+def data_summary():
+    """
+    Row count, time range and per-column null rates and statistics of the
+    raw table, read from the maintained summary table (DB_SUMMARY_TABLE).
+    """
+    with tracer.start_as_current_span("get-data-summary-request") as span:
+        try:
+            return get_data_summary()
+        except SummaryNotConfiguredError as e:
+            raise HTTPException(status_code=404, detail=str(e.args[0]))
+        except Exception as e:
+            logger.error(f"Failed to retrieve data summary: {e}")
+            span.set_attribute("error", True)
+            span.set_attribute("error.message", str(e))
+            raise HTTPException(
+                status_code=500, detail=f"Failed to retrieve data summary: {str(e)}"
+            )
+
+
+@app.get("/profiles/{profile_id}")
+def get_profile(
+    profile_id: str,
+    format: str = Query(
+        "json", description="'json' summary or 'collapsed' stacks for flamegraphs"
+    ),
+):
+    """
+    Downloads a profile captured for a request sent with the X-Profile header
+    (or picked by PROFILE_SAMPLE_RATE).
+    """
+    path = get_profile_path(profile_id, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "application/json" if format == "json" else "text/plain"
+    return FileResponse(path, media_type=media_type)
+
+
 @app.post("/predict-tuning")
 @logger.catch
 async def predict_tuning(
+    response: Response,
     file: UploadFile = File(...),
     forecast_hours: int = Query(..., gt=0, description="Number of hours to forecast"),
     window_sizes: int = Query(
         ..., gt=0, description="Window sizes for rolling features"
     ),
+    save_as: Optional[str] = Query(
+        None, description="Persist the fitted model under this name for /predict-model"
+    ),
+    quantiles: Optional[str] = Query(
+        None, description="Comma-separated quantiles to add, e.g. '0.1,0.5,0.9'"
+    ),
+    n_boot: Optional[int] = Query(
+        None, gt=0, le=MAX_N_BOOT, description="Bootstrap paths for quantiles"
+    ),
+    model_type: Literal["recursive", "direct"] = Query(
+        "recursive",
+        description="'recursive' (one model, step by step) or 'direct' (one model per step)",
+    ),
+    time_budget_s: Optional[float] = Query(
+        None,
+        gt=0,
+        le=MAX_TUNING_BUDGET_S,
+        description="Wall-clock deadline of the hyperparameter search, in seconds",
+    ),
+    tuning_mode: Literal["bayesian", "multi_fidelity"] = Query(
+        "bayesian",
+        description="'multi_fidelity' scores trials on recent history first "
+        "and only trains the best ones on the full history",
+    ),
+    x_profile: Optional[str] = Header(None),
 ):
     # Start a new span for the entire prediction request
     with tracer.start_as_current_span("predict-tuning-request") as span:
@@ -166,6 +341,7 @@ async def predict_tuning(
         span.set_attribute("filename", file.filename)
         span.set_attribute("forecast_hours", forecast_hours)
         span.set_attribute("window_sizes", window_sizes)
+        span.set_attribute("model_type", model_type)
 
         logger.info(
             "Prediction request received.",
@@ -187,16 +363,30 @@ async def predict_tuning(
             raise HTTPException(
                 status_code=400, detail="forecast_hours and window_sizes must be > 0"
             )
+        check_model_name(save_as)
+        quantile_list = parse_quantiles(quantiles)
         try:
             with logger.contextualize(model_operation="forecast_tuning"):
                 # Start a new span for the forecast_with_tuning function call
                 with tracer.start_as_current_span(
                     "forecast-with-tuning"
-                ) as tuning_span:
+                ) as tuning_span, profile_call(
+                    "forecast_with_tuning", should_profile(x_profile)
+                ) as profile:
                     forecast_df, mae = forecast_with_tuning(
-                        file, forecast_hours, window_sizes
+                        file,
+                        forecast_hours,
+                        window_sizes,
+                        save_as=save_as,
+                        quantiles=quantile_list,
+                        n_boot=n_boot,
+                        model_type=model_type,
+                        time_budget_s=time_budget_s,
+                        tuning_mode=tuning_mode,
                     )
                     tuning_span.set_attribute("mae", mae)
+                if profile is not None:
+                    response.headers[PROFILE_ID_HEADER] = profile["profile_id"]
 
                 logger.info("Forecast tuning completed successfully.", mae=mae)
                 span.set_attribute("mae", mae)
@@ -205,6 +395,8 @@ async def predict_tuning(
                     "prediction": forecast_df.to_dict(orient="index"),
                     "mae": mae,
                 }
+        except DataValidationError as e:
+            return data_validation_response(e, span)
         except Exception as e:
             logger.error(f"Prediction failed due to an unhandled error: {e}")
             span.set_attribute("error", True)
@@ -213,8 +405,9 @@ async def predict_tuning(
 
 
 @app.post("/predict-tuning-db")
-@apply_logger_catch
+@logger.catch(reraise=True)
 def predict_tuning_db(
+    response: Response,
     forecast_hours: int = Query(..., gt=0, description="Number of hours to forecast"),
     window_sizes: int = Query(
         ..., gt=0, description="Window sizes for rolling features"
@@ -225,10 +418,36 @@ def predict_tuning_db(
     stop_time: str = Query(
         ..., description="Stop timestamp for data (e.g., '2012-09-01 00:00:00+00')"
     ),
+    save_as: Optional[str] = Query(
+        None, description="Persist the fitted model under this name for /predict-model"
+    ),
+    quantiles: Optional[str] = Query(
+        None, description="Comma-separated quantiles to add, e.g. '0.1,0.5,0.9'"
+    ),
+    n_boot: Optional[int] = Query(
+        None, gt=0, le=MAX_N_BOOT, description="Bootstrap paths for quantiles"
+    ),
+    model_type: Literal["recursive", "direct"] = Query(
+        "recursive",
+        description="'recursive' (one model, step by step) or 'direct' (one model per step)",
+    ),
+    time_budget_s: Optional[float] = Query(
+        None,
+        gt=0,
+        le=MAX_TUNING_BUDGET_S,
+        description="Wall-clock deadline of the hyperparameter search, in seconds",
+    ),
+    tuning_mode: Literal["bayesian", "multi_fidelity"] = Query(
+        "bayesian",
+        description="'multi_fidelity' scores trials on recent history first "
+        "and only trains the best ones on the full history",
+    ),
+    x_profile: Optional[str] = Header(None),
 ):
     with tracer.start_as_current_span("predict-tuning-db-request") as span:
         span.set_attribute("forecast_hours", forecast_hours)
         span.set_attribute("window_sizes", window_sizes)
+        span.set_attribute("model_type", model_type)
         span.set_attribute("data_start_time", start_time)
         span.set_attribute("data_stop_time", stop_time)
 
@@ -265,17 +484,31 @@ def predict_tuning_db(
             status_code=400,
             detail="Invalid start_time or stop_time format. UseYYYY-MM-DD HH:MM:SS[+HH] format.",
         )
+    check_model_name(save_as)
+    quantile_list = parse_quantiles(quantiles)
 
     try:
         with logger.contextualize(model_operation="forecast_tuning_db"):
-            with tracer.start_as_current_span("forecast-with-tuning-db") as tuning_span:
+            with tracer.start_as_current_span(
+                "forecast-with-tuning-db"
+            ) as tuning_span, profile_call(
+                "forecast_with_tuning_db", should_profile(x_profile)
+            ) as profile:
                 forecast_df, mae = forecast_with_tuning_db(
                     forecast_hours=forecast_hours,
                     window_sizes=window_sizes,
                     start_time=start_time,
                     stop_time=stop_time,
+                    save_as=save_as,
+                    quantiles=quantile_list,
+                    n_boot=n_boot,
+                    model_type=model_type,
+                    time_budget_s=time_budget_s,
+                    tuning_mode=tuning_mode,
                 )
                 tuning_span.set_attribute("mae", mae)
+            if profile is not None:
+                response.headers[PROFILE_ID_HEADER] = profile["profile_id"]
 
             logger.info("Forecast tuning (DB-based) completed successfully.", mae=mae)
             return {
@@ -283,6 +516,8 @@ def predict_tuning_db(
                 "prediction": forecast_df.to_dict(orient="index"),
                 "mae": mae,
             }
+    except DataValidationError as e:
+        return data_validation_response(e, span)
     except Exception as e:
         logger.error(f"Prediction (DB-based) failed due to an unhandled error: {e}")
         span.set_attribute("error", True)
@@ -290,5 +525,135 @@ def predict_tuning_db(
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
 
+@app.get("/models")
+def list_models():
+    """
+    Lists registered models with their metadata and, for models loaded in
+    this worker, the load time in milliseconds.
+    """
+    return {"models": registry.info()}
+
+
+@app.post("/predict-model")
+@logger.catch(reraise=True)
+def predict_model(
+    model_name: str = Query(..., description="Name used with save_as when training"),
+    forecast_hours: int = Query(..., gt=0, description="Number of hours to forecast"),
+    start_time: str = Query(
+        ..., description="Start timestamp for data (e.g., '2012-08-31 17:00:00+00')"
+    ),
+    stop_time: str = Query(
+        ..., description="Stop timestamp for data (e.g., '2012-09-01 00:00:00+00')"
+    ),
+    quantiles: Optional[str] = Query(
+        None, description="Comma-separated quantiles to add, e.g. '0.1,0.5,0.9'"
+    ),
+    n_boot: Optional[int] = Query(
+        None, gt=0, le=MAX_N_BOOT, description="Bootstrap paths for quantiles"
+    ),
+):
+    """
+    Forecasts with an already fitted model from the registry (no tuning or
+    training), using the history in [start_time, stop_time] as context.
+    """
+    with tracer.start_as_current_span("predict-model-request") as span:
+        span.set_attribute("model_name", model_name)
+        span.set_attribute("forecast_hours", forecast_hours)
+        logger.info(
+            "Prediction request received (registered model).",
+            model_name=model_name,
+            forecast_hours=forecast_hours,
+            start_time=start_time,
+            stop_time=stop_time,
+        )
+        check_model_name(model_name)
+        quantile_list = parse_quantiles(quantiles)
+        try:
+            with logger.contextualize(model_operation="forecast_registered_model"):
+                forecast_df, mae = forecast_with_registered_model(
+                    model_name=model_name,
+                    forecast_hours=forecast_hours,
+                    start_time=start_time,
+                    stop_time=stop_time,
+                    quantiles=quantile_list,
+                    n_boot=n_boot,
+                )
+        except ModelNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e.args[0]))
+        except Exception as e:
+            logger.error(f"Prediction (registered model) failed: {e}")
+            span.set_attribute("error", True)
+            span.set_attribute("error.message", str(e))
+            return JSONResponse(status_code=500, content={"detail": str(e)})
+
+        logger.info("Forecast with registered model completed.", mae=mae)
+        return {
+            "message": "Prediction endpoint success (registered model)",
+            "prediction": forecast_df.to_dict(orient="index"),
+            "mae": mae,
+        }
+
+
+@app.post("/backtest")
+@logger.catch(reraise=True)
+def backtest(
+    forecast_hours: int = Query(..., gt=0, description="Hours forecast by each fold"),
+    start_time: str = Query(
+        ..., description="Start timestamp for data (e.g., '2012-08-31 17:00:00+00')"
+    ),
+    stop_time: str = Query(
+        ..., description="Stop timestamp for data (e.g., '2012-09-01 00:00:00+00')"
+    ),
+    n_folds: int = Query(5, gt=0, le=MAX_BACKTEST_FOLDS, description="Number of folds"),
+    window_sizes: int = Query(72, gt=0, description="Window size for rolling features"),
+    lags: str = Query("72", description="Number of lags, or a list like '1,2,24'"),
+    model_name: Optional[str] = Query(
+        None, description="Use the configuration of this registered model"
+    ),
+):
+    """
+    Rolling-origin backtest of a model configuration over the last
+    n_folds * forecast_hours hours of [start_time, stop_time]. Returns
+    per-fold, per-horizon-step and overall error metrics.
+    """
+    with tracer.start_as_current_span("backtest-request") as span:
+        span.set_attribute("forecast_hours", forecast_hours)
+        span.set_attribute("n_folds", n_folds)
+        logger.info(
+            "Backtest request received.",
+            forecast_hours=forecast_hours,
+            n_folds=n_folds,
+            start_time=start_time,
+            stop_time=stop_time,
+            model_name=model_name,
+        )
+        check_model_name(model_name)
+        parsed_lags = parse_lags(lags)
+        try:
+            with logger.contextualize(model_operation="backtest"):
+                return backtest_with_db(
+                    start_time=start_time,
+                    stop_time=stop_time,
+                    forecast_hours=forecast_hours,
+                    n_folds=n_folds,
+                    window_sizes=window_sizes,
+                    lags=parsed_lags,
+                    model_name=model_name,
+                )
+        except ModelNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e.args[0]))
+        except DataValidationError as e:
+            return data_validation_response(e, span)
+        except ValueError as e:
+            span.set_attribute("error", True)
+            span.set_attribute("error.message", str(e))
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Backtest failed: {e}")
+            span.set_attribute("error", True)
+            span.set_attribute("error.message", str(e))
+            return JSONResponse(status_code=500, content={"detail": str(e)})
+
+
 if __name__ == "__main__":
     logger.info("Application starting up...")
@@ -0,0 +1,259 @@
+import os
+import random
+import sys
+import threading
+from typing import Dict, Optional, Sequence
+
+from loguru import logger
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import (
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+
+# Span batching (same variable names the OTEL SDK documents for its own BSP)
+OTEL_BSP_MAX_QUEUE_SIZE = int(os.getenv("OTEL_BSP_MAX_QUEUE_SIZE", "2048"))
+OTEL_BSP_SCHEDULE_DELAY_MS = int(os.getenv("OTEL_BSP_SCHEDULE_DELAY", "5000"))
+OTEL_BSP_MAX_EXPORT_BATCH_SIZE = int(os.getenv("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "512"))
+OTEL_BSP_EXPORT_TIMEOUT_MS = int(os.getenv("OTEL_BSP_EXPORT_TIMEOUT", "30000"))
+
+# Head-based sampling: "root-span-name=rate,..." plus a default rate
+OTEL_SAMPLING_RATES = os.getenv("OTEL_SAMPLING_RATES", "")
+OTEL_SAMPLING_DEFAULT_RATE = float(os.getenv("OTEL_SAMPLING_DEFAULT_RATE", "1.0"))
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+ENABLE_DIAGNOSE = (
+    os.getenv("ENABLE_DIAGNOSE", "False").lower() == "true"
+)  # avoid exploding logs size
+LOG_BACKTRACE = os.getenv("LOG_BACKTRACE", "True").lower() == "true"
+LOG_ENQUEUE = os.getenv("LOG_ENQUEUE", "True").lower() == "true"
+LOG_SERIALIZE = os.getenv("LOG_SERIALIZE", "True").lower() == "true"
+# Fraction of records at or below LOG_SAMPLE_MAX_LEVEL that are kept
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_SAMPLE_MAX_LEVEL = os.getenv("LOG_SAMPLE_MAX_LEVEL", "INFO").upper()
+
+
+class ObservabilityCounters:
+    """Thread-safe counters describing what the telemetry pipeline kept or dropped."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, int] = {}
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + value
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._values)
+
+
+counters = ObservabilityCounters()
+
+
+def parse_sampling_rates(value: str) -> Dict[str, float]:
+    """Parses 'get-data-range-request=0.1,predict-tuning-db-request=1' into a dict."""
+    rates = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, rate = item.strip().partition("=")
+        rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class EndpointSampler(Sampler):
+    """
+    Samples root spans at a rate chosen by span name. Every endpoint opens its
+    own root span ("get-data-range-request", "predict-tuning-db-request", ...),
+    so the name identifies the endpoint. Child spans follow their parent
+    through ParentBased.
+    """
+
+    def __init__(self, rates: Dict[str, float], default_rate: float = 1.0):
+        self._samplers = {name: TraceIdRatioBased(rate) for name, rate in rates.items()}
+        self._default = TraceIdRatioBased(default_rate)
+
+    def should_sample(
+        self,
+        parent_context,
+        trace_id,
+        name,
+        kind=None,
+        attributes=None,
+        links=None,
+        trace_state=None,
+    ) -> SamplingResult:
+        sampler = self._samplers.get(name, self._default)
+        return sampler.should_sample(
+            parent_context, trace_id, name, kind, attributes, links, trace_state
+        )
+
+    def get_description(self) -> str:
+        return f"EndpointSampler{{{len(self._samplers)} rates}}"
+
+
+class CountingSpanProcessor(SpanProcessor):
+    """
+    Wraps a BatchSpanProcessor with an explicit bound on spans waiting for
+    export. When the bound is reached, new spans are dropped immediately
+    (never blocking the request thread) and counted.
+    """
+
+    def __init__(self, exporter: SpanExporter, max_queue_size: int, **batch_kwargs):
+        self.max_queue_size = max_queue_size
+        self._pending = 0
+        self._lock = threading.Lock()
+        # BatchSpanProcessor rejects batches larger than its queue
+        batch_kwargs["max_export_batch_size"] = min(
+            batch_kwargs.get("max_export_batch_size", max_queue_size), max_queue_size
+        )
+        self._delegate = BatchSpanProcessor(
+            _CountingExporter(exporter, self._release),
+            max_queue_size=max_queue_size,
+            **batch_kwargs,
+        )
+
+    def _release(self, count: int):
+        with self._lock:
+            self._pending = max(self._pending - count, 0)
+
+    def on_start(self, span, parent_context=None):
+        self._delegate.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span):
+        if not span.context.trace_flags.sampled:
+            return
+        with self._lock:
+            if self._pending >= self.max_queue_size:
+                counters.increment("spans_dropped")
+                return
+            self._pending += 1
+        self._delegate.on_end(span)
+
+    def shutdown(self):
+        self._delegate.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._delegate.force_flush(timeout_millis)
+
+
+class _CountingExporter(SpanExporter):
+    def __init__(self, exporter: SpanExporter, on_done):
+        self._exporter = exporter
+        self._on_done = on_done
+
+    def export(self, spans: Sequence) -> SpanExportResult:
+        try:
+            result = self._exporter.export(spans)
+        except Exception:
+            result = SpanExportResult.FAILURE
+        finally:
+            self._on_done(len(spans))
+        if result == SpanExportResult.SUCCESS:
+            counters.increment("spans_exported", len(spans))
+        else:
+            counters.increment("spans_export_failed", len(spans))
+        return result
+
+    def shutdown(self):
+        self._exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._exporter.force_flush(timeout_millis)
+
+
+class LogSampler:
+    """
+    Loguru filter keeping a `rate` fraction of records at or below `max_level`.
+    Records above it (warnings and errors by default) are always kept.
+    """
+
+    def __init__(self, rate: float = 1.0, max_level: str = "INFO"):
+        self.rate = rate
+        self.max_level_no = logger.level(max_level).no
+
+    def __call__(self, record) -> bool:
+        if self.rate >= 1.0 or record["level"].no > self.max_level_no:
+            return True
+        if random.random() < self.rate:
+            return True
+        counters.increment("logs_sampled_out")
+        return False
+
+
+def configure_tracing(resource: Resource, exporter: Optional[SpanExporter] = None):
+    """Installs the global TracerProvider with sampling and bounded batching."""
+    if exporter is None:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        otlp_endpoint = os.getenv(
+            "OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+        )
+        exporter = OTLPSpanExporter(
+            endpoint=otlp_endpoint, timeout=OTEL_BSP_EXPORT_TIMEOUT_MS / 1000
+        )
+
+    sampler = ParentBased(
+        root=EndpointSampler(
+            parse_sampling_rates(OTEL_SAMPLING_RATES), OTEL_SAMPLING_DEFAULT_RATE
+        )
+    )
+    provider = TracerProvider(resource=resource, sampler=sampler)
+    provider.add_span_processor(
+        CountingSpanProcessor(
+            exporter,
+            max_queue_size=OTEL_BSP_MAX_QUEUE_SIZE,
+            schedule_delay_millis=OTEL_BSP_SCHEDULE_DELAY_MS,
+            max_export_batch_size=OTEL_BSP_MAX_EXPORT_BATCH_SIZE,
+            export_timeout_millis=OTEL_BSP_EXPORT_TIMEOUT_MS,
+        )
+    )
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def configure_logging(app_env: str):
+    # 1. Remove all default handlers to have full control
+    logger.remove()
+
+    # 2. Add a single sink: sys.stderr, with high-frequency records sampled
+    logger.add(
+        sys.stderr,
+        level=LOG_LEVEL,
+        filter=LogSampler(LOG_SAMPLE_RATE, LOG_SAMPLE_MAX_LEVEL),
+        serialize=LOG_SERIALIZE,
+        enqueue=LOG_ENQUEUE,
+        backtrace=LOG_BACKTRACE,
+        diagnose=ENABLE_DIAGNOSE,
+    )
+
+    logger.configure(
+        extra={
+            "app_name": "ForecastApp",
+            "environment": app_env,
+        }
+    )
+
+
+def get_observability_counters() -> Dict[str, int]:
+    values = {
+        "spans_exported": 0,
+        "spans_export_failed": 0,
+        "spans_dropped": 0,
+        "logs_sampled_out": 0,
+    }
+    values.update(counters.snapshot())
+    return values
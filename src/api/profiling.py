@@ -0,0 +1,252 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from opentelemetry import trace
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Fraction of requests profiled without the header (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/forecast-profiles")
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+# Profiles kept in PROFILE_DIR; the oldest are deleted beyond this
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+PROFILE_MAX_DEPTH = 128
+
+_TRUTHY = {"1", "true", "yes", "on"}
+_PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def should_profile(header_value: Optional[str] = None) -> bool:
+    """
+    Decides whether the current request is profiled: always when the
+    `X-Profile` header is truthy, otherwise with probability PROFILE_SAMPLE_RATE.
+    """
+    if header_value is not None and header_value.strip().lower() in _TRUTHY:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler: a daemon thread reads the stack of the target
+    thread every `interval_ms` through sys._current_frames(), so the profiled
+    code itself runs without any tracing hooks.
+    """
+
+    def __init__(self, interval_ms: Optional[float] = None, thread_id=None):
+        if interval_ms is None:
+            interval_ms = PROFILE_INTERVAL_MS
+        self.interval_s = max(interval_ms, 0.1) / 1000.0
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = []
+        while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+            code = frame.f_code
+            stack.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_s):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def top_functions(self, top_n: int = 25):
+        self_counts = Counter()
+        inclusive_counts = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for name in set(frames):
+                inclusive_counts[name] += count
+
+        total = max(self.samples, 1)
+        return [
+            {
+                "function": name,
+                "inclusive_samples": count,
+                "inclusive_pct": round(100.0 * count / total, 2),
+                "self_samples": self_counts.get(name, 0),
+            }
+            for name, count in inclusive_counts.most_common(top_n)
+        ]
+
+    def collapsed(self) -> str:
+        """Stacks in the folded format read by flamegraph.pl and speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.items())
+
+
+# Profiled calls can overlap: tracemalloc is started by the first one and
+# stopped by the last one (and never stopped if something else started it)
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_started = False
+
+
+def _acquire_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_started = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_started:
+            tracemalloc.stop()
+            _tracemalloc_started = False
+
+
+def _allocation_summary(snapshot, top_n: int):
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:top_n]
+    ]
+
+
+def _write_artifact(profile_id: str, report: Dict[str, Any], collapsed: str):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.json"), "w") as f:
+        json.dump(report, f)
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.collapsed"), "w") as f:
+        f.write(collapsed)
+    _prune_artifacts()
+
+
+def _prune_artifacts():
+    """Deletes the oldest profiles beyond PROFILE_MAX_FILES."""
+    profiles = [
+        entry
+        for entry in os.scandir(PROFILE_DIR)
+        if entry.name.endswith(".json")
+        and _PROFILE_ID_PATTERN.match(entry.name[: -len(".json")])
+    ]
+    if len(profiles) <= PROFILE_MAX_FILES:
+        return
+    profiles.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in profiles[: len(profiles) - PROFILE_MAX_FILES]:
+        profile_id = entry.name[: -len(".json")]
+        for fmt in ("json", "collapsed"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, f"{profile_id}.{fmt}"))
+            except FileNotFoundError:
+                pass
+
+
+def get_profile_path(profile_id: str, fmt: str = "json") -> Optional[str]:
+    """Returns the artifact path for a profile id, or None if it does not exist."""
+    if not _PROFILE_ID_PATTERN.match(profile_id) or fmt not in ("json", "collapsed"):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.{fmt}")
+    return path if os.path.exists(path) else None
+
+
+@contextmanager
+def profile_call(name: str, enabled: bool):
+    """
+    Profiles the wrapped block when `enabled`, yielding a dict that receives the
+    report summary (including "profile_id") on exit. When disabled it yields
+    None and adds no overhead beyond the context manager itself.
+    """
+    if not enabled:
+        yield None
+        return
+
+    result: Dict[str, Any] = {"profile_id": uuid.uuid4().hex}
+    _acquire_tracemalloc()
+    profiler = SamplingProfiler()
+    profiler.start()
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        wall_time_s = time.perf_counter() - start
+        profiler.stop()
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            _release_tracemalloc()
+
+        top_functions = profiler.top_functions(PROFILE_TOP_N)
+        report = {
+            "profile_id": result["profile_id"],
+            "name": name,
+            "wall_time_s": round(wall_time_s, 4),
+            "interval_ms": profiler.interval_s * 1000.0,
+            "samples": profiler.samples,
+            "top_functions": top_functions,
+            "peak_traced_bytes": peak_bytes,
+            "top_allocations": _allocation_summary(snapshot, PROFILE_TOP_N),
+        }
+        try:
+            _write_artifact(result["profile_id"], report, profiler.collapsed())
+        except OSError as e:
+            logger.warning(f"Could not write profile artifact: {e}")
+
+        span = trace.get_current_span()
+        span.set_attribute("profile.id", result["profile_id"])
+        span.set_attribute("profile.samples", profiler.samples)
+        span.set_attribute("profile.peak_traced_bytes", peak_bytes)
+        span.add_event(
+            "profile",
+            {
+                "top_functions": json.dumps(top_functions[:10]),
+                "top_allocations": json.dumps(report["top_allocations"][:10]),
+            },
+        )
+        logger.info(
+            "Profile captured.",
+            profile_id=result["profile_id"],
+            samples=profiler.samples,
+            peak_traced_bytes=peak_bytes,
+        )
+        result.update(
+            {
+                key: report[key]
+                for key in ("wall_time_s", "samples", "peak_traced_bytes")
+            }
+        )
@@ -0,0 +1,67 @@
+import importlib
+import os
+import threading
+import time
+from typing import Optional
+
+from loguru import logger
+
+# Modules that pull in LightGBM, Optuna, skforecast and sklearn
+MODEL_STACK_MODULE = "src.model.forecast_model"
+PREWARM_MODEL_STACK = os.getenv("PREWARM_MODEL_STACK", "True").lower() == "true"
+
+
+class ModelStackLoader:
+    """
+    Imports the ML stack on first use, or ahead of time from a background
+    thread so the server can accept connections (and answer liveness probes)
+    while LightGBM, Optuna and skforecast are still loading.
+    """
+
+    def __init__(self, module_name: str = MODEL_STACK_MODULE):
+        self.module_name = module_name
+        self.state = "cold"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Returns the model stack module, importing it if needed (thread-safe)."""
+        if self._module is not None:
+            return self._module
+        with self._lock:
+            if self._module is None:
+                self.state = "warming"
+                start = time.perf_counter()
+                try:
+                    self._module = importlib.import_module(self.module_name)
+                except Exception as e:
+                    self.state = "failed"
+                    self.error = str(e)
+                    logger.exception("Failed to load the model stack.")
+                    raise
+                self.load_seconds = time.perf_counter() - start
+                self.state = "ready"
+                logger.info(
+                    "Model stack loaded.", load_seconds=round(self.load_seconds, 3)
+                )
+        return self._module
+
+    def warm_in_background(self) -> threading.Thread:
+        def _warm():
+            try:
+                self.load()
+            except Exception:
+                pass  # state and error are recorded by load()
+
+        thread = threading.Thread(target=_warm, name="model-stack-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+
+model_stack = ModelStackLoader()
@@ -0,0 +1,276 @@
+"""
+Asynchronous data access on asyncpg.
+
+Async endpoints await these instead of running the psycopg2 loaders in the
+threadpool, so a worker can serve many concurrent database reads without
+tying up a thread per request. Connections come from one pool per host and
+process, created on first use and closed by the application lifespan. Reads
+are routed, time-limited and cancelled like the psycopg2 ones (see
+src.data.connections).
+
+The queries are the ones of src.data.data_loader; only the driver differs.
+Enable with ASYNC_DB_ENABLED=true (asyncpg must be installed).
+"""
+
+import asyncio
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from loguru import logger
+from opentelemetry import trace
+
+from src.data import data_loader
+from src.data.connections import (
+    DB_STATEMENT_TIMEOUT_MS,
+    QueryCancelledError,
+    active_queries,
+    replica_router,
+)
+from src.data.data_loader import (
+    build_hourly_query,
+    get_db_connection_params,
+    keep_raw_counts,
+)
+
+try:
+    import asyncpg
+except ImportError:  # Optional: without it the API uses the threadpool loaders
+    asyncpg = None
+
+tracer = trace.get_tracer("application.tracer")
+
+ASYNC_DB_ENABLED = os.getenv("ASYNC_DB_ENABLED", "false").lower() == "true"
+ASYNC_DB_POOL_MIN_SIZE = int(os.getenv("ASYNC_DB_POOL_MIN_SIZE", "1"))
+ASYNC_DB_POOL_MAX_SIZE = int(os.getenv("ASYNC_DB_POOL_MAX_SIZE", "10"))
+
+_pools = {}
+_pool_lock = None
+
+
+def async_db_available() -> bool:
+    return ASYNC_DB_ENABLED and asyncpg is not None
+
+
+async def _create_pool(host: str, database: str, user: str, password: str):
+    server_settings = {}
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        server_settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT_MS)
+    pool = await asyncpg.create_pool(
+        host=host,
+        port=5432,
+        user=user,
+        password=password,
+        database=database,
+        min_size=ASYNC_DB_POOL_MIN_SIZE,
+        max_size=ASYNC_DB_POOL_MAX_SIZE,
+        server_settings=server_settings,
+    )
+    logger.info(
+        "Async database pool created.",
+        host=host,
+        min_size=ASYNC_DB_POOL_MIN_SIZE,
+        max_size=ASYNC_DB_POOL_MAX_SIZE,
+    )
+    return pool
+
+
+async def get_pool(host: Optional[str] = None):
+    """
+    The pool of `host`, by default the read host picked by the router. A
+    replica whose pool cannot be created is reported to the router and the
+    primary's pool is returned instead, as connect_for_read does.
+    """
+    global _pool_lock
+    primary, database, user, password, *_ = get_db_connection_params()
+    target = host or replica_router.pick(primary)
+    if _pool_lock is None:
+        # Created on first use so that it belongs to the serving event loop
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if target not in _pools:
+            start = time.perf_counter()
+            try:
+                _pools[target] = await _create_pool(target, database, user, password)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as error:
+                if target == primary:
+                    raise
+                replica_router.record_failure(target)
+                logger.warning(
+                    f"Read replica {target} unavailable, using the primary: {error}"
+                )
+                target = primary
+                if target not in _pools:
+                    _pools[target] = await _create_pool(
+                        target, database, user, password
+                    )
+            else:
+                if target != primary:
+                    replica_router.record(target, time.perf_counter() - start)
+        return _pools[target]
+
+
+async def close_pool():
+    while _pools:
+        _, pool = _pools.popitem()
+        await pool.close()
+        logger.info("Async database pool closed.")
+
+
+async def cancellable(awaitable):
+    """
+    Awaits a query as its own task so that the request's QueryScope can
+    cancel it (asyncpg then cancels the statement on the server).
+    """
+    scope = active_queries.get()
+    task = asyncio.ensure_future(awaitable)
+    if scope is None:
+        return await task
+    scope.add(task.cancel)
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if scope.cancelled:
+            raise QueryCancelledError("The client disconnected.")
+        raise
+    finally:
+        scope.discard(task.cancel)
+
+
+def to_asyncpg_query(sql_query: str) -> str:
+    """Rewrites psycopg2 `%s` placeholders as asyncpg's `$1, $2, ...`."""
+    count = 0
+
+    def number(match):
+        nonlocal count
+        count += 1
+        return f"${count}"
+
+    return re.sub(r"%s", number, sql_query)
+
+
+def _timestamp(value) -> Optional[datetime]:
+    # asyncpg binds timestamptz parameters from datetimes only, not strings
+    return None if value is None else pd.to_datetime(value, utc=True).to_pydatetime()
+
+
+async def fetch_dataframe(
+    connection, sql_query: str, params: Sequence[Any], time_column: str
+) -> pd.DataFrame:
+    statement = await connection.prepare(to_asyncpg_query(sql_query))
+    records = await cancellable(statement.fetch(*params))
+    columns = [attribute.name for attribute in statement.get_attributes()]
+    df = pd.DataFrame([tuple(record) for record in records], columns=columns)
+    if not df.empty:
+        df = df.set_index(time_column)
+        df.index = pd.to_datetime(df.index, utc=True)
+    return df
+
+
+async def _has_timescaledb(connection, database: str) -> bool:
+    cache = data_loader._timescaledb_available
+    if database not in cache:
+        cache[database] = (
+            await connection.fetchval(
+                "SELECT 1 FROM pg_extension WHERE extname = 'timescaledb';"
+            )
+            is not None
+        )
+    return cache[database]
+
+
+async def get_min_max_time_from_db_async() -> (
+    Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]
+):
+    """Async get_min_max_time_from_db, summary table included."""
+    host, database, user, password, schema_name, table_name, time_column = (
+        get_db_connection_params()
+    )
+    pool = await get_pool()
+    async with pool.acquire() as connection:
+        result = None
+        if data_loader.DB_SUMMARY_TABLE:
+            try:
+                result = await cancellable(
+                    connection.fetchrow(
+                        "SELECT min_time, max_time FROM "
+                        f'"{schema_name}"."{data_loader.DB_SUMMARY_TABLE}" '
+                        "WHERE source_table = $1;",
+                        table_name,
+                    )
+                )
+            except asyncpg.PostgresError as error:
+                logger.warning(f"Summary table unavailable, scanning instead: {error}")
+        if result is None:
+            result = await cancellable(
+                connection.fetchrow(
+                    f'SELECT MIN("{time_column}"), MAX("{time_column}") '
+                    f'FROM "{schema_name}"."{table_name}";'
+                )
+            )
+
+    min_time_raw, max_time_raw = result
+    if not (min_time_raw and max_time_raw):
+        logger.warning(f"No min/max time values found in {schema_name}.{table_name}.")
+        return None, None
+    return (
+        pd.to_datetime(min_time_raw, utc=True),
+        pd.to_datetime(max_time_raw, utc=True),
+    )
+
+
+async def load_data_from_db_async(
+    start_time, stop_time, columns: List[str] = data_loader.FEATURE_STORE_COLUMNS
+) -> pd.DataFrame:
+    """Async load_data_from_db: plain, hourly-resampled or with store features."""
+    host, database, user, password, schema_name, table_name, time_column = (
+        get_db_connection_params()
+    )
+    params = [_timestamp(start_time), _timestamp(stop_time)]
+    with tracer.start_as_current_span("load-data-from-db-async") as span:
+        pool = await get_pool()
+        async with pool.acquire() as connection:
+            if columns:
+                # Imported here: the feature store module builds on data_loader
+                from src.data.feature_store import build_store_query
+
+                sql_query = build_store_query(
+                    schema_name, table_name, time_column, columns
+                )
+            elif data_loader.DB_RESAMPLE_HOURLY:
+                table_columns = [
+                    attribute.name
+                    for attribute in (
+                        await connection.prepare(
+                            f'SELECT * FROM "{schema_name}"."{table_name}" LIMIT 0;'
+                        )
+                    ).get_attributes()
+                ]
+                timescale = await _has_timescaledb(connection, database)
+                span.set_attribute("timescaledb", timescale)
+                sql_query = build_hourly_query(
+                    schema_name, table_name, time_column, table_columns, timescale
+                )
+                if timescale:
+                    params = params * 2
+            else:
+                sql_query = (
+                    f'SELECT * FROM "{schema_name}"."{table_name}" '
+                    f'WHERE "{time_column}" >= %s AND "{time_column}" <= %s;'
+                )
+            data = await fetch_dataframe(connection, sql_query, params, time_column)
+        data = keep_raw_counts(data)
+
+        if data.empty:
+            logger.error(
+                "No data loaded from the database for the specified time range."
+            )
+            raise ValueError(
+                "No data loaded from the database for the specified time range."
+            )
+        span.set_attribute("rows", len(data))
+        logger.info(f"Data loaded successfully. Shape: {data.shape}")
+        return data
@@ -0,0 +1,65 @@
+"""
+Categorical codec for the exogenous features.
+
+Replaces an OrdinalEncoder in a ColumnTransformer. Non-numeric columns are
+mapped to int codes through a lookup table computed at fit time, and numeric
+columns pass through untouched and uncopied. The codes come out as a pandas
+categorical with integer categories, which skforecast accepts in exog and
+LightGBM (with categorical_feature="auto") splits on natively. Values unseen
+at fit time, and missing values, get code -1; LightGBM sends them down the
+missing-value branch of categorical splits.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+class CategoricalCodec(TransformerMixin, BaseEstimator):
+    """
+    Fits the categories of the non-numeric columns of a DataFrame (the
+    categories of a pandas categorical, otherwise its sorted values) and
+    transforms those columns to integer-coded categoricals.
+    """
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.categories_: Dict[str, List] = {}
+        self._lookup: Dict[str, pd.Index] = {}
+        for col in X.columns:
+            column = X[col]
+            if pd.api.types.is_numeric_dtype(column):
+                continue
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                categories = column.cat.categories
+            else:
+                categories = pd.Index(sorted(column.dropna().unique()))
+            self.categories_[col] = categories.tolist()
+            self._lookup[col] = pd.Index(categories)
+        return self
+
+    def _codes(self, col: str, column: pd.Series) -> np.ndarray:
+        lookup = self._lookup[col]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Remap the column's own categories once, then index by its codes;
+            # the trailing -1 is where code -1 (missing) lands
+            table = np.append(lookup.get_indexer(column.cat.categories), -1)
+            return table[column.cat.codes.to_numpy()]
+        return lookup.get_indexer(column.to_numpy())
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        columns = {}
+        for col in self.feature_names_in_:
+            if col in self._lookup:
+                columns[col] = pd.Categorical.from_codes(
+                    self._codes(col, X[col]),
+                    categories=np.arange(len(self._lookup[col])),
+                )
+            else:
+                columns[col] = X[col]
+        return pd.DataFrame(columns, index=X.index, copy=False)
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return self.feature_names_in_.copy()
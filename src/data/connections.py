@@ -0,0 +1,173 @@
+"""
+Read routing, statement timeouts and cancellation for database connections.
+
+Reads go to DB_READ_REPLICAS when configured, picked round-robin or by the
+lowest observed connect latency (DB_REPLICA_ROUTING). A replica that fails
+to connect is skipped for REPLICA_COOLDOWN_S and the read falls back to the
+primary. Writes (feature store, summary refresh) always use the primary.
+
+DB_STATEMENT_TIMEOUT_MS caps every statement on the server; 0 disables it.
+
+Connections opened while a QueryScope is active (one per HTTP request, see
+src/api/disconnect.py) are registered with it, so that the queries still
+running when the client disconnects can be cancelled.
+"""
+
+import contextvars
+import itertools
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import psycopg2
+from loguru import logger
+from psycopg2 import Error
+
+DB_READ_REPLICAS = [
+    host.strip()
+    for host in os.getenv("DB_READ_REPLICAS", "").split(",")
+    if host.strip()
+]
+DB_REPLICA_ROUTING = os.getenv("DB_REPLICA_ROUTING", "round_robin")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+REPLICA_COOLDOWN_S = float(os.getenv("REPLICA_COOLDOWN_S", "30"))
+# Weight of the newest sample in the moving average of connect latency
+LATENCY_SMOOTHING = 0.2
+ROUTING_STRATEGIES = ("round_robin", "least_latency")
+
+
+class QueryCancelledError(RuntimeError):
+    pass
+
+
+class ReplicaRouter:
+    def __init__(self, replicas: List[str], strategy: str = "round_robin"):
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(
+                f"DB_REPLICA_ROUTING must be one of {ROUTING_STRATEGIES}, "
+                f"got {strategy!r}."
+            )
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.latency: Dict[str, float] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._cycle = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+
+    def _healthy(self) -> List[str]:
+        now = time.monotonic()
+        return [
+            host
+            for host in self.replicas
+            if now - self._failed_at.get(host, -REPLICA_COOLDOWN_S)
+            >= REPLICA_COOLDOWN_S
+        ]
+
+    def pick(self, primary: str) -> str:
+        """The host to read from: a healthy replica, else the primary."""
+        with self._lock:
+            healthy = self._healthy()
+            if not healthy:
+                return primary
+            if self.strategy == "least_latency":
+                # Unmeasured replicas first, so that each gets a sample
+                return min(healthy, key=lambda host: self.latency.get(host, 0.0))
+            for host in self._cycle:
+                if host in healthy:
+                    return host
+
+    def record(self, host: str, seconds: float):
+        with self._lock:
+            previous = self.latency.get(host)
+            self.latency[host] = (
+                seconds
+                if previous is None
+                else LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * previous
+            )
+            self._failed_at.pop(host, None)
+
+    def record_failure(self, host: str):
+        with self._lock:
+            self._failed_at[host] = time.monotonic()
+
+
+replica_router = ReplicaRouter(DB_READ_REPLICAS, DB_REPLICA_ROUTING)
+
+
+class QueryScope:
+    """The cancel callbacks of the queries run on behalf of one request."""
+
+    def __init__(self):
+        self.cancelled = False
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def add(self, cancel: Callable[[], None]):
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelledError("The client disconnected.")
+            self._callbacks.append(cancel)
+
+    def discard(self, cancel: Callable[[], None]):
+        with self._lock:
+            if cancel in self._callbacks:
+                self._callbacks.remove(cancel)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for cancel in callbacks:
+            try:
+                cancel()
+            except Exception as error:  # e.g. the connection closed meanwhile
+                logger.debug(f"Could not cancel query: {error}")
+        if callbacks:
+            logger.info(f"Cancelled {len(callbacks)} queries of a closed request.")
+
+
+active_queries: contextvars.ContextVar[Optional[QueryScope]] = contextvars.ContextVar(
+    "active_queries", default=None
+)
+
+
+def connect_kwargs(host: str, database: str, user: str, password: str) -> dict:
+    kwargs = dict(
+        user=user, password=password, host=host, port="5432", database=database
+    )
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        kwargs["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return kwargs
+
+
+def connect_for_read(host: str, database: str, user: str, password: str):
+    """
+    psycopg2 connection for a read query: routed to a replica when any are
+    configured, with the statement timeout, and registered with the active
+    QueryScope.
+    """
+    target = replica_router.pick(host)
+    start = time.perf_counter()
+    try:
+        connection = psycopg2.connect(
+            **connect_kwargs(target, database, user, password)
+        )
+    except Error as error:
+        if target == host:
+            raise
+        replica_router.record_failure(target)
+        logger.warning(f"Read replica {target} unavailable, using the primary: {error}")
+        target = host
+        connection = psycopg2.connect(**connect_kwargs(host, database, user, password))
+    if target != host:
+        replica_router.record(target, time.perf_counter() - start)
+
+    scope = active_queries.get()
+    if scope is not None:
+        try:
+            scope.add(connection.cancel)
+        except QueryCancelledError:
+            connection.close()
+            raise
+    return connection
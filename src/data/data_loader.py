@@ -1,17 +1,15 @@
 import os
 from io import StringIO
 
-import numpy as np
 import pandas as pd
 import psycopg2
-from fastapi import FastAPI, File, HTTPException, Request, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import File, HTTPException, UploadFile
 from loguru import logger
 from opentelemetry import trace
 from psycopg2 import Error
-from sklearn.compose import make_column_selector, make_column_transformer
-from sklearn.metrics import mean_absolute_error
-from sklearn.preprocessing import FunctionTransformer, OrdinalEncoder, TargetEncoder
+from psycopg2.errors import QueryCanceled
+
+from src.data.connections import QueryCancelledError, connect_for_read
 
 tracer = trace.get_tracer("application.tracer")
 
@@ -22,6 +20,22 @@ DEFAULT_DB_PASSWORD = "password"
 DEFAULT_SCHEMA_NAME = "application"
 DEFAULT_TABLE_NAME = "feature"
 DEFAULT_TIME_COLUMN = "date_time"
+# Let the database return a sorted, deduplicated, gap-filled hourly series
+DB_RESAMPLE_HOURLY = os.getenv("DB_RESAMPLE_HOURLY", "false").lower() == "true"
+TARGET_COLUMN = "users"
+# Raw rows per hour returned by the hourly query, for validate_data
+RAW_ROWS_COLUMN = "_raw_rows"
+# Summary table kept by src/data/summary.py; when set, /data-range reads it
+# instead of scanning the raw table
+DB_SUMMARY_TABLE = os.getenv("DB_SUMMARY_TABLE", "")
+# Feature store columns (see src/data/feature_store.py) that load_data_from_db
+# joins to the raw ones, e.g. "hour,day_of_week". Only calendar columns are
+# known ahead for the forecast horizon.
+FEATURE_STORE_COLUMNS = [
+    name.strip()
+    for name in os.getenv("FEATURE_STORE_COLUMNS", "").split(",")
+    if name.strip()
+]
 
 
 def get_db_connection_params():
@@ -40,6 +54,23 @@ def get_db_connection_params():
     return host, database, user, password, schema_name, table_name, time_column
 
 
+def _read_summary_range(connection, cursor, schema_name, table_name):
+    try:
+        cursor.execute(
+            f'SELECT min_time, max_time FROM "{schema_name}"."{DB_SUMMARY_TABLE}" '
+            "WHERE source_table = %s;",
+            (table_name,),
+        )
+        result = cursor.fetchone()
+    except Error as error:
+        connection.rollback()
+        logger.warning(f"Summary table unavailable, scanning instead: {error}")
+        return None
+    if result is None:
+        logger.warning(f"No summary row for {table_name}, scanning instead.")
+    return result
+
+
 def get_min_max_time_from_db():
     # Retrieve parameters using the new helper function
     host, database, user, password, schema_name, table_name, time_column = (
@@ -55,19 +86,22 @@ def get_min_max_time_from_db():
     )
 
     try:
-        connection = psycopg2.connect(
-            user=user, password=password, host=host, port="5432", database=database
-        )
+        connection = connect_for_read(host, database, user, password)
         logger.info("Successfully connected to PostgreSQL for min/max time retrieval.")
 
         cursor = connection.cursor()
 
-        sql_query = f'SELECT MIN("{time_column}"), MAX("{time_column}") FROM "{schema_name}"."{table_name}";'
+        result = None
+        if DB_SUMMARY_TABLE:
+            result = _read_summary_range(connection, cursor, schema_name, table_name)
 
-        logger.debug(f"Executing min/max query: {sql_query}")
+        if result is None:
+            sql_query = f'SELECT MIN("{time_column}"), MAX("{time_column}") FROM "{schema_name}"."{table_name}";'
 
-        cursor.execute(sql_query)
-        result = cursor.fetchone()
+            logger.debug(f"Executing min/max query: {sql_query}")
+
+            cursor.execute(sql_query)
+            result = cursor.fetchone()
 
         if result:
             min_time_raw, max_time_raw = result
@@ -116,9 +150,7 @@ def get_data_as_dataframe_filtered(
     )
 
     try:
-        connection = psycopg2.connect(
-            user=user, password=password, host=host, port="5432", database=database
-        )
+        connection = connect_for_read(host, database, user, password)
         logger.info("Successfully connected to PostgreSQL.")
 
         sql_query = f'SELECT {columns_to_select} FROM "{schema_name}"."{table_name}"'
@@ -161,6 +193,10 @@ def get_data_as_dataframe_filtered(
 
         return df
 
+    except (QueryCanceled, QueryCancelledError):
+        # Statement timeout or client disconnect, not an empty range
+        raise
+
     except (Exception, Error) as error:
         logger.error(f"Error during data retrieval from PostgreSQL: {error}")
         return None
@@ -171,6 +207,159 @@ def get_data_as_dataframe_filtered(
             logger.info("PostgreSQL connection closed.")
 
 
+_timescaledb_available = {}
+
+
+def has_timescaledb(cursor, database: str) -> bool:
+    """Whether the TimescaleDB extension is installed (cached per database)."""
+    if database not in _timescaledb_available:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb';")
+        _timescaledb_available[database] = cursor.fetchone() is not None
+    return _timescaledb_available[database]
+
+
+def build_hourly_query(
+    schema_name, table_name, time_column, columns, timescale, bounded=True
+):
+    """
+    SQL returning one row per hour between the first and the last row in
+    [%s, %s], like prepare_time_series_data: the first row of each hour is
+    kept, missing users are 0 and other columns carry the last known value
+    forward. With `timescale`, time_bucket_gapfill/locf do the work and the
+    query takes the bounds twice (gap-fill range, then filter). A
+    RAW_ROWS_COLUMN column counts the raw rows of each hour (NULL for hours
+    that were filled).
+    """
+    table = f'"{schema_name}"."{table_name}"'
+    time = f'"{time_column}"'
+    values = [column for column in columns if column != time_column]
+    where = f" WHERE {time} >= %s AND {time} <= %s" if bounded else ""
+
+    if timescale:
+        aggregates = [
+            (
+                f'COALESCE(first("{column}", {time}), 0) AS "{column}"'
+                if column == TARGET_COLUMN
+                else f'locf(first("{column}", {time}), treat_null_as_missing => true) '
+                f'AS "{column}"'
+            )
+            for column in values
+        ]
+        selected = ", ".join(f'"{column}"' for column in values)
+        return (
+            f'SELECT {time}, {selected}, n_rows AS "{RAW_ROWS_COLUMN}" FROM ('
+            f"SELECT g.*, "
+            f"MIN(CASE WHEN g.n_rows IS NOT NULL THEN g.{time} END) OVER () AS first_bucket, "
+            f"MAX(CASE WHEN g.n_rows IS NOT NULL THEN g.{time} END) OVER () AS last_bucket "
+            f"FROM (SELECT time_bucket_gapfill('1 hour', {time}, "
+            f"%s::timestamptz, %s::timestamptz) AS {time}, COUNT(*) AS n_rows, "
+            f"{', '.join(aggregates)} FROM {table}{where} GROUP BY 1) g"
+            f") buckets WHERE {time} BETWEEN first_bucket AND last_bucket "
+            f"ORDER BY {time};"
+        )
+
+    # Plain PostgreSQL: DISTINCT ON for dedup, generate_series for the gaps,
+    # and a running count of non-null values to group rows for the fill
+    bucket = f"date_trunc('hour', {time} AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+    filled = [
+        (
+            f'COALESCE("{column}", 0) AS "{column}"'
+            if column == TARGET_COLUMN
+            else f'FIRST_VALUE("{column}") OVER (PARTITION BY "{column}__group" '
+            f'ORDER BY bucket) AS "{column}"'
+        )
+        for column in values
+    ]
+    groups = [
+        f'COUNT(d."{column}") OVER (ORDER BY b.bucket) AS "{column}__group"'
+        for column in values
+        if column != TARGET_COLUMN
+    ]
+    raw_rows = f'"{RAW_ROWS_COLUMN}"'
+    joined = ", ".join(
+        [f'd."{column}"' for column in values] + [f"d.{raw_rows}"] + groups
+    )
+    return (
+        f"WITH dedup AS (SELECT DISTINCT ON (bucket) * FROM "
+        f"(SELECT {bucket} AS bucket, COUNT(*) OVER (PARTITION BY {bucket}) "
+        f"AS {raw_rows}, * FROM {table}{where}) source "
+        f"ORDER BY bucket, {time}), "
+        f"joined AS (SELECT b.bucket, {joined} FROM generate_series("
+        f"(SELECT MIN(bucket) FROM dedup), (SELECT MAX(bucket) FROM dedup), "
+        f"interval '1 hour') AS b(bucket) LEFT JOIN dedup d USING (bucket)) "
+        f"SELECT bucket AS {time}, {', '.join(filled)}, {raw_rows} "
+        f"FROM joined ORDER BY bucket;"
+    )
+
+
+def keep_raw_counts(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Moves the RAW_ROWS_COLUMN of an hourly query result to `data.attrs` as
+    the raw row and hour counts, which validate_data checks for gaps.
+    """
+    if RAW_ROWS_COLUMN in data:
+        raw_rows = data.pop(RAW_ROWS_COLUMN)
+        data.attrs["raw_rows"] = int(raw_rows.sum())
+        data.attrs["raw_hours"] = int(raw_rows.notna().sum())
+    return data
+
+
+def get_hourly_data_from_db(
+    host,
+    database,
+    user,
+    password,
+    schema_name,
+    table_name,
+    time_column="date_time",
+    start_time=None,
+    stop_time=None,
+):
+    """
+    Same as get_data_as_dataframe_filtered, but sorting, deduplication and
+    hourly gap-filling run in the database (see build_hourly_query).
+    """
+    connection = None
+    try:
+        connection = connect_for_read(host, database, user, password)
+        cursor = connection.cursor()
+        cursor.execute(f'SELECT * FROM "{schema_name}"."{table_name}" LIMIT 0;')
+        columns = [desc[0] for desc in cursor.description]
+
+        bounded = start_time is not None and stop_time is not None
+        timescale = bounded and has_timescaledb(cursor, database)
+        sql_query = build_hourly_query(
+            schema_name, table_name, time_column, columns, timescale, bounded
+        )
+        query_params = (start_time, stop_time) if bounded else ()
+        if timescale:
+            query_params = query_params * 2
+        logger.debug(f"Executing hourly query: {sql_query} with params: {query_params}")
+
+        with tracer.start_as_current_span("hourly-query") as span:
+            span.set_attribute("timescaledb", timescale)
+            cursor.execute(sql_query, query_params)
+            data = cursor.fetchall()
+        column_names = [desc[0] for desc in cursor.description]
+        df = pd.DataFrame(data, columns=column_names)
+        if not df.empty:
+            df = df.set_index(time_column)
+            df.index = pd.to_datetime(df.index, utc=True)
+            logger.info(f"Retrieved {len(df)} hourly rows (resampled in the database).")
+        return keep_raw_counts(df)
+
+    except (QueryCanceled, QueryCancelledError):
+        raise
+
+    except (Exception, Error) as error:
+        logger.error(f"Error during hourly data retrieval from PostgreSQL: {error}")
+        return None
+
+    finally:
+        if connection:
+            connection.close()
+
+
 def load_data_from_db(start_time, stop_time):
     with tracer.start_as_current_span("load-data-from-db"):
         logger.info(
@@ -183,17 +372,35 @@ def load_data_from_db(start_time, stop_time):
             get_db_connection_params()
         )
 
-        data = get_data_as_dataframe_filtered(
-            host=host,
-            database=database,
-            user=user,
-            password=password,
-            schema_name=schema_name,
-            table_name=table_name,
-            time_column=time_column,
-            start_time=start_time,
-            stop_time=stop_time,
-        )
+        if FEATURE_STORE_COLUMNS:
+            # Imported here: the feature store module builds on this one
+            from src.data.feature_store import load_data_with_store_features
+
+            data = load_data_with_store_features(start_time, stop_time)
+        else:
+            # Imported here: the parallel loader builds on this module
+            from src.data.parallel_loader import (
+                get_data_as_dataframe_parallel,
+                should_load_in_parallel,
+            )
+
+            if DB_RESAMPLE_HOURLY:
+                loader = get_hourly_data_from_db
+            elif should_load_in_parallel(start_time, stop_time):
+                loader = get_data_as_dataframe_parallel
+            else:
+                loader = get_data_as_dataframe_filtered
+            data = loader(
+                host=host,
+                database=database,
+                user=user,
+                password=password,
+                schema_name=schema_name,
+                table_name=table_name,
+                time_column=time_column,
+                start_time=start_time,
+                stop_time=stop_time,
+            )
 
         if data is None or data.empty:
             logger.error(
@@ -266,19 +473,10 @@ def load_data_from_csv(file: UploadFile = File(...)):
 
 
 def create_encoder():
-    ordinal_encoder = make_column_transformer(
-        (
-            OrdinalEncoder(
-                handle_unknown="use_encoded_value",
-                unknown_value=-1,
-                encoded_missing_value=-1,
-            ),
-            make_column_selector(dtype_exclude=np.number),
-        ),
-        remainder="passthrough",
-        verbose_feature_names_out=False,
-    ).set_output(transform="pandas")
-    return ordinal_encoder
+    # Imported here so that loading data does not pull in the ML stack
+    from src.data.categorical import CategoricalCodec
+
+    return CategoricalCodec()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,294 @@
+"""
+Materialized feature store.
+
+Calendar features (hour of day, day of week, weekend and holiday flags),
+lagged users and rolling means of users are computed once per hour of data
+and kept in a companion hypertable (FEATURE_STORE_TABLE, next to the raw
+table). Requests join the calendar columns to the raw rows as exog
+(FEATURE_STORE_COLUMNS) instead of recomputing them. The lag and rolling
+columns are materialized for reporting only: they are not known over the
+forecast horizon, so they can't be exog, and the forecaster builds its own
+lags and window features.
+
+materialize_features is incremental: it only computes hours after the
+latest materialized one. To do that, it reads back just enough raw history
+to fill the longest lag or window. Run it on a schedule as
+`python -m src.data.feature_store` (see the feature-materializer CronJob
+in the application chart).
+
+Rolling means follow the window features of the forecaster: the mean for
+hour t covers the `window` hours before t, never t itself.
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+import pandas as pd
+import psycopg2
+from loguru import logger
+from opentelemetry import trace
+from psycopg2.extras import execute_values
+
+from src.data.connections import connect_for_read
+from src.data.data_loader import FEATURE_STORE_COLUMNS, get_db_connection_params
+from src.data.preprocessing import prepare_time_series_data
+
+tracer = trace.get_tracer("application.tracer")
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+FEATURE_STORE_TABLE = os.getenv("FEATURE_STORE_TABLE", "feature_store")
+FEATURE_STORE_LAGS = _int_list(os.getenv("FEATURE_STORE_LAGS", "1,24,168"))
+FEATURE_STORE_WINDOWS = _int_list(os.getenv("FEATURE_STORE_WINDOWS", "24,72,168"))
+CALENDAR_COLUMNS = ["hour", "day_of_week", "is_weekend", "is_holiday"]
+UPSERT_PAGE_SIZE = 1000
+
+
+def feature_columns(lags: List[int], windows: List[int]) -> List[str]:
+    return (
+        CALENDAR_COLUMNS
+        + [f"users_lag_{lag}" for lag in lags]
+        + [f"users_rolling_mean_{window}" for window in windows]
+    )
+
+
+def compute_features(
+    data: pd.DataFrame,
+    lags: List[int] = FEATURE_STORE_LAGS,
+    windows: List[int] = FEATURE_STORE_WINDOWS,
+) -> pd.DataFrame:
+    """
+    Features of every hour of `data`, an hourly frame (as returned by
+    prepare_time_series_data) with a 'users' column and optionally a
+    'holiday' column.
+    """
+    index = data.index
+    users = data["users"].astype(float)
+    features = pd.DataFrame(index=index)
+    features["hour"] = index.hour.astype("int16")
+    features["day_of_week"] = index.dayofweek.astype("int16")
+    features["is_weekend"] = index.dayofweek >= 5
+    holiday = data["holiday"] if "holiday" in data.columns else 0.0
+    features["is_holiday"] = pd.Series(holiday, index=index).fillna(0) > 0
+    for lag in lags:
+        features[f"users_lag_{lag}"] = users.shift(lag)
+    previous = users.shift(1)
+    for window in windows:
+        features[f"users_rolling_mean_{window}"] = previous.rolling(
+            window, min_periods=window
+        ).mean()
+    return features
+
+
+def incremental_features(
+    raw: pd.DataFrame,
+    watermark: Optional[pd.Timestamp],
+    lags: List[int] = FEATURE_STORE_LAGS,
+    windows: List[int] = FEATURE_STORE_WINDOWS,
+) -> pd.DataFrame:
+    """
+    Features of the hours of `raw` after `watermark`. `raw` must start at
+    least max(lags + windows) hours before the watermark.
+    """
+    if raw.empty:
+        return pd.DataFrame(columns=feature_columns(lags, windows))
+    features = compute_features(prepare_time_series_data(raw), lags, windows)
+    if watermark is not None:
+        features = features[features.index > watermark]
+    return features
+
+
+def _context_hours(lags: List[int], windows: List[int]) -> int:
+    return max(lags + windows + [0])
+
+
+def _qualified(schema_name: str, table_name: str) -> str:
+    return f'"{schema_name}"."{table_name}"'
+
+
+def ensure_feature_store(cursor, schema_name: str, lags, windows):
+    """Creates the store hypertable (and any new lag/window column) if missing."""
+    store = _qualified(schema_name, FEATURE_STORE_TABLE)
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {store} ("
+        "date_time timestamptz PRIMARY KEY, "
+        "hour smallint NOT NULL, "
+        "day_of_week smallint NOT NULL, "
+        "is_weekend boolean NOT NULL, "
+        "is_holiday boolean NOT NULL, "
+        "materialized_at timestamptz NOT NULL DEFAULT now());"
+    )
+    for column in feature_columns(lags, windows)[len(CALENDAR_COLUMNS) :]:
+        cursor.execute(
+            f'ALTER TABLE {store} ADD COLUMN IF NOT EXISTS "{column}" float4;'
+        )
+    cursor.execute(
+        "SELECT create_hypertable(%s, 'date_time', if_not_exists => TRUE, "
+        "migrate_data => TRUE);",
+        (f"{schema_name}.{FEATURE_STORE_TABLE}",),
+    )
+
+
+def _upsert(cursor, schema_name: str, features: pd.DataFrame) -> int:
+    columns = list(features.columns)
+    quoted = ", ".join(f'"{column}"' for column in ["date_time"] + columns)
+    updates = ", ".join(f'"{column}" = EXCLUDED."{column}"' for column in columns)
+    rows = [
+        (timestamp.to_pydatetime(), *[None if pd.isna(v) else v for v in values])
+        for timestamp, values in zip(
+            features.index, features.astype(object).itertuples(index=False)
+        )
+    ]
+    execute_values(
+        cursor,
+        f"INSERT INTO {_qualified(schema_name, FEATURE_STORE_TABLE)} ({quoted}) "
+        f"VALUES %s ON CONFLICT (date_time) DO UPDATE SET {updates}, "
+        "materialized_at = now();",
+        rows,
+        page_size=UPSERT_PAGE_SIZE,
+    )
+    return len(rows)
+
+
+def materialize_features(
+    since: Optional[str] = None,
+    lags: List[int] = FEATURE_STORE_LAGS,
+    windows: List[int] = FEATURE_STORE_WINDOWS,
+) -> int:
+    """
+    Computes and upserts the features of every raw hour after the latest
+    materialized hour, or after `since` to rebuild a range (e.g. after a
+    backfill). Returns the number of hours written.
+    """
+    host, database, user, password, schema_name, table_name, time_column = (
+        get_db_connection_params()
+    )
+    with tracer.start_as_current_span("materialize-features") as span:
+        connection = psycopg2.connect(
+            user=user, password=password, host=host, port="5432", database=database
+        )
+        try:
+            cursor = connection.cursor()
+            ensure_feature_store(cursor, schema_name, lags, windows)
+
+            if since is not None:
+                watermark = pd.to_datetime(since, utc=True)
+            else:
+                cursor.execute(
+                    "SELECT MAX(date_time) FROM "
+                    f"{_qualified(schema_name, FEATURE_STORE_TABLE)};"
+                )
+                latest = cursor.fetchone()[0]
+                watermark = pd.to_datetime(latest, utc=True) if latest else None
+
+            sql_query = (
+                f'SELECT "{time_column}", users, holiday '
+                f"FROM {_qualified(schema_name, table_name)}"
+            )
+            params = ()
+            if watermark is not None:
+                context_start = watermark - pd.Timedelta(
+                    hours=_context_hours(lags, windows)
+                )
+                sql_query += f' WHERE "{time_column}" > %s'
+                params = (context_start.to_pydatetime(),)
+            cursor.execute(sql_query + ";", params)
+            raw = pd.DataFrame(
+                cursor.fetchall(), columns=["date_time", "users", "holiday"]
+            ).set_index("date_time")
+            raw.index = pd.to_datetime(raw.index, utc=True)
+
+            features = incremental_features(raw, watermark, lags, windows)
+            written = _upsert(cursor, schema_name, features) if len(features) else 0
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+        span.set_attribute("rows_written", written)
+        logger.info(
+            "Features materialized.",
+            rows=written,
+            watermark=str(watermark) if watermark is not None else None,
+        )
+        return written
+
+
+def build_store_query(schema_name, table_name, time_column, columns) -> str:
+    """
+    SQL joining the store `columns` to the raw rows in [%s, %s]. Only
+    calendar columns can be joined: as exog, lagged users and rolling means
+    would leak the target.
+    """
+    unknown = set(columns) - set(
+        feature_columns(FEATURE_STORE_LAGS, FEATURE_STORE_WINDOWS)
+    )
+    if unknown:
+        raise ValueError(f"Unknown feature store columns: {sorted(unknown)}")
+    not_calendar = [column for column in columns if column not in CALENDAR_COLUMNS]
+    if not_calendar:
+        raise ValueError(
+            f"Feature store columns {not_calendar} are not known over the "
+            f"forecast horizon; only {CALENDAR_COLUMNS} can be loaded as exog"
+        )
+    selected = ", ".join(f's."{column}"' for column in columns)
+    return (
+        f"SELECT r.*, {selected} FROM {_qualified(schema_name, table_name)} r "
+        f"LEFT JOIN {_qualified(schema_name, FEATURE_STORE_TABLE)} s "
+        f'ON s.date_time = r."{time_column}" '
+        f'WHERE r."{time_column}" >= %s AND r."{time_column}" <= %s;'
+    )
+
+
+def load_data_with_store_features(
+    start_time, stop_time, columns: List[str] = FEATURE_STORE_COLUMNS
+) -> pd.DataFrame:
+    """
+    Raw rows of [start_time, stop_time] with the given feature store columns
+    joined in by the database. Hours not materialized yet have NULL features.
+    """
+    host, database, user, password, schema_name, table_name, time_column = (
+        get_db_connection_params()
+    )
+    with tracer.start_as_current_span("load-data-with-store-features") as span:
+        span.set_attribute("store_columns", len(columns))
+        sql_query = build_store_query(schema_name, table_name, time_column, columns)
+        connection = connect_for_read(host, database, user, password)
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql_query, (start_time, stop_time))
+            column_names = [desc[0] for desc in cursor.description]
+            data = pd.DataFrame(cursor.fetchall(), columns=column_names)
+        finally:
+            connection.close()
+
+        if data.empty:
+            return data
+        data = data.set_index(time_column)
+        data.index = pd.to_datetime(data.index, utc=True)
+        logger.info(f"Loaded {len(data)} rows with {len(columns)} stored features.")
+        return data
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Materialize engineered features into the feature store."
+    )
+    parser.add_argument(
+        "--since",
+        help="Recompute every hour after this timestamp instead of only new ones",
+    )
+    args = parser.parse_args(argv)
+    materialize_features(since=args.since)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Parallel range loading.
+
+A long [start_time, stop_time] window is split at the chunk boundaries of
+the hypertable (or at epoch-aligned PARALLEL_CHUNK_HOURS intervals when the
+table is not a hypertable). The sub-ranges are fetched concurrently, each on
+its own pooled connection and so by its own backend process. They are
+disjoint and each comes back sorted, so their rows are chained in order and
+turned into a DataFrame once, as the single-query loader does.
+
+load_data_from_db switches to this loader for windows of at least
+DB_PARALLEL_MIN_HOURS when DB_PARALLEL_WORKERS is set above 1 (the default
+is 1, i.e. off).
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import List, Optional, Tuple
+
+import pandas as pd
+from loguru import logger
+from opentelemetry import trace
+from psycopg2 import Error
+from psycopg2.errors import QueryCanceled
+from psycopg2.pool import ThreadedConnectionPool
+
+from src.data.connections import (
+    QueryCancelledError,
+    active_queries,
+    connect_kwargs,
+    replica_router,
+)
+from src.data.data_loader import has_timescaledb
+
+tracer = trace.get_tracer("application.tracer")
+
+# Opt-in: 1 loads every window with a single query
+DB_PARALLEL_WORKERS = int(os.getenv("DB_PARALLEL_WORKERS", "1"))
+# Shorter windows are loaded with a single query
+DB_PARALLEL_MIN_HOURS = int(os.getenv("DB_PARALLEL_MIN_HOURS", str(24 * 90)))
+# Connections shared by all parallel loads of the process
+DB_PARALLEL_POOL_SIZE = int(os.getenv("DB_PARALLEL_POOL_SIZE", "8"))
+# TimescaleDB's default chunk interval
+PARALLEL_CHUNK_HOURS = int(os.getenv("PARALLEL_CHUNK_HOURS", "168"))
+
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """ThreadedConnectionPool that waits for a free connection instead of raising."""
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        self._slots = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        self._slots.acquire()
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(host: str, database: str, user: str, password: str):
+    key = (host, database, user)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = BlockingConnectionPool(
+                1,
+                DB_PARALLEL_POOL_SIZE,
+                **connect_kwargs(host, database, user, password),
+            )
+        return _pools[key]
+
+
+def close_pools():
+    with _pools_lock:
+        while _pools:
+            _, pool = _pools.popitem()
+            pool.closeall()
+
+
+def should_load_in_parallel(start_time, stop_time) -> bool:
+    if DB_PARALLEL_WORKERS < 2 or start_time is None or stop_time is None:
+        return False
+    span = pd.to_datetime(stop_time, utc=True) - pd.to_datetime(start_time, utc=True)
+    return span >= pd.Timedelta(hours=DB_PARALLEL_MIN_HOURS)
+
+
+def fixed_boundaries(
+    start: pd.Timestamp, stop: pd.Timestamp, hours: int = PARALLEL_CHUNK_HOURS
+) -> List[pd.Timestamp]:
+    """Multiples of `hours` since the epoch strictly inside (start, stop)."""
+    interval = pd.Timedelta(hours=hours)
+    first = start.floor(interval) + interval
+    return [
+        bound for bound in pd.date_range(first, stop, freq=interval) if bound < stop
+    ]
+
+
+def chunk_boundaries(cursor, schema_name, table_name, start, stop):
+    """
+    Start times of the hypertable chunks strictly inside (start, stop), or
+    None when the table is not a hypertable.
+    """
+    cursor.execute(
+        "SELECT 1 FROM timescaledb_information.hypertables "
+        "WHERE hypertable_schema = %s AND hypertable_name = %s;",
+        (schema_name, table_name),
+    )
+    if cursor.fetchone() is None:
+        return None
+    cursor.execute(
+        "SELECT range_start FROM timescaledb_information.chunks "
+        "WHERE hypertable_schema = %s AND hypertable_name = %s "
+        "AND range_start > %s AND range_start < %s ORDER BY range_start;",
+        (schema_name, table_name, start.to_pydatetime(), stop.to_pydatetime()),
+    )
+    return [pd.Timestamp(row[0]).tz_convert("UTC") for row in cursor.fetchall()]
+
+
+def partition_ranges(
+    start: pd.Timestamp, stop: pd.Timestamp, boundaries: List[pd.Timestamp]
+) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """[start, b1), [b1, b2), ... [bn, stop]; the last range includes stop."""
+    edges = [start] + list(boundaries) + [stop]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _fetch_range(pool, sql_query, params, scope):
+    connection = pool.getconn()
+    failed = False
+    try:
+        if scope is not None:
+            scope.add(connection.cancel)
+        cursor = connection.cursor()
+        cursor.execute(sql_query, params)
+        columns = [desc[0] for desc in cursor.description]
+        rows = cursor.fetchall()
+        connection.rollback()
+        return columns, rows
+    except Exception:
+        failed = True
+        raise
+    finally:
+        if scope is not None:
+            scope.discard(connection.cancel)
+        pool.putconn(connection, close=failed)
+
+
+def get_data_as_dataframe_parallel(
+    host,
+    database,
+    user,
+    password,
+    schema_name,
+    table_name,
+    time_column="date_time",
+    start_time=None,
+    stop_time=None,
+    workers: int = DB_PARALLEL_WORKERS,
+) -> Optional[pd.DataFrame]:
+    """
+    Same as get_data_as_dataframe_filtered (both bounds required), with the
+    window fetched as concurrent partition-aligned sub-range queries.
+    """
+    start = pd.to_datetime(start_time, utc=True)
+    stop = pd.to_datetime(stop_time, utc=True)
+    # Worker threads do not inherit the request context; pass the scope along
+    scope = active_queries.get()
+    table = f'"{schema_name}"."{table_name}"'
+    time = f'"{time_column}"'
+
+    with tracer.start_as_current_span("parallel-range-load") as span:
+        try:
+            target = replica_router.pick(host)
+            try:
+                pool = get_pool(target, database, user, password)
+            except Error as error:
+                if target == host:
+                    raise
+                replica_router.record_failure(target)
+                logger.warning(f"Read replica {target} unavailable: {error}")
+                pool = get_pool(host, database, user, password)
+
+            connection = pool.getconn()
+            try:
+                cursor = connection.cursor()
+                boundaries = None
+                if has_timescaledb(cursor, database):
+                    boundaries = chunk_boundaries(
+                        cursor, schema_name, table_name, start, stop
+                    )
+                hypertable = boundaries is not None
+                if not hypertable:
+                    boundaries = fixed_boundaries(start, stop)
+                connection.rollback()
+            finally:
+                pool.putconn(connection)
+
+            ranges = partition_ranges(start, stop, boundaries)
+            span.set_attribute("ranges", len(ranges))
+            span.set_attribute("hypertable", hypertable)
+            queries = [
+                (
+                    f"SELECT * FROM {table} WHERE {time} >= %s AND {time} "
+                    f"{'<=' if last else '<'} %s ORDER BY {time};",
+                    (lo.to_pydatetime(), hi.to_pydatetime()),
+                )
+                for (lo, hi), last in zip(ranges, [False] * (len(ranges) - 1) + [True])
+            ]
+            with ThreadPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+                pieces = list(
+                    executor.map(
+                        lambda query: _fetch_range(pool, *query, scope), queries
+                    )
+                )
+
+            columns = pieces[0][0]
+            df = pd.DataFrame(
+                list(chain.from_iterable(rows for _, rows in pieces)), columns=columns
+            )
+            if not df.empty:
+                df = df.set_index(time_column)
+                df.index = pd.to_datetime(df.index, utc=True)
+            span.set_attribute("rows", len(df))
+            logger.info(
+                f"Retrieved {len(df)} rows with {len(ranges)} parallel range queries."
+            )
+            return df
+
+        except (QueryCanceled, QueryCancelledError):
+            raise
+
+        except (Exception, Error) as error:
+            logger.error(
+                f"Error during parallel data retrieval from PostgreSQL: {error}"
+            )
+            return None
@@ -1,23 +1,7 @@
-import os
-import sys
-from typing import Any, Dict, List, Optional, Tuple, Union
-
+import numpy as np
 import pandas as pd
-from fastapi import UploadFile
-from lightgbm import LGBMRegressor
+from loguru import logger
 from opentelemetry import trace
-from optuna.trial import Trial
-from skforecast.model_selection import (
-    TimeSeriesFold,
-    bayesian_search_forecaster,
-)
-from skforecast.preprocessing import RollingFeatures
-from skforecast.recursive import ForecasterRecursive
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from src.data.data_loader import *
-from src.model.forecast_model import *
 
 tracer = trace.get_tracer("application.tracer")
 
@@ -26,6 +10,7 @@ def combine_forecast_with_truth(
     predictions,
     exog_pred,
     data,
+    quantile_predictions=None,
 ):
     with tracer.start_as_current_span("combine-results"):
         future_index = exog_pred.index
@@ -43,6 +28,15 @@ def combine_forecast_with_truth(
         )
         forecast_df.set_index("date_time", inplace=True)
 
+        if quantile_predictions is not None:
+            # Rounded up like the point forecast, placed right after it
+            for position, column in enumerate(quantile_predictions.columns, start=1):
+                forecast_df.insert(
+                    position,
+                    column,
+                    np.ceil(quantile_predictions[column].to_numpy()).astype(int),
+                )
+
         # Combine with exogenous predictors for traceability
         forecast_df = pd.concat([forecast_df, exog_pred], axis=1)
 
@@ -1,23 +1,9 @@
 import os
-import sys
-from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
-from fastapi import UploadFile
-from lightgbm import LGBMRegressor
+from loguru import logger
 from opentelemetry import trace
-from optuna.trial import Trial
-from skforecast.model_selection import (
-    TimeSeriesFold,
-    bayesian_search_forecaster,
-)
-from skforecast.preprocessing import RollingFeatures
-from skforecast.recursive import ForecasterRecursive
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from src.data.data_loader import *
-from src.model.forecast_model import *
 
 tracer = trace.get_tracer("application.tracer")
 DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -27,6 +13,19 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "password")  # WARNING: Insecure for prod
 SCHEMA_NAME = os.getenv("DB_SCHEMA", "application")
 TABLE_NAME = os.getenv("DB_TABLE", "feature")
 TIME_COLUMN = "date_time"
+# Downcast prepared data (see compact_dtypes); false keeps float64/object
+COMPACT_DTYPES = os.getenv("COMPACT_DTYPES", "true").lower() == "true"
+# Known levels of the text columns, so their category codes do not depend on
+# which values a time window happens to contain
+CATEGORY_LEVELS = {"weather": ["clear", "mist", "rain"]}
+
+
+def is_hourly_series(index: pd.DatetimeIndex) -> bool:
+    """True for a UTC index of consecutive hours (sorted, unique, no gaps)."""
+    if len(index) == 0 or str(index.tz) != "UTC":
+        return False
+    steps = np.diff(index.values)
+    return bool((steps == np.timedelta64(1, "h")).all())
 
 
 def prepare_time_series_data(data):
@@ -38,19 +37,24 @@ def prepare_time_series_data(data):
             )
             data.index = pd.to_datetime(data.index, utc=True)
 
-        # 2. Sort the index
-        data = data.sort_index()
+        # Rows resampled by the database (DB_RESAMPLE_HOURLY) only need checking
+        if not is_hourly_series(data.index):
+            # 2. Sort the index
+            data = data.sort_index()
 
-        # 3. Handle duplicates
-        if not data.index.is_unique:
-            logger.warning("Duplicate timestamps found. Dropping duplicates.")
-            data = data[~data.index.duplicated(keep="first")]
+            # 3. Handle duplicates
+            if not data.index.is_unique:
+                logger.warning("Duplicate timestamps found. Dropping duplicates.")
+                data = data[~data.index.duplicated(keep="first")]
 
-        # 4. Resample to full hourly index
-        full_hourly_index = pd.date_range(
-            start=data.index.min(), end=data.index.max(), freq="h", tz="UTC"
-        )
-        data = data.reindex(full_hourly_index)
+            # 4. Resample to full hourly index
+            full_hourly_index = pd.date_range(
+                start=data.index.min(), end=data.index.max(), freq="h", tz="UTC"
+            )
+            data = data.reindex(full_hourly_index)
+        else:
+            # The fills below would otherwise write to the caller's frame
+            data = data.copy()
 
         # 5. Fill missing values
         if "users" in data.columns:
@@ -74,6 +78,50 @@ def prepare_time_series_data(data):
             logger.error("Could not infer frequency. Setting manually to 'h'.")
             data.index.freq = "h"
 
+        # 7. Compact dtypes
+        if COMPACT_DTYPES:
+            data = compact_dtypes(data)
+
+        return data
+
+
+def _compact_column(column: pd.Series) -> pd.Series:
+    if isinstance(column.dtype, pd.CategoricalDtype) or column.dtype == bool:
+        return column
+    if pd.api.types.is_numeric_dtype(column):
+        # Integral values (counts, flags) fit the smallest integer type
+        compact = pd.to_numeric(column, downcast="integer")
+        if compact.dtype.kind in "iu":
+            return compact
+        return column.astype(np.float32)
+    if pd.api.types.is_string_dtype(column):
+        known = CATEGORY_LEVELS.get(column.name, [])
+        extra = sorted(set(column.dropna().unique()) - set(known))
+        return column.astype(pd.CategoricalDtype(known + extra))
+    return column
+
+
+def compact_dtypes(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcasts the columns of `data` in place: integral numeric columns to the
+    smallest integer type, other numeric columns to float32 and text columns
+    to categoricals (CATEGORY_LEVELS first, then any other value, sorted).
+    The bytes saved are recorded on the span.
+    """
+    with tracer.start_as_current_span("compact-dtypes") as span:
+        bytes_before = int(data.memory_usage(deep=True).sum())
+        for col in data.columns:
+            data[col] = _compact_column(data[col])
+        bytes_after = int(data.memory_usage(deep=True).sum())
+
+        span.set_attribute("bytes_before", bytes_before)
+        span.set_attribute("bytes_after", bytes_after)
+        span.set_attribute("bytes_saved", bytes_before - bytes_after)
+        logger.info(
+            "Compacted dtypes.",
+            bytes_before=bytes_before,
+            bytes_after=bytes_after,
+        )
         return data
 
 
@@ -85,9 +133,11 @@ def extract_target_and_exog(data):
                 "The 'users' column is required but not found in the data."
             )
 
-        y = data["users"].copy()
-        exog = data.drop(columns=["users"]).copy()
-        exog_features = exog.columns.to_list()
+        # Views of the columns of `data`, not copies; DataFrame.drop would
+        # copy every column
+        y = data["users"]
+        exog_features = [col for col in data.columns if col != "users"]
+        exog = pd.DataFrame({col: data[col] for col in exog_features}, copy=False)
 
         span.set_attribute("num_features", len(exog_features))
         logger.info(f"Extracted {len(exog_features)} exogenous features.")
@@ -0,0 +1,273 @@
+"""
+Maintained summary of the raw feature table.
+
+One row per source table in DB_SUMMARY_TABLE holds the time range, the row
+count and per-column running aggregates (non-null count, sum, sum of
+squares, min, max). Null rates, means and standard deviations are derived
+from those aggregates. /data-range and /data-summary read that row in
+constant time instead of scanning the table.
+
+refresh_summary is incremental. It aggregates only the rows newer than
+the last refresh and merges them into the stored totals. Rows that arrive
+with older timestamps need `--full`, which rebuilds the summary from a
+full scan. Run it on a schedule as `python -m src.data.summary`.
+"""
+
+import argparse
+import json
+import math
+import sys
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import psycopg2
+from loguru import logger
+from opentelemetry import trace
+
+from src.data.connections import connect_for_read
+from src.data.data_loader import DB_SUMMARY_TABLE, get_db_connection_params
+
+tracer = trace.get_tracer("application.tracer")
+
+NUMERIC_TYPES = ("smallint", "integer", "bigint", "real", "double precision", "numeric")
+STAT_KEYS = ("non_null", "sum", "sum_sq", "min", "max")
+
+
+class SummaryNotConfiguredError(LookupError):
+    pass
+
+
+def _summary_table(schema_name: str) -> str:
+    if not DB_SUMMARY_TABLE:
+        raise SummaryNotConfiguredError("DB_SUMMARY_TABLE is not set.")
+    return f'"{schema_name}"."{DB_SUMMARY_TABLE}"'
+
+
+def ensure_summary_table(cursor, schema_name: str):
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {_summary_table(schema_name)} ("
+        "source_table text PRIMARY KEY, "
+        "min_time timestamptz, "
+        "max_time timestamptz, "
+        "row_count bigint NOT NULL, "
+        "columns jsonb NOT NULL, "
+        "refreshed_at timestamptz NOT NULL DEFAULT now());"
+    )
+
+
+def _column_types(cursor, schema_name: str, table_name: str, time_column: str):
+    cursor.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = %s AND table_name = %s ORDER BY ordinal_position;",
+        (schema_name, table_name),
+    )
+    return [(name, kind) for name, kind in cursor.fetchall() if name != time_column]
+
+
+def aggregate_rows(
+    cursor,
+    schema_name: str,
+    table_name: str,
+    time_column: str,
+    since: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """Aggregates of the rows after `since` (all rows when None), in one scan."""
+    columns = _column_types(cursor, schema_name, table_name, time_column)
+    time = f'"{time_column}"'
+    expressions = ["COUNT(*)", f"MIN({time})", f"MAX({time})"]
+    for name, kind in columns:
+        value = f'"{name}"::float8'
+        if kind in NUMERIC_TYPES:
+            expressions += [
+                f'COUNT("{name}")',
+                f"SUM({value})",
+                f"SUM({value} * {value})",
+                f"MIN({value})",
+                f"MAX({value})",
+            ]
+        else:
+            expressions.append(f'COUNT("{name}")')
+
+    sql_query = f'SELECT {", ".join(expressions)} FROM "{schema_name}"."{table_name}"'
+    params = ()
+    if since is not None:
+        sql_query += f" WHERE {time} > %s"
+        params = (since,)
+    cursor.execute(sql_query + ";", params)
+    values = list(cursor.fetchone())
+
+    row_count, min_time, max_time = values[:3]
+    position = 3
+    stats = {}
+    for name, kind in columns:
+        if kind in NUMERIC_TYPES:
+            stats[name] = dict(zip(STAT_KEYS, values[position : position + 5]))
+            position += 5
+        else:
+            stats[name] = {"non_null": values[position]}
+            position += 1
+    return {
+        "row_count": row_count,
+        "min_time": min_time,
+        "max_time": max_time,
+        "columns": stats,
+    }
+
+
+def _pick(function, a, b):
+    present = [value for value in (a, b) if value is not None]
+    return function(present) if present else None
+
+
+def merge_summaries(
+    old: Optional[Dict[str, Any]], new: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Totals of `old` plus the aggregates of newer rows in `new`."""
+    if old is None:
+        return new
+    columns = {}
+    for name in set(old["columns"]) | set(new["columns"]):
+        a = old["columns"].get(name, {})
+        b = new["columns"].get(name, {})
+        merged = {"non_null": (a.get("non_null") or 0) + (b.get("non_null") or 0)}
+        if "sum" in a or "sum" in b:
+            merged["sum"] = _pick(sum, a.get("sum"), b.get("sum"))
+            merged["sum_sq"] = _pick(sum, a.get("sum_sq"), b.get("sum_sq"))
+            merged["min"] = _pick(min, a.get("min"), b.get("min"))
+            merged["max"] = _pick(max, a.get("max"), b.get("max"))
+        columns[name] = merged
+    return {
+        "row_count": old["row_count"] + new["row_count"],
+        "min_time": _pick(min, old["min_time"], new["min_time"]),
+        "max_time": _pick(max, old["max_time"], new["max_time"]),
+        "columns": columns,
+    }
+
+
+def column_report(summary: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Null rate, and mean, std (ddof=1), min and max for numeric columns."""
+    row_count = summary["row_count"]
+    report = {}
+    for name, stats in summary["columns"].items():
+        non_null = stats.get("non_null") or 0
+        entry = {"null_rate": 1 - non_null / row_count if row_count else None}
+        if "sum" in stats:
+            mean = stats["sum"] / non_null if non_null else None
+            std = None
+            if non_null > 1:
+                variance = (stats["sum_sq"] - stats["sum"] * mean) / (non_null - 1)
+                std = math.sqrt(max(variance, 0.0))
+            entry.update(mean=mean, std=std, min=stats["min"], max=stats["max"])
+        report[name] = entry
+    return report
+
+
+def _read_row(cursor, schema_name: str, table_name: str) -> Optional[Dict[str, Any]]:
+    cursor.execute(
+        "SELECT row_count, min_time, max_time, columns, refreshed_at "
+        f"FROM {_summary_table(schema_name)} WHERE source_table = %s;",
+        (table_name,),
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    row_count, min_time, max_time, columns, refreshed_at = row
+    return {
+        "row_count": row_count,
+        "min_time": min_time,
+        "max_time": max_time,
+        "columns": columns,
+        "refreshed_at": refreshed_at,
+    }
+
+
+def refresh_summary(full: bool = False) -> Dict[str, Any]:
+    """Folds rows newer than the stored max_time into the summary (or rebuilds it)."""
+    host, database, user, password, schema_name, table_name, time_column = (
+        get_db_connection_params()
+    )
+    with tracer.start_as_current_span("refresh-summary") as span:
+        connection = psycopg2.connect(
+            user=user, password=password, host=host, port="5432", database=database
+        )
+        try:
+            cursor = connection.cursor()
+            ensure_summary_table(cursor, schema_name)
+            old = None if full else _read_row(cursor, schema_name, table_name)
+            since = old["max_time"] if old else None
+            new = aggregate_rows(cursor, schema_name, table_name, time_column, since)
+            summary = merge_summaries(old, new)
+            cursor.execute(
+                f"INSERT INTO {_summary_table(schema_name)} "
+                "(source_table, min_time, max_time, row_count, columns, refreshed_at) "
+                "VALUES (%s, %s, %s, %s, %s, now()) ON CONFLICT (source_table) "
+                "DO UPDATE SET min_time = EXCLUDED.min_time, "
+                "max_time = EXCLUDED.max_time, row_count = EXCLUDED.row_count, "
+                "columns = EXCLUDED.columns, refreshed_at = now();",
+                (
+                    table_name,
+                    summary["min_time"],
+                    summary["max_time"],
+                    summary["row_count"],
+                    json.dumps(summary["columns"]),
+                ),
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+        span.set_attribute("new_rows", new["row_count"])
+        span.set_attribute("full", full)
+        logger.info(
+            "Data summary refreshed.",
+            new_rows=new["row_count"],
+            row_count=summary["row_count"],
+            full=full,
+        )
+        return summary
+
+
+def get_data_summary() -> Dict[str, Any]:
+    """The stored summary with derived per-column statistics."""
+    host, database, user, password, schema_name, table_name, time_column = (
+        get_db_connection_params()
+    )
+    _summary_table(schema_name)
+    connection = connect_for_read(host, database, user, password)
+    try:
+        summary = _read_row(connection.cursor(), schema_name, table_name)
+    finally:
+        connection.close()
+    if summary is None:
+        raise SummaryNotConfiguredError(
+            f"No summary for {schema_name}.{table_name} yet; run src.data.summary."
+        )
+
+    def isoformat(value) -> Optional[str]:
+        return pd.Timestamp(value).tz_convert("UTC").isoformat() if value else None
+
+    return {
+        "table": f"{schema_name}.{table_name}",
+        "min_time": isoformat(summary["min_time"]),
+        "max_time": isoformat(summary["max_time"]),
+        "row_count": summary["row_count"],
+        "refreshed_at": isoformat(summary["refreshed_at"]),
+        "columns": column_report(summary),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Refresh the data summary table.")
+    parser.add_argument(
+        "--full", action="store_true", help="Rebuild from a full table scan"
+    )
+    args = parser.parse_args(argv)
+    refresh_summary(full=args.full)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
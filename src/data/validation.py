@@ -1,21 +1,223 @@
 import os
-import sys
+import time
+from typing import Any, Dict, List
 
+import numpy as np
+import pandas as pd
+from loguru import logger
 from opentelemetry import trace
-from optuna.trial import Trial
-from skforecast.model_selection import (
-    TimeSeriesFold,
-    bayesian_search_forecaster,
+
+tracer = trace.get_tracer("application.tracer")
+
+# Limits of validate_data, as fractions of the rows (or of the hours spanned)
+VALIDATION_MAX_MISSING_RATIO = float(os.getenv("VALIDATION_MAX_MISSING_RATIO", "0.25"))
+VALIDATION_MAX_GAP_RATIO = float(os.getenv("VALIDATION_MAX_GAP_RATIO", "0.25"))
+VALIDATION_MAX_DUPLICATE_RATIO = float(
+    os.getenv("VALIDATION_MAX_DUPLICATE_RATIO", "0.05")
 )
-from skforecast.preprocessing import RollingFeatures
-from skforecast.recursive import ForecasterRecursive
+REQUIRED_COLUMNS = ("users",)
+# Plausible (min, max) of the columns that have one; None is unbounded
+VALUE_RANGES = {
+    "users": (0, None),
+    "holiday": (0, 1),
+    "hum": (0, 100),
+    "windspeed": (0, None),
+}
+HOUR_NS = 3600 * 10**9
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.data.data_loader import *
-from src.model.forecast_model import *
+class DataValidationError(ValueError):
+    """Raised by validate_data with every failed check."""
 
-tracer = trace.get_tracer("application.tracer")
+    def __init__(self, failures: List[Dict[str, Any]]):
+        self.failures = failures
+        super().__init__(
+            "Data validation failed: "
+            + "; ".join(failure["message"] for failure in failures)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"message": "Data validation failed.", "failures": self.failures}
+
+
+def _failure(check: str, message: str, **details) -> Dict[str, Any]:
+    return {"check": check, "message": message, **details}
+
+
+def _profile(data: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Index statistics shared by the checks, computed once. For rows already
+    resampled to gap-free hours by the database (DB_RESAMPLE_HOURLY), the
+    raw row and hour counts it recorded in `data.attrs` are used instead.
+    """
+    if "raw_rows" in data.attrs:
+        return {
+            "rows": data.attrs["raw_rows"],
+            "unique": data.attrs["raw_hours"],
+            "hours": len(data),
+        }
+    stamps = data.index.asi8
+    if not data.index.is_monotonic_increasing:
+        stamps = np.sort(stamps)
+    unique = int(np.count_nonzero(np.diff(stamps))) + 1 if len(stamps) else 0
+    hours = int((stamps[-1] - stamps[0]) // HOUR_NS) + 1 if len(stamps) else 0
+    return {"rows": len(stamps), "unique": unique, "hours": hours}
+
+
+def _check_schema(data):
+    failures = [
+        _failure("schema", f"Missing required column '{col}'.", column=col)
+        for col in REQUIRED_COLUMNS
+        if col not in data.columns
+    ]
+    if not isinstance(data.index, pd.DatetimeIndex):
+        failures.append(_failure("schema", "The index must be timestamps."))
+    for col in VALUE_RANGES:
+        if col in data.columns and not pd.api.types.is_numeric_dtype(data[col]):
+            failures.append(
+                _failure("schema", f"Column '{col}' must be numeric.", column=col)
+            )
+    return failures
+
+
+def _check_rows(data, profile, min_rows):
+    if profile["hours"] < min_rows:
+        return [
+            _failure(
+                "rows",
+                f"The data spans {profile['hours']} hours; at least {min_rows} "
+                "are needed for forecasting and validation.",
+                value=profile["hours"],
+                limit=min_rows,
+            )
+        ]
+    return []
+
+
+def _check_duplicates(data, profile, min_rows):
+    ratio = 1 - profile["unique"] / profile["rows"]
+    if ratio > VALIDATION_MAX_DUPLICATE_RATIO:
+        return [
+            _failure(
+                "duplicates",
+                f"{ratio:.1%} of the timestamps are duplicates.",
+                value=round(ratio, 4),
+                limit=VALIDATION_MAX_DUPLICATE_RATIO,
+            )
+        ]
+    return []
+
+
+def _check_gaps(data, profile, min_rows):
+    ratio = max(1 - profile["unique"] / profile["hours"], 0.0)
+    if ratio > VALIDATION_MAX_GAP_RATIO:
+        return [
+            _failure(
+                "gaps",
+                f"{ratio:.1%} of the hours between the first and last "
+                "timestamps are missing.",
+                value=round(ratio, 4),
+                limit=VALIDATION_MAX_GAP_RATIO,
+            )
+        ]
+    return []
+
+
+def _check_missing(data, profile, min_rows):
+    ratios = data.isna().mean()
+    return [
+        _failure(
+            "missing",
+            f"{ratio:.1%} of the values of '{col}' are missing.",
+            column=col,
+            value=round(float(ratio), 4),
+            limit=VALIDATION_MAX_MISSING_RATIO,
+        )
+        for col, ratio in ratios[ratios > VALIDATION_MAX_MISSING_RATIO].items()
+    ]
+
+
+def _check_ranges(data, profile, min_rows):
+    failures = []
+    for col, (low, high) in VALUE_RANGES.items():
+        if col not in data.columns or not pd.api.types.is_numeric_dtype(data[col]):
+            continue
+        values = data[col].to_numpy(dtype=float)
+        outside = np.zeros(len(values), dtype=bool)
+        if low is not None:
+            outside |= values < low
+        if high is not None:
+            outside |= values > high
+        count = int(np.count_nonzero(outside))
+        if count:
+            failures.append(
+                _failure(
+                    "range",
+                    f"{count} values of '{col}' are outside [{low}, {high}].",
+                    column=col,
+                    value=count,
+                    limit=[low, high],
+                )
+            )
+    return failures
+
+
+def _check_constant(data, profile, min_rows):
+    if "users" not in data.columns or not pd.api.types.is_numeric_dtype(data["users"]):
+        return []
+    values = data["users"].to_numpy(dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) and values.min() == values.max():
+        return [
+            _failure(
+                "constant",
+                f"'users' is constant ({values[0]:g}); there is nothing to learn.",
+                value=float(values[0]),
+            )
+        ]
+    return []
+
+
+# Checks run on the index profile once the schema check has passed
+CHECKS = [
+    _check_rows,
+    _check_duplicates,
+    _check_gaps,
+    _check_missing,
+    _check_ranges,
+    _check_constant,
+]
+
+
+def validate_data(data: pd.DataFrame, min_rows: int = 2) -> None:
+    """
+    Runs the schema check and CHECKS on freshly loaded (not yet prepared)
+    data, and raises a DataValidationError listing every failure, so that
+    bad data is rejected before tuning. `min_rows` is the number of hours
+    the data must span.
+    """
+    with tracer.start_as_current_span("validate-data") as span:
+        start_time = time.perf_counter()
+        failures = _check_schema(data)
+        if not failures and data.empty:
+            failures.append(_failure("rows", "The data is empty.", value=0))
+        if not failures:
+            profile = _profile(data)
+            for check in CHECKS:
+                failures.extend(check(data, profile, min_rows))
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        span.set_attribute("rows", len(data))
+        span.set_attribute("failed_checks", len(failures))
+        span.set_attribute("duration_ms", elapsed_ms)
+        if failures:
+            logger.warning(
+                "Data validation failed.",
+                failures=failures,
+                duration_ms=round(elapsed_ms, 2),
+            )
+            raise DataValidationError(failures)
+        logger.info("Data validated.", duration_ms=round(elapsed_ms, 2))
 
 
 def get_validation_cutoff(data, forecast_hours):
@@ -41,6 +243,9 @@ def evaluate_forecast(forecast_df):
             )
             mae = None
         else:
+            # Imported here: the API imports this module and starts without sklearn
+            from sklearn.metrics import mean_absolute_error
+
             mae = mean_absolute_error(
                 forecast_df["real_users"], forecast_df["predicted_users"]
             )
@@ -0,0 +1,240 @@
+"""
+Directory-based artifact format for fitted forecasters:
+
+    <name>.model/
+        header.json       lags, window features, exog names, encoder
+                          categories, last_window metadata, user metadata
+        last_window.npy   last observed target values, memory-mapped on load
+                          as the forecaster's last_window_
+        booster.txt       LightGBM model in its native text format
+                          (booster_<step>.txt for direct forecasters)
+        compiled/         compiled booster arrays, one .npy per array
+                          (memory-mapped on load), when the forecaster has one
+        forecaster.pkl    the forecaster with its boosters and last window
+                          detached
+
+Only the small Python shell is unpickled on load. Boosters are parsed by
+LightGBM from the native files, and arrays are memory-mapped, so their
+pages come from the OS page cache and are shared by every process that
+loads the same artifact.
+"""
+
+import copy
+import json
+import os
+import pickle
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.model.compiled import CompiledBooster
+
+ARTIFACT_FORMAT_VERSION = 1
+ARTIFACT_EXTENSION = ".model"
+HEADER_FILE = "header.json"
+SHELL_FILE = "forecaster.pkl"
+LAST_WINDOW_FILE = "last_window.npy"
+COMPILED_DIR = "compiled"
+
+
+def _encoder_categories(transformer) -> Dict[str, list]:
+    """Collects fitted categories from an encoder or a ColumnTransformer of encoders."""
+    if transformer is None:
+        return {}
+    categories = {}
+    fitted = getattr(transformer, "transformers_", None)
+    if fitted is None:
+        fitted = [
+            ("encoder", transformer, getattr(transformer, "feature_names_in_", []))
+        ]
+    for _, estimator, columns in fitted:
+        estimator_categories = getattr(estimator, "categories_", None)
+        if estimator_categories is None:
+            continue
+        if isinstance(estimator_categories, dict):
+            # CategoricalCodec: categories of its non-numeric columns only
+            columns = list(estimator_categories)
+            estimator_categories = list(estimator_categories.values())
+        for column, values in zip(columns, estimator_categories):
+            categories[str(column)] = np.asarray(values, dtype=object).tolist()
+    return categories
+
+
+def _window_features_spec(forecaster) -> list:
+    specs = []
+    for window_feature in getattr(forecaster, "window_features", None) or []:
+        specs.append(
+            {
+                "class": type(window_feature).__name__,
+                "stats": list(getattr(window_feature, "stats", [])),
+                "window_sizes": np.atleast_1d(window_feature.window_sizes).tolist(),
+                "features_names": list(np.atleast_1d(window_feature.features_names)),
+            }
+        )
+    return specs
+
+
+def _boosted_regressors(forecaster) -> Dict[str, Any]:
+    """Maps artifact file names to the LightGBM regressors of a forecaster."""
+    regressors = getattr(forecaster, "regressors_", None)
+    if regressors:
+        candidates = {f"booster_{step}.txt": reg for step, reg in regressors.items()}
+    else:
+        candidates = {"booster.txt": getattr(forecaster, "regressor", None)}
+    return {
+        filename: regressor
+        for filename, regressor in candidates.items()
+        if getattr(regressor, "_Booster", None) is not None
+    }
+
+
+def _as_list(value) -> list:
+    return [] if value is None else np.asarray(value).tolist()
+
+
+def build_header(
+    forecaster, metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    last_window = getattr(forecaster, "last_window_", None)
+    header = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "forecaster": type(forecaster).__name__,
+        "lags": _as_list(getattr(forecaster, "lags", None)),
+        "window_size": int(getattr(forecaster, "window_size", 0) or 0),
+        "window_features": _window_features_spec(forecaster),
+        "exog_names_in": _as_list(getattr(forecaster, "exog_names_in_", None)),
+        "features_names_out": _as_list(
+            getattr(forecaster, "X_train_features_names_out_", None)
+        ),
+        "encoder_categories": _encoder_categories(
+            getattr(forecaster, "transformer_exog", None)
+        ),
+        "last_window": None,
+        "metadata": metadata or {},
+    }
+    if last_window is not None and len(last_window):
+        header["last_window"] = {
+            "length": int(len(last_window)),
+            "end": str(last_window.index[-1]),
+            "freq": getattr(last_window.index, "freqstr", None),
+            "index_name": last_window.index.name,
+            "columns": _as_list(getattr(last_window, "columns", None)),
+        }
+    return header
+
+
+def _detachable_last_window(last_window) -> bool:
+    """Whether the last window can be rebuilt from its values and header."""
+    return (
+        isinstance(last_window, pd.DataFrame)
+        and last_window.shape[1] == 1
+        and len(last_window) > 0
+        and getattr(last_window.index, "freqstr", None) is not None
+    )
+
+
+def _restore_last_window(values: np.ndarray, spec: Dict[str, Any]) -> pd.DataFrame:
+    index = pd.date_range(
+        end=spec["end"],
+        periods=spec["length"],
+        freq=spec["freq"],
+        name=spec["index_name"],
+    )
+    return pd.DataFrame({spec["columns"][0]: values}, index=index, copy=False)
+
+
+def save_artifact(
+    forecaster, directory: str, metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Writes `forecaster` to `directory` (created) and returns its header."""
+    os.makedirs(directory, exist_ok=True)
+    header = build_header(forecaster, metadata)
+
+    shell = copy.copy(forecaster)
+    boosted = _boosted_regressors(forecaster)
+    detached = {}
+    for filename, regressor in boosted.items():
+        regressor.booster_.save_model(os.path.join(directory, filename))
+        stripped = copy.copy(regressor)
+        stripped._Booster = None
+        detached[filename] = stripped
+    if getattr(forecaster, "regressors_", None) and detached:
+        shell.regressors_ = {
+            step: detached.get(f"booster_{step}.txt", regressor)
+            for step, regressor in forecaster.regressors_.items()
+        }
+    elif "booster.txt" in detached:
+        shell.regressor = detached["booster.txt"]
+    header["boosters"] = sorted(boosted)
+
+    compiled = getattr(forecaster, "compiled_booster_", None)
+    if compiled is not None:
+        compiled.save(os.path.join(directory, COMPILED_DIR))
+        shell.compiled_booster_ = None
+        header["compiled"] = {
+            "n_features": compiled.n_features,
+            "transform": compiled.transform,
+        }
+
+    last_window = getattr(forecaster, "last_window_", None)
+    if last_window is not None:
+        np.save(
+            os.path.join(directory, LAST_WINDOW_FILE),
+            np.ascontiguousarray(np.asarray(last_window).ravel()),
+        )
+        if _detachable_last_window(last_window):
+            shell.last_window_ = None
+
+    with open(os.path.join(directory, SHELL_FILE), "wb") as f:
+        pickle.dump(shell, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(directory, HEADER_FILE), "w") as f:
+        json.dump(header, f, default=str)
+    return header
+
+
+def read_header(directory: str) -> Dict[str, Any]:
+    with open(os.path.join(directory, HEADER_FILE)) as f:
+        return json.load(f)
+
+
+def load_artifact(directory: str) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Loads a forecaster saved with save_artifact. Returns (forecaster, header);
+    header["load_ms"] holds the load time and header["last_window_values"]
+    the memory-mapped last window, which also backs forecaster.last_window_.
+    """
+    start = time.perf_counter()
+    header = read_header(directory)
+    with open(os.path.join(directory, SHELL_FILE), "rb") as f:
+        forecaster = pickle.load(f)
+
+    if header.get("boosters"):
+        import lightgbm as lgb
+
+    for filename in header.get("boosters", []):
+        booster = lgb.Booster(model_file=os.path.join(directory, filename))
+        if filename == "booster.txt":
+            forecaster.regressor._Booster = booster
+        else:
+            step = int(filename[len("booster_") : -len(".txt")])
+            forecaster.regressors_[step]._Booster = booster
+
+    compiled = header.get("compiled")
+    if compiled:
+        forecaster.compiled_booster_ = CompiledBooster.load(
+            os.path.join(directory, COMPILED_DIR), **compiled
+        )
+
+    last_window_path = os.path.join(directory, LAST_WINDOW_FILE)
+    if os.path.exists(last_window_path):
+        values = np.load(last_window_path, mmap_mode="r")
+        header["last_window_values"] = values
+        if getattr(forecaster, "last_window_", None) is None:
+            forecaster.last_window_ = _restore_last_window(
+                values, header["last_window"]
+            )
+
+    header["load_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+    return forecaster, header
@@ -0,0 +1,288 @@
+"""
+Rolling-origin backtesting for a fixed model configuration.
+
+The design matrix (lags, window features, transformed exog) is built once
+for the whole series and cached. Every fold slices its training rows out of
+it instead of rebuilding features. Each fold forecasts `steps` hours right
+after its origin, recursively, from the observed history up to the origin.
+
+The first fold runs in the calling process and gives the cost of a fold.
+The others are fanned out to a pool of up to BACKTEST_WORKERS processes
+only when that saves more time than starting the pool costs
+(BACKTEST_POOL_STARTUP_S); otherwise they run serially as well.
+
+Reusing the cached matrix means transformer_exog is fitted on the whole
+series. Only the set of known weather categories can leak across folds,
+never target values.
+"""
+
+import copy
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMRegressor
+from loguru import logger
+from opentelemetry import trace
+from skforecast.recursive import ForecasterRecursive
+
+from src.data.data_loader import create_encoder
+from src.model.inference import fast_predict
+from src.model.rolling import IncrementalRollingFeatures
+
+tracer = trace.get_tracer("application.tracer")
+
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "1"))  # 0: one per core
+# Seconds to start a pool and hand it the fold inputs (imports included)
+BACKTEST_POOL_STARTUP_S = float(os.getenv("BACKTEST_POOL_STARTUP_S", "5"))
+# forkserver children start from a clean process, so LightGBM's OpenMP
+# runtime is never forked mid-use from a threaded server
+BACKTEST_START_METHOD = os.getenv("BACKTEST_START_METHOD", "forkserver")
+DESIGN_CACHE_SIZE = int(os.getenv("BACKTEST_DESIGN_CACHE_SIZE", "4"))
+DEFAULT_PARAMS = {"n_estimators": 300, "learning_rate": 0.05, "verbose": -1}
+
+_design_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_design_cache_lock = threading.Lock()
+
+# Fold inputs shared by every task of a worker process (set by _init_worker)
+_worker_state: Dict[str, Any] = {}
+
+
+def _design_key(y: pd.Series, exog: Optional[pd.DataFrame], lags, window_sizes) -> str:
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(y).to_numpy().tobytes())
+    if exog is not None:
+        digest.update(pd.util.hash_pandas_object(exog).to_numpy().tobytes())
+        digest.update(",".join(exog.columns).encode())
+    digest.update(repr((np.asarray(lags).tolist(), window_sizes)).encode())
+    return digest.hexdigest()
+
+
+def build_design(
+    y: pd.Series,
+    exog: Optional[pd.DataFrame],
+    lags: Union[int, List[int]],
+    window_sizes: int,
+) -> Dict[str, Any]:
+    """
+    Returns {"template", "X", "y_train"}: a forecaster with every fitted
+    attribute set (its one-tree regressor is replaced in each fold) and the
+    design matrix of the whole series. Results are cached by content.
+    """
+    key = _design_key(y, exog, lags, window_sizes)
+    with _design_cache_lock:
+        if key in _design_cache:
+            _design_cache.move_to_end(key)
+            return _design_cache[key]
+
+    with tracer.start_as_current_span("build-design-matrix") as span:
+        template = ForecasterRecursive(
+            regressor=LGBMRegressor(n_estimators=1, verbose=-1),
+            lags=lags,
+            window_features=IncrementalRollingFeatures(
+                stats=["mean"], window_sizes=window_sizes
+            ),
+            transformer_exog=create_encoder() if exog is not None else None,
+        )
+        template.fit(y=y, exog=exog)
+        X, y_train = template.create_train_X_y(y=y, exog=exog)
+        span.set_attribute("rows", len(X))
+        span.set_attribute("features", X.shape[1])
+    design = {"template": template, "X": X, "y_train": y_train}
+
+    with _design_cache_lock:
+        _design_cache[key] = design
+        while len(_design_cache) > DESIGN_CACHE_SIZE:
+            _design_cache.popitem(last=False)
+    return design
+
+
+def fold_origins(
+    n_rows: int, steps: int, n_folds: int, min_train_rows: int
+) -> List[int]:
+    """Row positions where each fold's test window starts, oldest first."""
+    origins = [n_rows - (n_folds - k) * steps for k in range(n_folds)]
+    if origins[0] < min_train_rows:
+        raise ValueError(
+            f"Not enough data for {n_folds} folds of {steps} steps: the first fold "
+            f"would train on {max(origins[0], 0)} rows (at least {min_train_rows} needed)."
+        )
+    return origins
+
+
+def should_fan_out(fold_s: float, n_folds: int, n_workers: int) -> bool:
+    """Whether `n_folds` folds of `fold_s` seconds end sooner in a pool."""
+    if n_workers < 2:
+        return False
+    serial_s = fold_s * n_folds
+    return BACKTEST_POOL_STARTUP_S + serial_s / n_workers < serial_s
+
+
+def _init_worker(state: Dict[str, Any]):
+    _worker_state.clear()
+    _worker_state.update(state)
+
+
+def _run_fold(origin: int) -> np.ndarray:
+    state = _worker_state
+    y, exog, X, y_train = state["y"], state["exog"], state["X"], state["y_train"]
+    steps = state["steps"]
+    test_start = y.index[origin]
+
+    train_rows = X.index < test_start
+    regressor = LGBMRegressor(**state["params"])
+    regressor.fit(X.loc[train_rows], y_train.loc[train_rows])
+
+    forecaster = copy.copy(state["template"])
+    forecaster.regressor = regressor
+    last_window = y.iloc[:origin]
+    exog_fold = exog.iloc[origin : origin + steps] if exog is not None else None
+    predictions = fast_predict(
+        forecaster, steps=steps, exog=exog_fold, last_window=last_window
+    )
+    if predictions is None:
+        predictions = forecaster.predict(
+            steps=steps, exog=exog_fold, last_window=last_window
+        )
+    return np.asarray(predictions, dtype=float)
+
+
+def _error_metrics(errors: np.ndarray, actual: np.ndarray, axis=None) -> Dict[str, Any]:
+    # Hours with zero actual users have no percentage error
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        ape = np.where(actual != 0, np.abs(errors) / np.abs(actual), np.nan)
+        mape = np.nanmean(ape, axis=axis)
+    return {
+        "mae": np.mean(np.abs(errors), axis=axis),
+        "rmse": np.sqrt(np.mean(errors**2, axis=axis)),
+        "bias": np.mean(errors, axis=axis),
+        "mape": mape,
+    }
+
+
+def _to_float(value):
+    return None if value is None or not np.isfinite(value) else float(value)
+
+
+def backtest_forecaster(
+    y: pd.Series,
+    exog: Optional[pd.DataFrame],
+    steps: int,
+    n_folds: int,
+    lags: Union[int, List[int]],
+    window_sizes: int,
+    params: Optional[Dict[str, Any]] = None,
+    n_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Evaluates a recursive LightGBM forecaster with the given lags, rolling
+    mean window and LightGBM `params` over `n_folds` consecutive
+    rolling-origin folds of `steps` hours covering the end of `y`.
+    Returns per-fold, per-step and overall MAE, RMSE, bias and MAPE.
+    """
+    with tracer.start_as_current_span("backtest") as span:
+        start = time.perf_counter()
+        params = dict(params or DEFAULT_PARAMS)
+        params.setdefault("verbose", -1)
+        span.set_attribute("n_folds", n_folds)
+        span.set_attribute("steps", steps)
+
+        design = build_design(y, exog, lags, window_sizes)
+        template = design["template"]
+        origins = fold_origins(
+            len(y), steps, n_folds, min_train_rows=2 * template.window_size
+        )
+
+        n_workers = n_workers or BACKTEST_WORKERS or os.cpu_count() or 1
+        state = {
+            "y": y,
+            "exog": exog,
+            "X": design["X"],
+            "y_train": design["y_train"],
+            "template": template,
+            "params": params,
+            "steps": steps,
+        }
+        with tracer.start_as_current_span("fit-folds"):
+            _init_worker(state)
+            fold_start = time.perf_counter()
+            predictions = [_run_fold(origins[0])]
+            fold_s = time.perf_counter() - fold_start
+
+            rest = origins[1:]
+            n_workers = max(1, min(n_workers, len(rest)))
+            if should_fan_out(fold_s, len(rest), n_workers):
+                # Share the cores between the folds running at the same time
+                pool_params = dict(params)
+                pool_params.setdefault(
+                    "n_jobs", max(1, (os.cpu_count() or 1) // n_workers)
+                )
+                with ProcessPoolExecutor(
+                    max_workers=n_workers,
+                    mp_context=multiprocessing.get_context(BACKTEST_START_METHOD),
+                    initializer=_init_worker,
+                    initargs=({**state, "params": pool_params},),
+                ) as pool:
+                    predictions.extend(pool.map(_run_fold, rest))
+            else:
+                n_workers = 1
+                predictions.extend(_run_fold(origin) for origin in rest)
+        span.set_attribute("n_workers", n_workers)
+
+        predicted = np.vstack(predictions)
+        actual = np.vstack(
+            [y.iloc[o : o + steps].to_numpy(dtype=float) for o in origins]
+        )
+        errors = predicted - actual
+
+        per_fold = _error_metrics(errors, actual, axis=1)
+        per_step = _error_metrics(errors, actual, axis=0)
+        overall = _error_metrics(errors, actual)
+
+        folds = []
+        for k, origin in enumerate(origins):
+            folds.append(
+                {
+                    "fold": k,
+                    "train_end": str(y.index[origin - 1]),
+                    "test_start": str(y.index[origin]),
+                    "test_end": str(y.index[origin + steps - 1]),
+                    **{name: _to_float(values[k]) for name, values in per_fold.items()},
+                }
+            )
+        seconds = time.perf_counter() - start
+        span.set_attribute("mae", float(overall["mae"]))
+        logger.info(
+            "Backtest completed.",
+            n_folds=n_folds,
+            steps=steps,
+            n_workers=n_workers,
+            seconds=round(seconds, 3),
+        )
+        return {
+            "n_folds": n_folds,
+            "steps": steps,
+            "n_workers": n_workers,
+            "seconds": round(seconds, 3),
+            "overall": {name: _to_float(value) for name, value in overall.items()},
+            "folds": folds,
+            "per_step": [
+                {
+                    "step": step + 1,
+                    **{
+                        name: _to_float(values[step])
+                        for name, values in per_step.items()
+                    },
+                }
+                for step in range(steps)
+            ],
+        }
@@ -0,0 +1,212 @@
+"""
+LightGBM boosters compiled into flat NumPy arrays.
+
+compile_booster turns `booster.dump_model()` into node arrays (split
+feature, threshold, children, missing-value handling, categorical
+bitsets) and leaf values. CompiledBooster.predict scores a whole matrix
+at once. All trees and rows advance one level per iteration, so the cost
+is a handful of array operations per tree depth, and no LightGBM or
+sklearn code runs.
+
+Decisions follow LightGBM's Tree::NumericalDecision and
+Tree::CategoricalDecision. Tree outputs are added in tree order, as
+GBDT::PredictRaw does, so predictions match Booster.predict.
+"""
+
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+
+# LightGBM's kZeroThreshold (1e-35f)
+_ZERO_THRESHOLD = float(np.float32(1e-35))
+_MISSING_TYPES = {"None": 0, "Zero": 1, "NaN": 2}
+_IDENTITY_OBJECTIVES = (
+    "regression",
+    "regression_l1",
+    "huber",
+    "fair",
+    "quantile",
+    "mape",
+)
+_EXP_OBJECTIVES = ("poisson", "gamma", "tweedie")
+
+COMPILED_ARRAYS = (
+    "roots",
+    "split_feature",
+    "threshold",
+    "left_child",
+    "right_child",
+    "default_left",
+    "missing_type",
+    "cat_index",
+    "cat_table",
+    "leaf_value",
+)
+
+
+class CompiledBooster:
+    """
+    Array form of a single-output LightGBM booster. Children are node
+    indices when >= 0 and encode leaf `i` as `-(i + 1)` otherwise; `roots`
+    uses the same encoding for single-leaf trees.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], n_features: int, transform: str):
+        missing = [name for name in COMPILED_ARRAYS if name not in arrays]
+        if missing:
+            raise ValueError(f"Missing compiled arrays: {missing}")
+        self.arrays = arrays
+        self.n_features = n_features
+        self.transform = transform
+        for name in COMPILED_ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _go_left(self, nodes: np.ndarray, values: np.ndarray) -> np.ndarray:
+        is_nan = np.isnan(values)
+        missing_type = self.missing_type[nodes]
+
+        numerical = np.where(is_nan & (missing_type != 2), 0.0, values)
+        use_default = ((missing_type == 1) & (np.abs(numerical) <= _ZERO_THRESHOLD)) | (
+            (missing_type == 2) & is_nan
+        )
+        go_left = np.where(
+            use_default, self.default_left[nodes], numerical <= self.threshold[nodes]
+        )
+
+        cat_index = self.cat_index[nodes]
+        categorical = cat_index >= 0
+        if categorical.any():
+            max_category = self.cat_table.shape[1] - 1
+            truncated = np.trunc(np.where(is_nan, -1.0, values))
+            valid = (truncated >= 0) & (truncated <= max_category)
+            category = np.where(valid, truncated, 0).astype(np.int64)
+            in_set = valid & self.cat_table[np.maximum(cat_index, 0), category]
+            go_left = np.where(categorical, in_set, go_left)
+        return go_left
+
+    def predict_raw(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows = X.shape[0]
+
+        nodes = np.repeat(self.roots[np.newaxis, :], n_rows, axis=0)
+        rows = np.repeat(np.arange(n_rows)[:, np.newaxis], self.n_trees, axis=1)
+        active = nodes >= 0
+        while active.any():
+            current = nodes[active]
+            values = X[rows[active], self.split_feature[current]]
+            nodes[active] = np.where(
+                self._go_left(current, values),
+                self.left_child[current],
+                self.right_child[current],
+            )
+            active = nodes >= 0
+
+        contributions = self.leaf_value[-nodes - 1]
+        # Sequential (not pairwise) summation, in tree order
+        return np.cumsum(contributions, axis=1)[:, -1]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        raw = self.predict_raw(X)
+        if self.transform == "exp":
+            return np.exp(raw)
+        return raw
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        for name in COMPILED_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), self.arrays[name])
+
+    @classmethod
+    def load(cls, directory: str, n_features: int, transform: str, mmap_mode="r"):
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in COMPILED_ARRAYS
+        }
+        return cls(arrays, n_features=n_features, transform=transform)
+
+
+def _output_transform(objective: str) -> str:
+    name = objective.split(" ")[0]
+    if name in _IDENTITY_OBJECTIVES:
+        return "identity"
+    if name in _EXP_OBJECTIVES:
+        return "exp"
+    raise ValueError(f"Objective '{name}' is not supported by the compiled model.")
+
+
+def compile_dump(dump: Dict[str, Any]) -> CompiledBooster:
+    """Compiles the output of `Booster.dump_model()`."""
+    if dump.get("num_class", 1) != 1 or dump.get("num_tree_per_iteration", 1) != 1:
+        raise ValueError("Only single-output boosters can be compiled.")
+    if dump.get("average_output"):
+        raise ValueError("Random forest boosters cannot be compiled.")
+    transform = _output_transform(dump.get("objective", "regression"))
+
+    split_feature: List[int] = []
+    threshold: List[float] = []
+    left_child: List[int] = []
+    right_child: List[int] = []
+    default_left: List[bool] = []
+    missing_type: List[int] = []
+    cat_index: List[int] = []
+    categories: List[List[int]] = []
+    leaf_value: List[float] = []
+
+    def add(node: Dict[str, Any]) -> int:
+        if "split_index" not in node:
+            if "leaf_coeff" in node:
+                raise ValueError("Linear trees cannot be compiled.")
+            leaf_value.append(float(node["leaf_value"]))
+            return -len(leaf_value)
+
+        index = len(split_feature)
+        split_feature.append(int(node["split_feature"]))
+        default_left.append(bool(node["default_left"]))
+        missing_type.append(_MISSING_TYPES[node["missing_type"]])
+        if node["decision_type"] == "==":
+            threshold.append(0.0)
+            cat_index.append(len(categories))
+            categories.append([int(c) for c in str(node["threshold"]).split("||")])
+        else:
+            threshold.append(float(node["threshold"]))
+            cat_index.append(-1)
+        left_child.append(0)
+        right_child.append(0)
+        left_child[index] = add(node["left_child"])
+        right_child[index] = add(node["right_child"])
+        return index
+
+    roots = [add(tree["tree_structure"]) for tree in dump["tree_info"]]
+
+    max_category = max((max(c) for c in categories), default=0)
+    cat_table = np.zeros((max(len(categories), 1), max_category + 1), dtype=bool)
+    for i, values in enumerate(categories):
+        cat_table[i, values] = True
+
+    arrays = {
+        "roots": np.asarray(roots, dtype=np.int64),
+        "split_feature": np.asarray(split_feature, dtype=np.int64),
+        "threshold": np.asarray(threshold, dtype=np.float64),
+        "left_child": np.asarray(left_child, dtype=np.int64),
+        "right_child": np.asarray(right_child, dtype=np.int64),
+        "default_left": np.asarray(default_left, dtype=bool),
+        "missing_type": np.asarray(missing_type, dtype=np.int8),
+        "cat_index": np.asarray(cat_index, dtype=np.int64),
+        "cat_table": cat_table,
+        "leaf_value": np.asarray(leaf_value, dtype=np.float64),
+    }
+    return CompiledBooster(
+        arrays, n_features=int(dump["max_feature_idx"]) + 1, transform=transform
+    )
+
+
+def compile_booster(booster) -> CompiledBooster:
+    """Compiles a fitted lightgbm.Booster (its best iteration, if any)."""
+    return compile_dump(booster.dump_model())
@@ -1,40 +1,83 @@
 import os
 import sys
+import time
 from typing import Any, Dict, List, Optional, Union
 
+import numpy as np
 import pandas as pd
 from fastapi import UploadFile
 from lightgbm import LGBMRegressor
+from loguru import logger
 from opentelemetry import trace
 from optuna.trial import Trial
+from skforecast.direct import ForecasterDirect
 from skforecast.model_selection import (
     TimeSeriesFold,
     bayesian_search_forecaster,
 )
-from skforecast.preprocessing import RollingFeatures
 from skforecast.recursive import ForecasterRecursive
+from sklearn.metrics import mean_absolute_error
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.data.data_loader import create_encoder, load_data_from_csv, load_data_from_db
 from src.data.postprocessing import combine_forecast_with_truth
-from src.data.preprocessing import extract_target_and_exog, prepare_time_series_data
-from src.data.validation import *
-from src.model.predict_utils import *
+from src.data.preprocessing import (
+    COMPACT_DTYPES,
+    compact_dtypes,
+    extract_target_and_exog,
+    prepare_time_series_data,
+)
+from src.data.validation import (
+    evaluate_forecast,
+    get_validation_cutoff,
+    validate_data,
+)
+from src.model.backtesting import backtest_forecaster
+from src.model.compiled import compile_booster
+from src.model.out_of_core import fit_out_of_core, should_train_out_of_core
+from src.model.predict_utils import predict_future, predict_quantiles
+from src.model.registry import registry
+from src.model.rolling import IncrementalRollingFeatures
+from src.model.tuning import (
+    DEFAULT_LAGS,
+    PROBE_LAGS,
+    TUNING_MODES,
+    TUNING_TIME_BUDGET_S,
+    backtest_params,
+    default_search_result,
+    plan_tuning_for_deadline,
+    run_multi_fidelity_search,
+    sample_params,
+    tuning_history,
+)
 
 tracer = trace.get_tracer("application.tracer")
 
+# "recursive": one model applied step by step; "direct": one model per step
+MODEL_TYPES = ("recursive", "direct")
+# Cores used to fit (and predict with) the per-step models of a direct forecaster
+DIRECT_N_JOBS = os.getenv("DIRECT_N_JOBS", "auto")
+# Export recursive boosters as compiled NumPy evaluators (src.model.compiled).
+# Opt-in: they score without LightGBM, but slower than its C API does
+COMPILE_BOOSTER = os.getenv("COMPILE_BOOSTER", "false").lower() == "true"
+
+
+def _direct_n_jobs() -> Union[int, str]:
+    return DIRECT_N_JOBS if DIRECT_N_JOBS == "auto" else int(DIRECT_N_JOBS)
+
 
 def run_bayesian_hyperparameter_search_and_fit(
     data: pd.DataFrame,
     end_validation: Union[str, pd.Timestamp],
     exog_features: List[str],
-    window_features: RollingFeatures = None,
+    window_features: IncrementalRollingFeatures = None,
     transformer_exog: Optional[Any] = None,
     n_trials: int = 20,
     random_state: int = 15926,
     steps: Optional[int] = None,
     initial_train_size: Optional[int] = None,
+    time_budget_s: Optional[float] = None,
 ) -> Dict[str, Any]:
     """
     Perform a Bayesian hyperparameter (including lag) search and return:
@@ -63,6 +106,12 @@ def run_bayesian_hyperparameter_search_and_fit(
     initial_train_size : int or None
         If specified along with steps, sets the initial number of observations for the first fold. Must satisfy:
         `initial_train_size ≥ max(lags) + (number_of_training_rows_after_dropping_lags)`. :contentReference[oaicite:11]{index=11}
+    time_budget_s : float or None
+        Wall-clock deadline of the search in seconds. When set, `n_trials`,
+        the `n_estimators` range and the fold count (`initial_train_size`)
+        are sized to it from a probe fit, and the search stops with the best
+        trial so far when the time runs out. If the probe used up the time,
+        one trial still runs.
 
     Returns
     -------
@@ -83,9 +132,11 @@ def run_bayesian_hyperparameter_search_and_fit(
                 "verbose": int
             },
             "best_lags": int or list of int,
-            "model": ForecasterRecursive  # already fitted on data up to end_validation
+            "best_score": float,  # mean absolute error of the best trial
+            "n_trials": int  # trials completed
         }
     """
+    start = time.monotonic()
     # 1. Validate and set index frequency :contentReference[oaicite:12]{index=12}
     if not isinstance(data.index, pd.DatetimeIndex):
         raise ValueError("`data` must have a DatetimeIndex before tuning.")
@@ -93,21 +144,43 @@ def run_bayesian_hyperparameter_search_and_fit(
         data.index.freq = "h"  # or another appropriate frequency string
 
     # 2. Define the Optuna search space, including lags as a categorical parameter :contentReference[oaicite:13]{index=13}
-    lags_grid = [48, 72, [1, 2, 3, 23, 24, 25, 167, 168, 169]]
+    n_estimators_range = (300, 1000)
+    kwargs_study_optimize = {}
+
+    history_rows = len(data.loc[:end_validation])
+    y, exog = tuning_history(
+        data.loc[:end_validation, "users"],
+        data.loc[:end_validation, exog_features],
+        window_features,
+    )
+    if initial_train_size is not None and len(y) < history_rows:
+        # Keep the share of the history used for training
+        initial_train_size = round(initial_train_size * len(y) / history_rows)
+    if time_budget_s:
+        plan = plan_tuning_for_deadline(
+            y,
+            exog,
+            steps=steps or 1,
+            deadline=start + time_budget_s,
+            lags=PROBE_LAGS,
+            window_features=window_features,
+            transformer_exog=transformer_exog,
+            min_train_rows=2 * PROBE_LAGS,
+        )
+        n_trials = plan["n_trials"]
+        initial_train_size = plan["initial_train_size"]
+        n_estimators_range = plan["n_estimators"]
+        kwargs_study_optimize["timeout"] = plan["timeout"]
+        logger.info(
+            "Tuning planned for the time budget.",
+            time_budget_s=time_budget_s,
+            n_trials=n_trials,
+            n_folds=plan["n_folds"],
+            n_estimators=n_estimators_range,
+        )
 
     def search_space(trial: Trial) -> Dict[str, Any]:
-        return {
-            "n_estimators": trial.suggest_int("n_estimators", 300, 1000, step=100),
-            "max_depth": trial.suggest_int("max_depth", 3, 10),
-            "min_child_samples": trial.suggest_int("min_child_samples", 25, 500),
-            "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.5),
-            "feature_fraction": trial.suggest_float("feature_fraction", 0.5, 1.0),
-            "num_leaves": trial.suggest_int("num_leaves", 20, 150),
-            "reg_alpha": trial.suggest_float("reg_alpha", 0.0, 1.0),
-            "reg_lambda": trial.suggest_float("reg_lambda", 0.0, 1.0),
-            "max_bin": trial.suggest_int("max_bin", 50, 250),
-            "lags": trial.suggest_categorical("lags", lags_grid),
-        }
+        return sample_params(trial, n_estimators_range)
 
     # 3. Instantiate a placeholder ForecasterRecursive (lags will be overridden by search) :contentReference[oaicite:14]{index=14}
     forecaster = ForecasterRecursive(
@@ -125,21 +198,41 @@ def run_bayesian_hyperparameter_search_and_fit(
         cv_search = TimeSeriesFold(steps=steps, initial_train_size=initial_train_size)
 
     # 5. Run the Bayesian search over the training+validation period :contentReference[oaicite:16]{index=16}
-    results_search, frozen_trial = bayesian_search_forecaster(
-        forecaster=forecaster,
-        y=data.loc[:end_validation, "users"],
-        exog=data.loc[:end_validation, exog_features],
-        cv=cv_search,
-        search_space=search_space,
-        metric="mean_absolute_error",
-        n_trials=n_trials,
-        random_state=random_state,
-        return_best=True,
-        verbose=False,
-        show_progress=True,
+    # return_best=False: the caller refits the final model with the best params
+    try:
+        results_search, frozen_trial = bayesian_search_forecaster(
+            forecaster=forecaster,
+            y=y,
+            exog=exog,
+            cv=cv_search,
+            search_space=search_space,
+            metric="mean_absolute_error",
+            n_trials=n_trials,
+            random_state=random_state,
+            return_best=False,
+            verbose=False,
+            show_progress=True,
+            kwargs_study_optimize=kwargs_study_optimize,
+        )
+    except ValueError as e:
+        # Optuna's timeout ended the study before any trial completed
+        if "No trials are completed" not in str(e):
+            raise
+        score = backtest_params(
+            y,
+            exog,
+            cv_search,
+            {"random_state": random_state, "verbose": -1},
+            DEFAULT_LAGS,
+            window_features,
+            transformer_exog,
+        )
+        return default_search_result(score, random_state)
+    logger.info(
+        "Bayesian search finished.",
+        trials=len(results_search),
+        seconds=round(time.monotonic() - start, 3),
     )
-    print(type(results_search))
-    print(results_search)
     # 6. Extract the best parameters and lags from the results DataFrame :contentReference[oaicite:17]{index=17}
     best_params = results_search["params"].iloc[0].values()
     best_params = dict(results_search["params"].iloc[0])
@@ -150,6 +243,8 @@ def run_bayesian_hyperparameter_search_and_fit(
     return {
         "best_params": best_params,
         "best_lags": best_lags,
+        "best_score": float(results_search["mean_absolute_error"].iloc[0]),
+        "n_trials": len(results_search),
     }
 
 
@@ -161,15 +256,25 @@ def train_forecaster_with_best_params(
     transformer_exog: Optional[Any] = None,
     best_params: Dict[str, Any] = None,
     best_lags: Union[int, List[int]] = None,
-) -> ForecasterRecursive:
+    model_type: str = "recursive",
+    steps: Optional[int] = None,
+    out_of_core: Optional[bool] = None,
+) -> Union[ForecasterRecursive, ForecasterDirect]:
     """
     1. Given best_params and best_lags (from hyperparameter search),
-       create a new ForecasterRecursive with those settings.
-    2. Fit it on the combined data up through end_validation.
+       create a new ForecasterRecursive (or, with model_type="direct", a
+       ForecasterDirect with one regressor per step up to `steps`) with
+       those settings.
+    2. Fit it on the combined data up through end_validation. Recursive
+       forecasters whose design matrix would exceed OUT_OF_CORE_THRESHOLD_MB
+       (or all of them with out_of_core=True) train out of core, see
+       src.model.out_of_core.
+    3. With COMPILE_BOOSTER, attach the compiled booster as
+       `compiled_booster_` (recursive only).
 
     Returns
     -------
-    ForecasterRecursive: Fitted model ready for prediction.
+    ForecasterRecursive or ForecasterDirect: Fitted model ready for prediction.
     """
     if best_params is None or best_lags is None:
         raise ValueError("`best_params` and `best_lags` must be provided.")
@@ -180,63 +285,151 @@ def train_forecaster_with_best_params(
     }
     regressor = LGBMRegressor(**lgbm_kwargs)  # :contentReference[oaicite:38]{index=38}
 
-    # 2. Instantiate ForecasterRecursive with best_lags
-    final_forecaster = ForecasterRecursive(
-        regressor=regressor,
-        lags=best_lags,
-        window_features=window_features,
-        transformer_exog=transformer_exog,
-        fit_kwargs={"categorical_feature": "auto"},
-    )
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"`model_type` must be one of {MODEL_TYPES}.")
+
+    # 2. Instantiate the forecaster with best_lags
+    if model_type == "direct":
+        if not steps:
+            raise ValueError("`steps` is required for a direct forecaster.")
+        # The per-step models are fitted in parallel over DIRECT_N_JOBS cores
+        final_forecaster = ForecasterDirect(
+            regressor=regressor,
+            steps=steps,
+            lags=best_lags,
+            window_features=window_features,
+            transformer_exog=transformer_exog,
+            fit_kwargs={"categorical_feature": "auto"},
+            n_jobs=_direct_n_jobs(),
+        )
+    else:
+        final_forecaster = ForecasterRecursive(
+            regressor=regressor,
+            lags=best_lags,
+            window_features=window_features,
+            transformer_exog=transformer_exog,
+            fit_kwargs={"categorical_feature": "auto"},
+        )
 
-    # 3. Fit on all data ≤ end_validation
-    final_forecaster.fit(
-        y=data.loc[:end_validation, "users"],
-        exog=data.loc[:end_validation, exog_features],
-    )
+    # 3. Fit on all data ≤ end_validation, out of core for long histories
+    y_fit = data.loc[:end_validation, "users"]
+    exog_fit = data.loc[:end_validation, exog_features]
+    if out_of_core is None:
+        n_features = (
+            len(final_forecaster.lags)
+            + len(final_forecaster.window_features_names or [])
+            + len(exog_features)
+        )
+        out_of_core = should_train_out_of_core(len(y_fit), n_features)
+    if out_of_core and model_type == "recursive":
+        fit_out_of_core(final_forecaster, y_fit, exog_fit)
+    else:
+        final_forecaster.fit(
+            y=y_fit,
+            exog=exog_fit,
+            store_in_sample_residuals=True,  # used for bootstrapped intervals
+        )
+
+    # 4. Export the booster as flat arrays for the fast prediction engine
+    if model_type != "recursive" or not COMPILE_BOOSTER:
+        return final_forecaster
+    try:
+        final_forecaster.compiled_booster_ = compile_booster(
+            final_forecaster.regressor.booster_
+        )
+    except ValueError as e:
+        logger.warning(f"Booster was not compiled: {e}")
 
     return final_forecaster
 
 
-def forecast_with_tuning(file: UploadFile, forecast_hours: int, window_sizes: int):
+def _save_to_registry(name, model, result, forecast_hours, window_sizes, mae):
+    with tracer.start_as_current_span("save-model"):
+        registry.save(
+            name,
+            model,
+            metadata={
+                "forecast_hours": forecast_hours,
+                "window_sizes": window_sizes,
+                "lags": np.asarray(result["best_lags"]).tolist(),
+                "best_params": {
+                    key: value.item() if isinstance(value, np.generic) else value
+                    for key, value in result["best_params"].items()
+                },
+                "mae": float(mae) if mae is not None else None,
+                "model_type": (
+                    "direct" if isinstance(model, ForecasterDirect) else "recursive"
+                ),
+            },
+        )
+
+
+def forecast_with_tuning(
+    file: UploadFile,
+    forecast_hours: int,
+    window_sizes: int,
+    save_as: Optional[str] = None,
+    quantiles: Optional[List[float]] = None,
+    n_boot: Optional[int] = None,
+    model_type: str = "recursive",
+    time_budget_s: Optional[float] = None,
+    tuning_mode: str = "bayesian",
+):
+    if tuning_mode not in TUNING_MODES:
+        raise ValueError(f"`tuning_mode` must be one of {TUNING_MODES}.")
     with tracer.start_as_current_span("forecast_with_tuning") as root_span:
+        root_span.set_attribute("model_type", model_type)
         # Step 1: Load data
         with tracer.start_as_current_span("load-data"):
             data = load_data_from_csv(file)
+            validate_data(data, min_rows=forecast_hours + 2)
+            if COMPACT_DTYPES:
+                data = compact_dtypes(data)
 
         # Step 2: Feature extraction
-        with tracer.start_as_current_span("extract-features") as span:
-            y = data["users"].copy()
-            exog = data.drop(columns=["users"]).copy()
-            exog_features = exog.columns.to_list()
-            span.set_attribute("num_features", len(exog_features))
+        y, exog, exog_features = extract_target_and_exog(data)
 
         # Step 3: Validation slicing
         with tracer.start_as_current_span("prepare-validation-window"):
-            end_validation = data.index[-forecast_hours - 1].strftime(
-                "%Y-%m-%d %H:%M:%S"
-            )
-            end_validation_dt = pd.to_datetime(end_validation) + pd.Timedelta(hours=1)
+            end_validation_dt = data.index[-forecast_hours - 1]
+            end_validation = end_validation_dt.strftime("%Y-%m-%d %H:%M:%S")
 
         # Step 4: Create transformers
         with tracer.start_as_current_span("init-transformers"):
-            window_features = RollingFeatures(stats=["mean"], window_sizes=window_sizes)
+            window_features = IncrementalRollingFeatures(
+                stats=["mean"], window_sizes=window_sizes
+            )
             encoder = create_encoder()
 
         # Step 5: Hyperparameter tuning
         with tracer.start_as_current_span("tune-model") as tuning_span:
-            result = run_bayesian_hyperparameter_search_and_fit(
-                data=data,
-                end_validation=end_validation,
-                exog_features=exog_features,
-                window_features=window_features,
-                transformer_exog=encoder,
-                n_trials=10,
-                steps=forecast_hours,
-                initial_train_size=round(len(y) * 0.9),
-                random_state=2025,
-            )
+            tuning_span.set_attribute("tuning_mode", tuning_mode)
+            if tuning_mode == "multi_fidelity":
+                result = run_multi_fidelity_search(
+                    data=data,
+                    end_validation=end_validation,
+                    exog_features=exog_features,
+                    window_features=window_features,
+                    transformer_exog=encoder,
+                    steps=forecast_hours,
+                    random_state=2025,
+                    time_budget_s=time_budget_s or TUNING_TIME_BUDGET_S,
+                )
+            else:
+                result = run_bayesian_hyperparameter_search_and_fit(
+                    data=data,
+                    end_validation=end_validation,
+                    exog_features=exog_features,
+                    window_features=window_features,
+                    transformer_exog=encoder,
+                    n_trials=10,
+                    steps=forecast_hours,
+                    initial_train_size=round(len(y) * 0.9),
+                    random_state=2025,
+                    time_budget_s=time_budget_s or TUNING_TIME_BUDGET_S,
+                )
             tuning_span.set_attribute("best_score", result.get("best_score", "n/a"))
+            tuning_span.set_attribute("n_trials", result.get("n_trials", 0))
 
         # Step 6: Train final model
         with tracer.start_as_current_span("train-best-model"):
@@ -248,25 +441,24 @@ def forecast_with_tuning(file: UploadFile, forecast_hours: int, window_sizes: in
                 transformer_exog=encoder,
                 best_params=result["best_params"],
                 best_lags=result["best_lags"],
+                model_type=model_type,
+                steps=forecast_hours,
             )
 
         # Step 7: Make prediction
-        with tracer.start_as_current_span("make-predictions"):
-            exog_pred = data.loc[end_validation_dt:, exog_features].head(forecast_hours)
-            predictions = model.predict(steps=forecast_hours, exog=exog_pred)
+        predictions, exog_pred, forecast_index = predict_future(
+            model, data, exog_features, end_validation_dt, forecast_hours
+        )
+        quantile_predictions = None
+        if quantiles:
+            quantile_predictions = predict_quantiles(
+                model, exog_pred, quantiles, n_boot
+            )
 
         # Step 8: Post-process forecast
-        with tracer.start_as_current_span("combine-results") as combine_span:
-            future_index = exog_pred.index
-            forecast_df = pd.DataFrame(
-                {
-                    "date_time": future_index,
-                    "predicted_users": np.ceil(predictions).astype(int),
-                    "real_users": data.loc[future_index, "users"].values,
-                }
-            )
-            forecast_df.set_index("date_time", inplace=True)
-            forecast_df = pd.concat([forecast_df, exog_pred], axis=1)
+        forecast_df = combine_forecast_with_truth(
+            predictions, exog_pred, data, quantile_predictions
+        )
 
         # Step 9: Evaluate
         with tracer.start_as_current_span("evaluate") as eval_span:
@@ -276,15 +468,32 @@ def forecast_with_tuning(file: UploadFile, forecast_hours: int, window_sizes: in
             forecast_df.index = forecast_df.index.strftime("%Y-%m-%d %H:%M:%S")
             eval_span.set_attribute("mae", mae)
 
+        # Step 10: Optionally persist the fitted model for /predict-model
+        if save_as:
+            _save_to_registry(save_as, model, result, forecast_hours, window_sizes, mae)
+
         return forecast_df, mae
 
 
 def forecast_with_tuning_db(
-    forecast_hours: int, window_sizes: int, start_time: str, stop_time: str
+    forecast_hours: int,
+    window_sizes: int,
+    start_time: str,
+    stop_time: str,
+    save_as: Optional[str] = None,
+    quantiles: Optional[List[float]] = None,
+    n_boot: Optional[int] = None,
+    model_type: str = "recursive",
+    time_budget_s: Optional[float] = None,
+    tuning_mode: str = "bayesian",
 ):
+    if tuning_mode not in TUNING_MODES:
+        raise ValueError(f"`tuning_mode` must be one of {TUNING_MODES}.")
     with tracer.start_as_current_span("forecast_with_tuning_db") as root_span:
-        # Step 1: Load data from PostgreSQL
+        root_span.set_attribute("model_type", model_type)
+        # Step 1: Load data from PostgreSQL and reject bad data before tuning
         data = load_data_from_db(start_time, stop_time)
+        validate_data(data, min_rows=forecast_hours + 2)
         data = prepare_time_series_data(data)
         # Step 2: Feature extraction (rest of the function continues as before)
         y, exog, exog_features = extract_target_and_exog(data)
@@ -292,23 +501,40 @@ def forecast_with_tuning_db(
         end_validation_dt = get_validation_cutoff(data, forecast_hours)
         # Step 4: Initialize transformer
         with tracer.start_as_current_span("init-transformers"):
-            window_features = RollingFeatures(stats=["mean"], window_sizes=window_sizes)
+            window_features = IncrementalRollingFeatures(
+                stats=["mean"], window_sizes=window_sizes
+            )
             encoder = create_encoder()
             logger.info("Initialized transformers.")
         # Step 5: Hyperparameter tuning
         with tracer.start_as_current_span("tune-model") as tuning_span:
-            result = run_bayesian_hyperparameter_search_and_fit(
-                data=data,  # Pass the entire DataFrame to the tuning function
-                end_validation=end_validation_dt.strftime("%Y-%m-%d %H:%M:%S%z"),
-                exog_features=exog_features,
-                window_features=window_features,
-                transformer_exog=encoder,
-                n_trials=10,
-                steps=forecast_hours,
-                initial_train_size=round(len(y) * 0.9),
-                random_state=2025,
-            )
+            tuning_span.set_attribute("tuning_mode", tuning_mode)
+            if tuning_mode == "multi_fidelity":
+                result = run_multi_fidelity_search(
+                    data=data,
+                    end_validation=end_validation_dt.strftime("%Y-%m-%d %H:%M:%S%z"),
+                    exog_features=exog_features,
+                    window_features=window_features,
+                    transformer_exog=encoder,
+                    steps=forecast_hours,
+                    random_state=2025,
+                    time_budget_s=time_budget_s or TUNING_TIME_BUDGET_S,
+                )
+            else:
+                result = run_bayesian_hyperparameter_search_and_fit(
+                    data=data,  # Pass the entire DataFrame to the tuning function
+                    end_validation=end_validation_dt.strftime("%Y-%m-%d %H:%M:%S%z"),
+                    exog_features=exog_features,
+                    window_features=window_features,
+                    transformer_exog=encoder,
+                    n_trials=10,
+                    steps=forecast_hours,
+                    initial_train_size=round(len(y) * 0.9),
+                    random_state=2025,
+                    time_budget_s=time_budget_s or TUNING_TIME_BUDGET_S,
+                )
             tuning_span.set_attribute("best_score", result.get("best_score", "n/a"))
+            tuning_span.set_attribute("n_trials", result.get("n_trials", 0))
             logger.info(
                 "Hyperparameter tuning completed.",
                 best_score=result.get("best_score"),
@@ -323,14 +549,104 @@ def forecast_with_tuning_db(
                 transformer_exog=encoder,
                 best_params=result["best_params"],
                 best_lags=result["best_lags"],
+                model_type=model_type,
+                steps=forecast_hours,
             )
             logger.info("Final model trained.")
         # Step 7: Make prediction
         predictions, exog_pred, forecast_index = predict_future(
             model, data, exog_features, end_validation_dt, forecast_hours
         )
+        quantile_predictions = None
+        if quantiles:
+            quantile_predictions = predict_quantiles(
+                model, exog_pred, quantiles, n_boot
+            )
         # Step 8: Post-process forecast
-        forecast_df = combine_forecast_with_truth(predictions, exog_pred, data)
+        forecast_df = combine_forecast_with_truth(
+            predictions, exog_pred, data, quantile_predictions
+        )
         # Step 9: Evaluate
         mae = evaluate_forecast(forecast_df)
+        # Step 10: Optionally persist the fitted model for /predict-model
+        if save_as:
+            _save_to_registry(save_as, model, result, forecast_hours, window_sizes, mae)
     return forecast_df, mae
+
+
+def forecast_with_registered_model(
+    model_name: str,
+    forecast_hours: int,
+    start_time: str,
+    stop_time: str,
+    quantiles: Optional[List[float]] = None,
+    n_boot: Optional[int] = None,
+):
+    """
+    Forecasts the last `forecast_hours` of [start_time, stop_time] with a model
+    from the registry, without tuning or training. The model starts from the
+    observed history right before the forecast window.
+    """
+    with tracer.start_as_current_span("forecast_with_registered_model") as root_span:
+        root_span.set_attribute("model_name", model_name)
+        model = registry.get(model_name)
+        data = load_data_from_db(start_time, stop_time)
+        data = prepare_time_series_data(data)
+        exog_features = list(model.exog_names_in_)
+        end_validation_dt = get_validation_cutoff(data, forecast_hours)
+        last_window = data.loc[:end_validation_dt, "users"]
+        predictions, exog_pred, forecast_index = predict_future(
+            model,
+            data,
+            exog_features,
+            end_validation_dt,
+            forecast_hours,
+            last_window=last_window,
+        )
+        quantile_predictions = None
+        if quantiles:
+            quantile_predictions = predict_quantiles(
+                model, exog_pred, quantiles, n_boot, last_window=last_window
+            )
+        forecast_df = combine_forecast_with_truth(
+            predictions, exog_pred, data, quantile_predictions
+        )
+        mae = evaluate_forecast(forecast_df)
+    return forecast_df, mae
+
+
+def backtest_with_db(
+    start_time: str,
+    stop_time: str,
+    forecast_hours: int,
+    n_folds: int,
+    window_sizes: int = 72,
+    lags: Union[int, List[int]] = 72,
+    model_name: Optional[str] = None,
+):
+    """
+    Rolling-origin backtest over [start_time, stop_time]. With `model_name`,
+    the lags, rolling window and LightGBM parameters of that registered model
+    are used instead of `lags` and `window_sizes`.
+    """
+    with tracer.start_as_current_span("backtest_with_db") as root_span:
+        params = None
+        if model_name:
+            root_span.set_attribute("model_name", model_name)
+            model = registry.get(model_name)
+            lags = np.asarray(model.lags).tolist()
+            window_sizes = max(np.atleast_1d(model.window_features[0].window_sizes))
+            params = model.regressor.get_params()
+        data = load_data_from_db(start_time, stop_time)
+        validate_data(data, min_rows=forecast_hours + 2)
+        data = prepare_time_series_data(data)
+        y, exog, exog_features = extract_target_and_exog(data)
+        return backtest_forecaster(
+            y=y,
+            exog=exog,
+            steps=forecast_hours,
+            n_folds=n_folds,
+            lags=lags,
+            window_sizes=int(window_sizes),
+            params=params,
+        )
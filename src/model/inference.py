@@ -0,0 +1,367 @@
+"""
+Fast recursive inference for fitted ForecasterRecursive models with a
+LightGBM regressor.
+
+ForecasterRecursive.predict goes through the sklearn wrapper for every step
+of the horizon (input validation, DataFrame checks, a fresh prediction
+buffer). FastRecursivePredictor does the same arithmetic with everything
+that does not depend on the previous step hoisted out of the loop:
+
+- exog is transformed once for the whole horizon;
+- the last observed values and the predictions live in a preallocated ring
+  buffer, written twice so the latest `window_size` values are always a
+  contiguous view;
+- window features that support it (see src.model.rolling) keep O(1)
+  incremental state instead of being recomputed over the window;
+- each step fills one preallocated feature row (lags, window features,
+  exog, in the order of `X_train_features_names_out_`) and scores it with
+  the compiled booster (src.model.compiled) when the model was exported
+  with one (COMPILE_BOOSTER), otherwise with the booster through
+  LightGBM's single-row C API.
+
+Predictions are identical to ForecasterRecursive.predict, up to floating
+point rounding in incrementally updated window features.
+
+Quantiles come from a residual bootstrap in which all paths advance
+together, so each step scores one (n_boot, n_features) matrix.
+"""
+
+import ctypes
+import os
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from skforecast.recursive import ForecasterRecursive
+from skforecast.utils import expand_index
+
+FAST_PREDICT = os.getenv("FAST_PREDICT", "True").lower() == "true"
+
+DEFAULT_N_BOOT = int(os.getenv("DEFAULT_N_BOOT", "250"))
+
+# Constants from LightGBM's c_api.h
+_C_API_PREDICT_NORMAL = 0
+_C_API_DTYPE_FLOAT64 = 1
+
+
+def quantile_column(quantile: float) -> str:
+    """0.1 -> 'p10', 0.025 -> 'p2.5'."""
+    return f"p{quantile * 100:g}"
+
+
+class _BoosterRowScorer:
+    """
+    Scores one float64 feature row at a time with
+    LGBM_BoosterPredictForMatSingleRowFast, falling back to Booster.predict
+    when the C entry points are not reachable. Not thread-safe: create one
+    per prediction call.
+    """
+
+    def __init__(self, booster, n_features: int):
+        self._booster = booster
+        self._config = None
+        self._out = np.zeros(1, dtype=np.float64)
+        try:
+            from lightgbm.basic import _LIB, _c_str, _safe_call
+
+            config = ctypes.c_void_p()
+            _safe_call(
+                _LIB.LGBM_BoosterPredictForMatSingleRowFastInit(
+                    booster._handle,
+                    ctypes.c_int(_C_API_PREDICT_NORMAL),
+                    ctypes.c_int(0),
+                    ctypes.c_int(booster.best_iteration),
+                    ctypes.c_int(_C_API_DTYPE_FLOAT64),
+                    ctypes.c_int32(n_features),
+                    _c_str(""),
+                    ctypes.byref(config),
+                )
+            )
+        except (ImportError, AttributeError):
+            return
+        self._lib = _LIB
+        self._safe_call = _safe_call
+        self._config = config
+        self._out_len = ctypes.c_int64(0)
+        self._out_ptr = self._out.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
+
+    def __call__(self, row: np.ndarray) -> float:
+        if self._config is None:
+            return float(self._booster.predict(row.reshape(1, -1))[0])
+        self._safe_call(
+            self._lib.LGBM_BoosterPredictForMatSingleRowFast(
+                self._config,
+                row.ctypes.data_as(ctypes.c_void_p),
+                ctypes.byref(self._out_len),
+                self._out_ptr,
+            )
+        )
+        return float(self._out[0])
+
+    def close(self):
+        if self._config is not None:
+            self._lib.LGBM_FastConfigFree(self._config)
+            self._config = None
+
+
+class _CompiledRowScorer:
+    def __init__(self, compiled):
+        self._compiled = compiled
+
+    def __call__(self, row: np.ndarray) -> float:
+        return float(self._compiled.predict(row)[0])
+
+    def close(self):
+        pass
+
+
+class FastRecursivePredictor:
+    """Recursive multi-step prediction for a fitted ForecasterRecursive."""
+
+    def __init__(self, forecaster: ForecasterRecursive):
+        if not self.supports(forecaster):
+            raise ValueError(
+                "FastRecursivePredictor needs a fitted ForecasterRecursive with a "
+                "LightGBM or compiled booster and no target transformation or "
+                "differentiation."
+            )
+        self.forecaster = forecaster
+        self.booster = getattr(forecaster.regressor, "_Booster", None)
+        self.compiled = getattr(forecaster, "compiled_booster_", None)
+        self.window_size = int(forecaster.window_size)
+        lags = forecaster.lags
+        self.lags = (
+            np.asarray(lags, dtype=int) if lags is not None else np.empty(0, int)
+        )
+        self.window_features = list(forecaster.window_features or [])
+        self.n_window_features = len(
+            forecaster.X_train_window_features_names_out_ or []
+        )
+        self.exog_names_in = list(forecaster.exog_names_in_ or [])
+        self.exog_names_out = list(forecaster.X_train_exog_names_out_ or [])
+        self.n_features = len(forecaster.X_train_features_names_out_)
+
+    @staticmethod
+    def supports(forecaster) -> bool:
+        return (
+            isinstance(forecaster, ForecasterRecursive)
+            and forecaster.is_fitted
+            and forecaster.transformer_y is None
+            and forecaster.differentiation is None
+            and (
+                getattr(forecaster.regressor, "_Booster", None) is not None
+                or getattr(forecaster, "compiled_booster_", None) is not None
+            )
+        )
+
+    def _row_scorer(self):
+        """
+        The compiled booster when the model carries one, otherwise
+        LightGBM's single-row C API.
+        """
+        if self.compiled is not None:
+            return _CompiledRowScorer(self.compiled)
+        return _BoosterRowScorer(self.booster, self.n_features)
+
+    def transform_exog(self, exog: pd.DataFrame) -> np.ndarray:
+        """Transforms the whole exog block once, columns in training order."""
+        exog = exog[self.exog_names_in]
+        transformer = self.forecaster.transformer_exog
+        if transformer is not None:
+            exog = transformer.transform(exog)
+            if not isinstance(exog, pd.DataFrame):
+                exog = pd.DataFrame(exog, columns=transformer.get_feature_names_out())
+        return np.ascontiguousarray(exog[self.exog_names_out].to_numpy(dtype=float))
+
+    def _prepare_inputs(self, steps, exog, last_window):
+        if last_window is None:
+            last_window = self.forecaster.last_window_
+        last_window = last_window.iloc[-self.window_size :]
+        last_values = np.asarray(last_window, dtype=float).ravel()
+
+        exog_values = None
+        if self.exog_names_in:
+            if exog is None:
+                raise ValueError(
+                    "The forecaster was fitted with exog; exog is required."
+                )
+            exog_values = self.transform_exog(exog.iloc[:steps])
+            steps = min(steps, len(exog_values))
+        return steps, last_window.index, last_values, exog_values
+
+    def predict(
+        self,
+        steps: int,
+        exog: Optional[pd.DataFrame] = None,
+        last_window: Optional[pd.Series] = None,
+    ) -> pd.Series:
+        steps, window_index, last_values, exog_values = self._prepare_inputs(
+            steps, exog, last_window
+        )
+        values = self._predict_values(steps, last_values, exog_values)
+        return pd.Series(
+            values, index=expand_index(window_index, steps=steps), name="pred"
+        )
+
+    def predict_quantiles(
+        self,
+        steps: int,
+        quantiles: Sequence[float],
+        exog: Optional[pd.DataFrame] = None,
+        last_window: Optional[pd.Series] = None,
+        n_boot: int = DEFAULT_N_BOOT,
+        random_state: int = 123,
+    ) -> pd.DataFrame:
+        """Quantiles of `n_boot` bootstrapped paths, one column per quantile."""
+        steps, window_index, last_values, exog_values = self._prepare_inputs(
+            steps, exog, last_window
+        )
+        paths = self._bootstrap_paths(
+            steps, last_values, exog_values, n_boot, random_state
+        )
+        return pd.DataFrame(
+            np.quantile(paths, quantiles, axis=0).T,
+            index=expand_index(window_index, steps=steps),
+            columns=[quantile_column(q) for q in quantiles],
+        )
+
+    def _score_rows(self, rows: np.ndarray) -> np.ndarray:
+        if self.compiled is not None:
+            return self.compiled.predict(rows)
+        return self.booster.predict(rows)
+
+    def _bootstrap_paths(
+        self,
+        steps: int,
+        last_values: np.ndarray,
+        exog_values: Optional[np.ndarray],
+        n_boot: int,
+        random_state: int,
+    ) -> np.ndarray:
+        """
+        Residual bootstrap as in ForecasterRecursive.predict_bootstrapping, but
+        with all `n_boot` paths advanced together: each step scores one
+        (n_boot, n_features) matrix, adds a residual drawn with replacement to
+        every path and feeds the result back as that path's next value.
+        Returns an (n_boot, steps) matrix.
+        """
+        residuals = getattr(self.forecaster, "in_sample_residuals_", None)
+        if residuals is None or len(residuals) == 0:
+            raise ValueError(
+                "The model has no stored residuals; retrain it to get intervals."
+            )
+        rng = np.random.default_rng(random_state)
+        sampled = rng.choice(np.asarray(residuals, dtype=float), size=(steps, n_boot))
+
+        window = self.window_size
+        n_lags = len(self.lags)
+        exog_start = n_lags + self.n_window_features
+        buffer = np.empty((n_boot, 2 * window), dtype=float)
+        buffer[:, :window] = last_values
+        buffer[:, window:] = last_values
+        pos = window - 1
+        lag_positions = window - self.lags
+
+        rows = np.empty((n_boot, self.n_features), dtype=float)
+        paths = np.empty((n_boot, steps), dtype=float)
+        for step in range(steps):
+            current = buffer[:, pos + 1 : pos + 1 + window]
+            if n_lags:
+                rows[:, :n_lags] = current[:, lag_positions]
+            column = n_lags
+            for window_feature in self.window_features:
+                if hasattr(window_feature, "transform_paths"):
+                    features = window_feature.transform_paths(current)
+                else:
+                    features = np.stack(
+                        [
+                            np.atleast_1d(window_feature.transform(path))
+                            for path in current
+                        ]
+                    )
+                rows[:, column : column + features.shape[1]] = features
+                column += features.shape[1]
+            if exog_values is not None:
+                rows[:, exog_start:] = exog_values[step]
+
+            values = self._score_rows(rows) + sampled[step]
+            paths[:, step] = values
+            pos = (pos + 1) % window
+            buffer[:, pos] = values
+            buffer[:, pos + window] = values
+        return paths
+
+    def _predict_values(
+        self, steps: int, last_values: np.ndarray, exog_values: Optional[np.ndarray]
+    ) -> np.ndarray:
+        window = self.window_size
+        n_lags = len(self.lags)
+        exog_start = n_lags + self.n_window_features
+
+        # Ring buffer written at `pos` and `pos + window`; after a write at
+        # `pos`, buffer[pos + 1 : pos + 1 + window] is the latest window.
+        buffer = np.empty(2 * window, dtype=float)
+        buffer[:window] = last_values
+        buffer[window:] = last_values
+        pos = window - 1
+        lag_positions = window - self.lags
+
+        # Window features with incremental state (IncrementalRollingFeatures)
+        # are updated with each prediction instead of recomputed over the window.
+        states = [
+            (
+                window_feature.start(last_values)
+                if hasattr(window_feature, "start")
+                else None
+            )
+            for window_feature in self.window_features
+        ]
+
+        row = np.empty(self.n_features, dtype=float)
+        predictions = np.empty(steps, dtype=float)
+        scorer = self._row_scorer()
+        try:
+            for step in range(steps):
+                current = buffer[pos + 1 : pos + 1 + window]
+                if n_lags:
+                    row[:n_lags] = current[lag_positions]
+                column = n_lags
+                for window_feature, state in zip(self.window_features, states):
+                    if state is None:
+                        features = np.atleast_1d(window_feature.transform(current))
+                    else:
+                        features = state.features()
+                    row[column : column + len(features)] = features
+                    column += len(features)
+                if exog_values is not None:
+                    row[exog_start:] = exog_values[step]
+
+                prediction = scorer(row)
+                predictions[step] = prediction
+                pos = (pos + 1) % window
+                buffer[pos] = prediction
+                buffer[pos + window] = prediction
+                for state in states:
+                    if state is not None:
+                        state.push(prediction)
+        finally:
+            scorer.close()
+        return predictions
+
+
+def fast_predict(
+    forecaster,
+    steps: int,
+    exog: Optional[pd.DataFrame] = None,
+    last_window: Optional[pd.Series] = None,
+) -> Optional[pd.Series]:
+    """
+    Predicts with FastRecursivePredictor when FAST_PREDICT is enabled and the
+    forecaster is supported; returns None otherwise so callers can fall back
+    to forecaster.predict.
+    """
+    if not FAST_PREDICT or not FastRecursivePredictor.supports(forecaster):
+        return None
+    return FastRecursivePredictor(forecaster).predict(
+        steps=steps, exog=exog, last_window=last_window
+    )
@@ -0,0 +1,257 @@
+"""
+Out-of-core training for long histories.
+
+The design matrix of a recursive forecaster (lags, window features and
+encoded exog, one row per hour) is many times wider than the history
+itself. In out-of-core mode it is never held in memory. Row chunks are built
+with the forecaster's own create_train_X_y and written to a memory-mapped
+float32 file. LightGBM then reads the file back in batches, through a
+lightgbm.Sequence, to build its binned Dataset, which takes one byte per
+value with the default 255 bins. Chunk and batch sizes, and the number of
+rows LightGBM samples to find the bin edges, follow OUT_OF_CORE_MEMORY_MB,
+so peak memory stays near that budget plus the binned Dataset and the
+history.
+
+The result is an ordinary fitted ForecasterRecursive. Its state (last
+window, exog names and types, index frequency) comes from a fit on the
+last rows of the history with a one-tree regressor; its encoder is fitted
+on the whole exog; the booster trained from the file then replaces the
+one-tree booster, as in backtesting.build_design.
+
+Only the final fit runs out of core. The hyperparameter search builds an
+in-memory float64 design matrix for every trial, so for a history that
+trains out of core it is run on the most recent rows only, as many as
+one chunk holds (see tuning_rows). Its peak memory then stays near
+OUT_OF_CORE_MEMORY_MB, but the parameters are tuned on that recent
+window and not on the whole history.
+"""
+
+import os
+import tempfile
+import time
+from typing import Optional
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from loguru import logger
+from opentelemetry import trace
+from skforecast.recursive import ForecasterRecursive
+
+tracer = trace.get_tracer("application.tracer")
+
+OUT_OF_CORE_MEMORY_MB = float(os.getenv("OUT_OF_CORE_MEMORY_MB", "512"))
+# Train out of core when the in-memory (float64) design matrix would be
+# larger than this; 0 disables the switch
+OUT_OF_CORE_THRESHOLD_MB = float(os.getenv("OUT_OF_CORE_THRESHOLD_MB", "2048"))
+# Where the memory-mapped matrix is written (the system temp dir if unset)
+OUT_OF_CORE_DIR = os.getenv("OUT_OF_CORE_DIR") or None
+# Building a chunk holds about this many float64 copies of it at once
+# (skforecast's lag matrix, the DataFrame, the float32 cast)
+CHUNK_COPIES = 4
+# Training rows of the tail fit that sets the forecaster's state
+STATE_FIT_ROWS = 50
+# LightGBM holds its bin-construction sample as float64 values plus indices;
+# the sample is capped by the budget, within these bounds (200000 is
+# LightGBM's default bin_construct_sample_cnt)
+MIN_SAMPLE_ROWS = 20000
+MAX_SAMPLE_ROWS = 200000
+
+
+def design_matrix_mb(n_rows: int, n_features: int, itemsize: int = 8) -> float:
+    return n_rows * n_features * itemsize / 2**20
+
+
+def chunk_rows(n_features: int, memory_mb: float = OUT_OF_CORE_MEMORY_MB) -> int:
+    """Design matrix rows built (or read back) at once within `memory_mb`."""
+    row_bytes = max(n_features, 1) * 8 * CHUNK_COPIES
+    return max(int(memory_mb * 2**20 // row_bytes), 1)
+
+
+def sample_rows(n_features: int, memory_mb: float = OUT_OF_CORE_MEMORY_MB) -> int:
+    """Rows LightGBM samples to find the bin edges, within `memory_mb`."""
+    budget = int(memory_mb * 2**20 // (max(n_features, 1) * 16))
+    return min(max(budget, MIN_SAMPLE_ROWS), MAX_SAMPLE_ROWS)
+
+
+def should_train_out_of_core(n_rows: int, n_features: int) -> bool:
+    return (
+        OUT_OF_CORE_THRESHOLD_MB > 0
+        and design_matrix_mb(n_rows, n_features) > OUT_OF_CORE_THRESHOLD_MB
+    )
+
+
+def tuning_rows(
+    n_rows: int, n_features: int, memory_mb: float = OUT_OF_CORE_MEMORY_MB
+) -> int:
+    """
+    Most recent rows of an `n_rows` history to tune on: all of them, unless
+    the history trains out of core; then as many as one chunk holds.
+    """
+    if not should_train_out_of_core(n_rows, n_features):
+        return n_rows
+    return min(n_rows, chunk_rows(n_features, memory_mb))
+
+
+class MemmapSequence(lgb.Sequence):
+    """Row batches of a memory-mapped design matrix, for lgb.Dataset."""
+
+    def __init__(self, matrix: np.ndarray, batch_size: int):
+        self.matrix = matrix
+        self.batch_size = batch_size
+
+    def __getitem__(self, index):
+        # LightGBM bins Sequence batches from float64 only
+        return np.asarray(self.matrix[index], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+
+def write_design_matrix(
+    builder: ForecasterRecursive,
+    y: pd.Series,
+    exog: Optional[pd.DataFrame],
+    matrix: np.ndarray,
+    rows_per_chunk: int,
+) -> np.ndarray:
+    """
+    Fills `matrix` (n_rows - window_size rows) with the design matrix of `y`
+    and the already transformed `exog`, `rows_per_chunk` rows at a time.
+    Returns the training targets.
+    """
+    window = builder.window_size
+    n_train = len(y) - window
+    y_train = np.empty(n_train, dtype=float)
+    for start in range(0, n_train, rows_per_chunk):
+        stop = min(start + rows_per_chunk, n_train)
+        # Rows `start..stop` need the `window` values before them
+        X_chunk, y_chunk = builder.create_train_X_y(
+            y=y.iloc[start : stop + window],
+            exog=exog.iloc[start : stop + window] if exog is not None else None,
+        )
+        matrix[start:stop] = X_chunk.to_numpy(dtype=np.float32)
+        y_train[start:stop] = y_chunk.to_numpy(dtype=float)
+    return y_train
+
+
+def fit_out_of_core(
+    forecaster: ForecasterRecursive,
+    y: pd.Series,
+    exog: Optional[pd.DataFrame] = None,
+    memory_mb: float = OUT_OF_CORE_MEMORY_MB,
+    directory: Optional[str] = OUT_OF_CORE_DIR,
+) -> ForecasterRecursive:
+    """
+    Fits `forecaster` (an unfitted ForecasterRecursive with an LGBMRegressor)
+    on `y` and `exog` without materializing the design matrix in memory.
+    In-sample residuals are stored, as with fit(store_in_sample_residuals=True).
+    """
+    regressor = forecaster.regressor
+    n_estimators = regressor.n_estimators
+    window = forecaster.window_size
+
+    with tracer.start_as_current_span("train-out-of-core") as span:
+        start_time = time.perf_counter()
+        # 1. Forecaster state from the last rows, with a one-tree regressor
+        tail = window + STATE_FIT_ROWS
+        regressor.set_params(n_estimators=1)
+        forecaster.fit(
+            y=y.iloc[-tail:],
+            exog=exog.iloc[-tail:] if exog is not None else None,
+            store_in_sample_residuals=False,
+        )
+        regressor.set_params(n_estimators=n_estimators)
+        feature_names = list(forecaster.X_train_features_names_out_)
+
+        # 2. Exog categories from the whole history, transformed once
+        exog_transformed = None
+        if exog is not None:
+            exog_transformed = exog[forecaster.exog_names_in_]
+            if forecaster.transformer_exog is not None:
+                forecaster.transformer_exog.fit(exog_transformed)
+                exog_transformed = forecaster.transformer_exog.transform(
+                    exog_transformed
+                )
+        # Categorical columns lose their dtype in the float32 file; name them
+        # as categorical_feature="auto" would find them in a DataFrame
+        categorical = []
+        if exog_transformed is not None:
+            categorical = [
+                col
+                for col in exog_transformed.columns
+                if isinstance(exog_transformed[col].dtype, pd.CategoricalDtype)
+            ]
+        builder = ForecasterRecursive(
+            regressor=regressor,
+            lags=forecaster.lags,
+            window_features=forecaster.window_features,
+        )
+
+        n_train = len(y) - window
+        rows = chunk_rows(len(feature_names), memory_mb)
+        span.set_attribute("rows", n_train)
+        span.set_attribute("features", len(feature_names))
+        span.set_attribute("chunk_rows", rows)
+        span.set_attribute(
+            "matrix_mb", design_matrix_mb(n_train, len(feature_names), itemsize=4)
+        )
+
+        with tempfile.TemporaryDirectory(dir=directory) as workdir:
+            # 3. Design matrix, chunk by chunk, to disk
+            matrix = np.memmap(
+                os.path.join(workdir, "design.f32"),
+                dtype=np.float32,
+                mode="w+",
+                shape=(n_train, len(feature_names)),
+            )
+            y_train = write_design_matrix(builder, y, exog_transformed, matrix, rows)
+            matrix.flush()
+
+            # 4. LightGBM reads the file back in batches to bin it
+            dataset = lgb.Dataset(
+                MemmapSequence(matrix, batch_size=rows),
+                label=y_train,
+                feature_name=feature_names,
+                categorical_feature=categorical,
+                params={
+                    "verbose": -1,
+                    "bin_construct_sample_cnt": sample_rows(
+                        len(feature_names), memory_mb
+                    ),
+                },
+            )
+            booster = lgb.train(
+                regressor._process_params(stage="fit"),
+                dataset,
+                num_boost_round=n_estimators,
+            )
+            del dataset
+
+            # 5. In-sample residuals, predicted chunk by chunk
+            y_pred = np.concatenate(
+                [
+                    booster.predict(matrix[start : start + rows])
+                    for start in range(0, n_train, rows)
+                ]
+            )
+            del matrix
+
+        regressor._Booster = booster
+        regressor._n_features = booster.num_feature()
+        regressor._best_iteration = booster.best_iteration
+        regressor._best_score = booster.best_score
+        regressor._evals_result = {}
+        forecaster._binning_in_sample_residuals(
+            y_true=y_train, y_pred=y_pred, store_in_sample_residuals=True
+        )
+        forecaster.training_range_ = y.index[[0, -1]]
+
+        logger.info(
+            "Trained out of core.",
+            rows=n_train,
+            features=len(feature_names),
+            chunk_rows=rows,
+            seconds=round(time.perf_counter() - start_time, 2),
+        )
+        return forecaster
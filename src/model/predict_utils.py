@@ -1,16 +1,21 @@
 import pandas as pd
 from loguru import logger
 from opentelemetry import trace
-from src.data.data_loader import *
-from src.data.preprocessing import *
-from src.data.validation import *
-from src.model.forecast_model import *
+
+from src.model.inference import (
+    DEFAULT_N_BOOT,
+    FastRecursivePredictor,
+    fast_predict,
+    quantile_column,
+)
 
 tracer = trace.get_tracer("application.tracer")
 
 
-def predict_future(model, data, exog_features, end_validation_dt, forecast_hours):
-    with tracer.start_as_current_span("make-predictions"):
+def predict_future(
+    model, data, exog_features, end_validation_dt, forecast_hours, last_window=None
+):
+    with tracer.start_as_current_span("make-predictions") as span:
         exog_pred_start_dt = data.index[data.index > end_validation_dt].min()
 
         if pd.isna(exog_pred_start_dt):
@@ -24,7 +29,49 @@ def predict_future(model, data, exog_features, end_validation_dt, forecast_hours
                 f"Not enough future exogenous data for {forecast_hours} steps. Predicting only {len(exog_pred)} steps."
             )
 
-        predictions = model.predict(steps=len(exog_pred), exog=exog_pred)
+        predictions = fast_predict(
+            model, steps=len(exog_pred), exog=exog_pred, last_window=last_window
+        )
+        span.set_attribute(
+            "prediction.engine", "forecaster" if predictions is None else "fast"
+        )
+        if predictions is None and last_window is None:
+            predictions = model.predict(steps=len(exog_pred), exog=exog_pred)
+        elif predictions is None:
+            # Forecast from the end of `last_window` instead of the training data
+            predictions = model.predict(
+                steps=len(exog_pred), last_window=last_window, exog=exog_pred
+            )
         logger.info(f"Predictions made for {len(predictions)} steps.")
 
         return predictions, exog_pred, exog_pred.index
+
+
+def predict_quantiles(model, exog_pred, quantiles, n_boot=None, last_window=None):
+    """
+    Bootstrapped quantiles for the rows of `exog_pred`, one column per
+    quantile (p10, p50, ...), from `n_boot` paths (DEFAULT_N_BOOT if None).
+    Residuals are the in-sample residuals stored when the model was fitted.
+    """
+    n_boot = n_boot or DEFAULT_N_BOOT
+    with tracer.start_as_current_span("predict-quantiles") as span:
+        span.set_attribute("n_boot", n_boot)
+        span.set_attribute("quantiles", ",".join(str(q) for q in quantiles))
+        if FastRecursivePredictor.supports(model):
+            return FastRecursivePredictor(model).predict_quantiles(
+                steps=len(exog_pred),
+                quantiles=quantiles,
+                exog=exog_pred,
+                last_window=last_window,
+                n_boot=n_boot,
+            )
+        result = model.predict_quantiles(
+            steps=len(exog_pred),
+            exog=exog_pred,
+            last_window=last_window,
+            quantiles=quantiles,
+            n_boot=n_boot,
+            use_in_sample_residuals=True,
+        )
+        result.columns = [quantile_column(q) for q in quantiles]
+        return result
@@ -0,0 +1,170 @@
+import os
+import re
+import shutil
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.model.artifact import (
+    ARTIFACT_EXTENSION,
+    HEADER_FILE,
+    load_artifact,
+    read_header,
+    save_artifact,
+)
+
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+_MODEL_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+class ModelNotFoundError(KeyError):
+    pass
+
+
+def validate_model_name(name: str) -> str:
+    if not _MODEL_NAME_PATTERN.match(name) or name.startswith("."):
+        raise ValueError(
+            "Model name must be 1-64 characters of letters, digits, '_', '-' or '.'."
+        )
+    return name
+
+
+class ModelRegistry:
+    """
+    Fitted forecasters persisted under MODEL_DIR (one artifact directory per
+    model, see src.model.artifact) and kept in memory once loaded. In
+    multi-worker mode the registry is filled in the gunicorn master before
+    workers are forked, so every worker shares the same model pages.
+    """
+
+    def __init__(self, model_dir: Optional[str] = None):
+        self.model_dir = model_dir or MODEL_DIR
+        self._models: Dict[str, Any] = {}
+        self._info: Dict[str, Dict[str, Any]] = {}
+        # Artifact version of each loaded model, see _version
+        self._versions: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(
+            self.model_dir, validate_model_name(name) + ARTIFACT_EXTENSION
+        )
+
+    def _version(self, name: str) -> Optional[Tuple[int, int]]:
+        """
+        Inode and mtime of the artifact's header, which every save writes
+        anew; None while no artifact is in place.
+        """
+        try:
+            stat = os.stat(os.path.join(self._path(name), HEADER_FILE))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def save(self, name: str, model, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Persists `model` atomically and makes it available in this process."""
+        path = self._path(name)
+        metadata = dict(metadata or {})
+        metadata.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        os.makedirs(self.model_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        save_artifact(model, tmp_path, metadata)
+        # A directory cannot replace a non-empty one in a single os.replace, so
+        # the old artifact is moved aside first. Readers never see a partially
+        # written artifact; a concurrent load in the short gap gets a 404.
+        old_path = f"{path}.old.{os.getpid()}"
+        if os.path.isdir(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        version = self._version(name)
+        with self._lock:
+            self._models[name] = model
+            self._info[name] = {"name": name, "metadata": metadata, "load_ms": None}
+            self._versions[name] = version
+        logger.info("Model saved to registry.", model_name=name, path=path)
+        return path
+
+    def load(self, name: str):
+        path = self._path(name)
+        if not os.path.exists(path):
+            raise ModelNotFoundError(f"Model '{name}' is not registered.")
+        # Taken before loading, so that a save during the load is seen next time
+        version = self._version(name)
+        model, header = load_artifact(path)
+        with self._lock:
+            self._models[name] = model
+            self._info[name] = {
+                "name": name,
+                "metadata": header.get("metadata", {}),
+                "load_ms": header["load_ms"],
+            }
+            self._versions[name] = version
+        logger.info(
+            "Model loaded from registry.", model_name=name, load_ms=header["load_ms"]
+        )
+        return model
+
+    def available(self) -> List[str]:
+        if not os.path.isdir(self.model_dir):
+            return []
+        return sorted(
+            filename[: -len(ARTIFACT_EXTENSION)]
+            for filename in os.listdir(self.model_dir)
+            if filename.endswith(ARTIFACT_EXTENSION)
+            and os.path.isdir(os.path.join(self.model_dir, filename))
+        )
+
+    def load_all(self) -> List[str]:
+        """Loads every persisted model; used before forking workers."""
+        names = self.available()
+        for name in names:
+            try:
+                self.load(name)
+            except Exception as e:
+                logger.error(f"Failed to load model '{name}': {e}")
+        return names
+
+    def reload(self) -> List[str]:
+        """Drops in-memory models and loads the current contents of MODEL_DIR."""
+        with self._lock:
+            self._models = {}
+            self._info = {}
+            self._versions = {}
+        return self.load_all()
+
+    def get(self, name: str):
+        """
+        Returns a loaded model. Models persisted by another worker since the
+        last (re)load, or saved again since they were loaded here, are
+        loaded on access in this process.
+        """
+        model = self._models.get(name)
+        version = self._version(name)
+        if model is None or (
+            version is not None and version != self._versions.get(name)
+        ):
+            model = self.load(name)
+        return model
+
+    def info(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            loaded = dict(self._info)
+        return [
+            loaded.get(name) or self._unloaded_info(name)
+            for name in sorted(set(loaded) | set(self.available()))
+        ]
+
+    def _unloaded_info(self, name: str) -> Dict[str, Any]:
+        """Describes a model not loaded in this process from its header alone."""
+        try:
+            metadata = read_header(self._path(name)).get("metadata")
+        except (OSError, ValueError):
+            metadata = None
+        return {"name": name, "metadata": metadata, "load_ms": None}
+
+
+registry = ModelRegistry()
@@ -0,0 +1,187 @@
+"""
+Rolling-window statistics that are updated in O(1) per new value.
+
+RollingWindow keeps a running sum and sum of squares (mean, std, sum) and
+monotonic deques (min, max) over the last `window_size` values.
+IncrementalRollingFeatures is a drop-in replacement for skforecast's
+RollingFeatures. Training computes the features with pandas' rolling
+aggregations, which are themselves single-pass. The fast prediction engine
+(src.model.inference) feeds each new prediction into RollingWindow states
+instead of recomputing the statistics over the whole window at every step.
+"""
+
+from collections import deque
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+SUPPORTED_STATS = ("mean", "std", "min", "max", "sum")
+
+
+class RollingWindow:
+    """Sliding-window statistics over the last `window_size` pushed values."""
+
+    def __init__(self, window_size: int):
+        if window_size < 1:
+            raise ValueError("window_size must be >= 1.")
+        self.window_size = window_size
+        self._values = np.zeros(window_size, dtype=float)
+        self._count = 0
+        self._position = 0
+        # Values are summed relative to the first one pushed, which keeps
+        # the sum of squares from cancelling catastrophically in std.
+        self._shift = None
+        self._sum = 0.0
+        self._sum_squares = 0.0
+        self._min = deque()  # (index, value), values increasing
+        self._max = deque()  # (index, value), values decreasing
+
+    def push(self, value: float):
+        value = float(value)
+        if self._shift is None:
+            self._shift = value
+        shifted = value - self._shift
+
+        if self._count >= self.window_size:
+            removed = self._values[self._position] - self._shift
+            self._sum -= removed
+            self._sum_squares -= removed * removed
+        self._values[self._position] = value
+        self._position = (self._position + 1) % self.window_size
+        self._sum += shifted
+        self._sum_squares += shifted * shifted
+
+        index = self._count
+        self._count += 1
+        oldest = self._count - self.window_size
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._min[0][0] < oldest:
+            self._min.popleft()
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        while self._max[0][0] < oldest:
+            self._max.popleft()
+
+    def extend(self, values):
+        for value in values:
+            self.push(value)
+
+    @property
+    def size(self) -> int:
+        return min(self._count, self.window_size)
+
+    def sum(self) -> float:
+        return self._sum + self.size * self._shift
+
+    def mean(self) -> float:
+        return self._sum / self.size + self._shift
+
+    def std(self) -> float:
+        n = self.size
+        if n < 2:
+            return float("nan")
+        variance = (self._sum_squares - self._sum * self._sum / n) / (n - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def min(self) -> float:
+        return self._min[0][1]
+
+    def max(self) -> float:
+        return self._max[0][1]
+
+    def stat(self, name: str) -> float:
+        return getattr(self, name)()
+
+
+class IncrementalRollingFeatures:
+    """
+    skforecast window feature computing rolling `stats` over `window_sizes`
+    (one size per stat, or a single size shared by all of them). Feature
+    names follow RollingFeatures: roll_<stat>_<window_size>.
+    """
+
+    def __init__(
+        self,
+        stats: Union[str, List[str]],
+        window_sizes: Union[int, List[int]],
+        features_names: Optional[List[str]] = None,
+    ):
+        stats = [stats] if isinstance(stats, str) else list(stats)
+        unknown = [stat for stat in stats if stat not in SUPPORTED_STATS]
+        if unknown:
+            raise ValueError(
+                f"Unsupported stats {unknown}. Supported: {list(SUPPORTED_STATS)}."
+            )
+        if isinstance(window_sizes, (int, np.integer)):
+            sizes = [int(window_sizes)] * len(stats)
+        else:
+            sizes = [int(size) for size in window_sizes]
+        if len(sizes) != len(stats):
+            raise ValueError("window_sizes must be an int or have one size per stat.")
+
+        self.stats = stats
+        self.window_sizes = sizes
+        self.max_window_size = max(sizes)
+        self.features_names = features_names or [
+            f"roll_{stat}_{size}" for stat, size in zip(stats, sizes)
+        ]
+
+    def transform_batch(self, X: pd.Series) -> pd.DataFrame:
+        """Features for every training row that has a full window behind it."""
+        features = {}
+        for name, stat, size in zip(self.features_names, self.stats, self.window_sizes):
+            rolling = X.rolling(window=size, min_periods=size, closed="left")
+            features[name] = getattr(rolling, stat)()
+        return pd.DataFrame(features, index=X.index).iloc[self.max_window_size :]
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Features for the step following the window `X` (1D, or 2D by series)."""
+        X = np.asarray(X, dtype=float)
+        results = []
+        for stat, size in zip(self.stats, self.window_sizes):
+            window = X[-size:]
+            if stat == "std":
+                results.append(np.std(window, axis=0, ddof=1))
+            else:
+                results.append(getattr(np, stat)(window, axis=0))
+        return np.stack(results, axis=-1)
+
+    def transform_paths(self, X: np.ndarray) -> np.ndarray:
+        """
+        Features for several paths at once: (n_paths, window) ->
+        (n_paths, n_features).
+        """
+        return self.transform(np.asarray(X).T)
+
+    def start(self, values: np.ndarray) -> "IncrementalRollingState":
+        """Incremental state seeded with the observed `values`."""
+        return IncrementalRollingState(self, values)
+
+
+class IncrementalRollingState:
+    """Per-prediction state of IncrementalRollingFeatures: push, then read."""
+
+    def __init__(self, feature: IncrementalRollingFeatures, values: np.ndarray):
+        self.stats = feature.stats
+        self._windows = {}
+        for size in set(feature.window_sizes):
+            window = RollingWindow(size)
+            window.extend(np.asarray(values, dtype=float)[-size:])
+            self._windows[size] = window
+        self._sizes = feature.window_sizes
+
+    def push(self, value: float):
+        for window in self._windows.values():
+            window.push(value)
+
+    def features(self) -> np.ndarray:
+        return np.array(
+            [
+                self._windows[size].stat(stat)
+                for stat, size in zip(self.stats, self._sizes)
+            ]
+        )
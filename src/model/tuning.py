@@ -0,0 +1,469 @@
+"""
+Time-boxed hyperparameter search.
+
+A probe fits one small model on the tuning history and forecasts one fold
+with it. Its timings give the cost of a trial as a function of boosting
+rounds and validation folds. plan_tuning uses that cost to choose the
+number of trials, the n_estimators range and the number of folds that fit
+the deadline. The Optuna study also gets the remaining time as its timeout.
+A search that runs slower than planned then stops after the current trial
+and keeps the best trial so far.
+
+run_multi_fidelity_search is the successive-halving alternative for long
+histories. Every trial is first scored on the most recent slice of the
+history. Only trials that rank among the best at that length are trained
+on a REDUCTION_FACTOR times longer slice, up to the full history. All
+slices are validated on the same final folds, so scores at one length
+are comparable. It runs as many trials, on as many folds, as the bayesian
+search would (planned the same way under a deadline), so pruning makes it
+cheaper rather than broader. Histories too short for MIN_FIDELITY_RUNGS
+rungs are searched on the full history only, as a shortest rung that is
+not much shorter than the full history saves little.
+If the deadline passes before any trial is scored, LightGBM's defaults
+are scored on the shortest slice and returned instead.
+"""
+
+import copy
+import os
+import time
+import warnings
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import optuna
+import pandas as pd
+from lightgbm import LGBMRegressor
+from loguru import logger
+from opentelemetry import trace
+from optuna.trial import Trial, TrialState
+from skforecast.model_selection import TimeSeriesFold, backtesting_forecaster
+from skforecast.recursive import ForecasterRecursive
+from sklearn.base import clone
+
+from src.model.out_of_core import tuning_rows
+
+tracer = trace.get_tracer("application.tracer")
+
+# Default wall-clock deadline of a tuning call. 0 (the default) keeps the
+# fixed trial count and folds unless the caller passes a deadline
+TUNING_TIME_BUDGET_S = float(os.getenv("TUNING_TIME_BUDGET_S", "0"))
+MIN_TUNING_TRIALS = int(os.getenv("MIN_TUNING_TRIALS", "5"))
+MAX_TUNING_TRIALS = int(os.getenv("MAX_TUNING_TRIALS", "50"))
+MAX_TUNING_FOLDS = int(os.getenv("MAX_TUNING_FOLDS", "20"))
+
+PROBE_ESTIMATORS = 100
+ESTIMATORS_STEP = 100
+MIN_ESTIMATORS = 100
+MAX_ESTIMATORS = 1000
+# Share of the tuning history covered by validation folds when time allows
+VALIDATION_FRACTION = 0.1
+LAGS_GRID = [48, 72, [1, 2, 3, 23, 24, 25, 167, 168, 169]]
+# The probe uses every lag up to the largest one of the grid, which costs
+# at least as much as any lag choice of a trial
+PROBE_LAGS = int(max(np.max(lags) for lags in LAGS_GRID))
+# Lags of the default parameters, when no trial finished before the deadline
+DEFAULT_LAGS = 72
+
+# "bayesian": every trial on the full history; "multi_fidelity": see module docstring
+TUNING_MODES = ("bayesian", "multi_fidelity")
+MULTI_FIDELITY_TRIALS = int(os.getenv("MULTI_FIDELITY_TRIALS", "10"))
+# Shortest training slice of the first rung (four weeks of hours)
+MULTI_FIDELITY_MIN_TRAIN_ROWS = int(os.getenv("MULTI_FIDELITY_MIN_TRAIN_ROWS", "672"))
+REDUCTION_FACTOR = 3
+# With three rungs the shortest trains on about a ninth of the history
+MIN_FIDELITY_RUNGS = 3
+
+
+def tuning_history(
+    y: pd.Series, exog: Optional[pd.DataFrame], window_features: Any = None
+) -> Tuple[pd.Series, Optional[pd.DataFrame]]:
+    """
+    The most recent part of the history that the search tunes on, see
+    src.model.out_of_core.tuning_rows. Features are counted for the widest
+    lag choice of LAGS_GRID.
+    """
+    if window_features is None:
+        window_features = []
+    elif not isinstance(window_features, list):
+        window_features = [window_features]
+    n_features = (
+        PROBE_LAGS
+        + sum(len(np.atleast_1d(wf.features_names)) for wf in window_features)
+        + (exog.shape[1] if exog is not None else 0)
+    )
+    rows = tuning_rows(len(y), n_features)
+    if rows < len(y):
+        logger.info(
+            "Tuning on the most recent rows of an out-of-core history.",
+            rows=rows,
+            history_rows=len(y),
+        )
+        y = y.iloc[-rows:]
+        exog = exog.iloc[-rows:] if exog is not None else None
+    return y, exog
+
+
+def sample_params(
+    trial: Trial, n_estimators_range: Tuple[int, int] = (300, 1000)
+) -> Dict[str, Any]:
+    """LightGBM parameters and lags sampled for one trial."""
+    return {
+        "n_estimators": trial.suggest_int(
+            "n_estimators", *n_estimators_range, step=ESTIMATORS_STEP
+        ),
+        "max_depth": trial.suggest_int("max_depth", 3, 10),
+        "min_child_samples": trial.suggest_int("min_child_samples", 25, 500),
+        "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.5),
+        "feature_fraction": trial.suggest_float("feature_fraction", 0.5, 1.0),
+        "num_leaves": trial.suggest_int("num_leaves", 20, 150),
+        "reg_alpha": trial.suggest_float("reg_alpha", 0.0, 1.0),
+        "reg_lambda": trial.suggest_float("reg_lambda", 0.0, 1.0),
+        "max_bin": trial.suggest_int("max_bin", 50, 250),
+        "lags": trial.suggest_categorical("lags", LAGS_GRID),
+    }
+
+
+def default_fold_count(n_rows: int, steps: int, min_train_rows: int = 0) -> int:
+    """Folds covering VALIDATION_FRACTION of the rows, capped at MAX_TUNING_FOLDS."""
+    n_folds = round(n_rows * VALIDATION_FRACTION / steps)
+    n_folds = min(n_folds, MAX_TUNING_FOLDS, (n_rows - min_train_rows) // steps)
+    return max(1, n_folds)
+
+
+def measure_trial_cost(
+    y: pd.Series,
+    exog: Optional[pd.DataFrame],
+    steps: int,
+    lags: Union[int, List[int]],
+    window_features: Any = None,
+    transformer_exog: Optional[Any] = None,
+    probe_estimators: int = PROBE_ESTIMATORS,
+) -> Dict[str, float]:
+    """
+    Fits a `probe_estimators`-round model on all but the last `steps` rows
+    and forecasts them. Returns the fit and predict seconds.
+    """
+    forecaster = ForecasterRecursive(
+        regressor=LGBMRegressor(n_estimators=probe_estimators, verbose=-1),
+        lags=lags,
+        window_features=copy.deepcopy(window_features),
+        transformer_exog=(
+            clone(transformer_exog) if transformer_exog is not None else None
+        ),
+        fit_kwargs={"categorical_feature": "auto"},
+    )
+    train_end = len(y) - steps
+
+    start = time.perf_counter()
+    forecaster.fit(
+        y=y.iloc[:train_end], exog=exog.iloc[:train_end] if exog is not None else None
+    )
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    forecaster.predict(
+        steps=steps, exog=exog.iloc[train_end:] if exog is not None else None
+    )
+    predict_s = time.perf_counter() - start
+    return {"fit_s": fit_s, "predict_s": predict_s, "estimators": probe_estimators}
+
+
+def plan_tuning(
+    n_rows: int,
+    steps: int,
+    budget_s: float,
+    fit_s: float,
+    predict_s: float,
+    probe_estimators: int = PROBE_ESTIMATORS,
+    min_train_rows: int = 0,
+) -> Dict[str, Any]:
+    """
+    Sizes a search over `n_rows` of history to `budget_s` seconds.
+
+    A trial fits once and forecasts every fold, and both scale with the
+    number of boosting rounds, so a round costs
+    `(fit_s + n_folds * predict_s) / probe_estimators`. Folds are halved,
+    then the n_estimators upper bound is lowered, until a trial at that
+    bound fits MIN_TUNING_TRIALS times in the budget. The number of trials
+    is what the budget affords at the middle of the range.
+    """
+    n_folds = default_fold_count(n_rows, steps, min_train_rows)
+
+    def round_seconds(folds: int) -> float:
+        return (fit_s + folds * predict_s) / probe_estimators
+
+    trial_budget_s = budget_s / MIN_TUNING_TRIALS
+    while n_folds > 1 and round_seconds(n_folds) * MAX_ESTIMATORS > trial_budget_s:
+        n_folds = max(1, n_folds // 2)
+
+    round_s = round_seconds(n_folds)
+    high = MAX_ESTIMATORS
+    if round_s > 0:
+        affordable = int(trial_budget_s / round_s) // ESTIMATORS_STEP * ESTIMATORS_STEP
+        high = max(MIN_ESTIMATORS, min(MAX_ESTIMATORS, affordable))
+    low = max(MIN_ESTIMATORS, min(300, high // 2 // ESTIMATORS_STEP * ESTIMATORS_STEP))
+
+    trial_s = round_s * (low + high) / 2
+    n_trials = int(budget_s / trial_s) if trial_s > 0 else MAX_TUNING_TRIALS
+    n_trials = max(1, min(MAX_TUNING_TRIALS, n_trials))
+
+    return {
+        "n_trials": n_trials,
+        "n_folds": n_folds,
+        "initial_train_size": n_rows - n_folds * steps,
+        "n_estimators": (low, high),
+        "trial_seconds": trial_s,
+    }
+
+
+def plan_tuning_for_deadline(
+    y: pd.Series,
+    exog: Optional[pd.DataFrame],
+    steps: int,
+    deadline: float,
+    lags: Union[int, List[int]],
+    window_features: Any = None,
+    transformer_exog: Optional[Any] = None,
+    min_train_rows: int = 0,
+) -> Dict[str, Any]:
+    """
+    Probes the trial cost on `y`/`exog` and plans a search that ends by
+    `deadline` (a time.monotonic() value). The plan's "timeout" is the
+    time left for the Optuna study after the probe. When that is less than
+    a trial, the plan is a single trial with no timeout.
+    """
+    with tracer.start_as_current_span("plan-tuning") as span:
+        cost = measure_trial_cost(
+            y, exog, steps, lags, window_features, transformer_exog
+        )
+        remaining = max(0.0, deadline - time.monotonic())
+        plan = plan_tuning(
+            n_rows=len(y),
+            steps=steps,
+            budget_s=remaining,
+            fit_s=cost["fit_s"],
+            predict_s=cost["predict_s"],
+            probe_estimators=cost["estimators"],
+            min_train_rows=min_train_rows,
+        )
+        plan["timeout"] = remaining
+        if remaining < plan["trial_seconds"]:
+            # The probe used up the budget: still run one trial, to the end,
+            # so the search returns tuned parameters rather than nothing
+            plan["n_trials"] = 1
+            plan["timeout"] = None
+        span.set_attribute("probe_fit_s", cost["fit_s"])
+        span.set_attribute("n_trials", plan["n_trials"])
+        span.set_attribute("n_folds", plan["n_folds"])
+        span.set_attribute("n_estimators_max", plan["n_estimators"][1])
+        span.set_attribute("time_left_s", remaining)
+        return plan
+
+
+def backtest_params(
+    y: pd.Series,
+    exog: Optional[pd.DataFrame],
+    cv: TimeSeriesFold,
+    params: Dict[str, Any],
+    lags: Union[int, List[int]],
+    window_features: Any = None,
+    transformer_exog: Optional[Any] = None,
+) -> float:
+    """Mean absolute error over `cv` of a forecaster with LightGBM `params`."""
+    forecaster = ForecasterRecursive(
+        regressor=LGBMRegressor(**params),
+        lags=lags,
+        window_features=copy.deepcopy(window_features),
+        transformer_exog=(
+            clone(transformer_exog) if transformer_exog is not None else None
+        ),
+        fit_kwargs={"categorical_feature": "auto"},
+    )
+    metrics, _ = backtesting_forecaster(
+        forecaster=forecaster,
+        y=y,
+        exog=exog,
+        cv=cv,
+        metric="mean_absolute_error",
+        verbose=False,
+        show_progress=False,
+    )
+    return float(metrics["mean_absolute_error"].iloc[0])
+
+
+def default_search_result(score: float, random_state: int) -> Dict[str, Any]:
+    """
+    Search result for LightGBM's default parameters and DEFAULT_LAGS, used
+    when no trial finished before the deadline. `score` is their error.
+    """
+    logger.warning(
+        "No tuning trial finished before the deadline, using the defaults.",
+        score=score,
+    )
+    return {
+        "best_params": {"random_state": random_state, "verbose": -1},
+        "best_lags": DEFAULT_LAGS,
+        "best_score": float(score),
+        "n_trials": 0,
+    }
+
+
+def fidelity_rungs(
+    n_rows: int,
+    validation_rows: int,
+    min_train_rows: int,
+    reduction_factor: int = REDUCTION_FACTOR,
+) -> List[int]:
+    """
+    History lengths a trial is promoted through, shortest first and ending
+    with `n_rows`. Each rung trains on `reduction_factor` times fewer rows
+    than the next, and never on fewer than `min_train_rows`.
+    """
+    train_rows = n_rows - validation_rows
+    rungs = [n_rows]
+    while train_rows // reduction_factor >= min_train_rows:
+        train_rows //= reduction_factor
+        rungs.insert(0, train_rows + validation_rows)
+    return rungs
+
+
+def _best_trial(study: optuna.Study) -> Optional[optuna.trial.FrozenTrial]:
+    completed = [t for t in study.trials if t.state == TrialState.COMPLETE]
+    if completed:
+        return min(completed, key=lambda t: t.value)
+    # Nothing reached the full history in time: best score on the longest slice
+    scored = [t for t in study.trials if t.intermediate_values]
+    if not scored:
+        return None
+    return min(scored, key=lambda t: (-t.last_step, t.intermediate_values[t.last_step]))
+
+
+def run_multi_fidelity_search(
+    data: pd.DataFrame,
+    end_validation: Union[str, pd.Timestamp],
+    exog_features: List[str],
+    window_features: Any = None,
+    transformer_exog: Optional[Any] = None,
+    steps: int = 1,
+    n_trials: int = MULTI_FIDELITY_TRIALS,
+    random_state: int = 15926,
+    time_budget_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Successive-halving search over the history up to `end_validation`,
+    with the length of the (most recent) training history as the budget.
+    Returns the same keys as run_bayesian_hyperparameter_search_and_fit.
+    """
+    start = time.monotonic()
+    if data.index.freq is None:
+        data.index.freq = "h"
+    y, exog = tuning_history(
+        data.loc[:end_validation, "users"],
+        data.loc[:end_validation, exog_features],
+        window_features,
+    )
+
+    min_train_rows = max(MULTI_FIDELITY_MIN_TRAIN_ROWS, 2 * PROBE_LAGS)
+    n_folds = default_fold_count(len(y), steps, min_train_rows)
+    n_estimators_range = (300, 1000)
+    timeout = None
+    if time_budget_s:
+        plan = plan_tuning_for_deadline(
+            y,
+            exog,
+            steps=steps,
+            deadline=start + time_budget_s,
+            lags=PROBE_LAGS,
+            window_features=window_features,
+            transformer_exog=transformer_exog,
+            min_train_rows=min_train_rows,
+        )
+        n_trials = plan["n_trials"]
+        n_folds = plan["n_folds"]
+        n_estimators_range = plan["n_estimators"]
+        timeout = plan["timeout"]
+    validation_rows = n_folds * steps
+    rungs = fidelity_rungs(len(y), validation_rows, min_train_rows)
+    if len(rungs) < MIN_FIDELITY_RUNGS:
+        rungs = rungs[-1:]
+
+    def score_on(rows: int, params: Dict[str, Any], lags) -> float:
+        cv = TimeSeriesFold(
+            steps=steps, initial_train_size=rows - validation_rows, verbose=False
+        )
+        params = {**params, "random_state": random_state, "verbose": -1}
+        return backtest_params(
+            y.iloc[-rows:],
+            exog.iloc[-rows:],
+            cv,
+            params,
+            lags,
+            window_features,
+            transformer_exog,
+        )
+
+    def objective(trial: Trial) -> float:
+        params = sample_params(trial, n_estimators_range)
+        lags = params.pop("lags")
+        for rung, rows in enumerate(rungs):
+            score = score_on(rows, params, lags)
+            if rung == len(rungs) - 1:
+                break
+            # Steps grow like the resource SuccessiveHalvingPruner expects
+            # (1, 3, 9, ...), so that it decides at every rung
+            trial.report(score, REDUCTION_FACTOR**rung)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+        return score
+
+    with tracer.start_as_current_span("multi-fidelity-search") as span:
+        span.set_attribute("rungs", rungs)
+        span.set_attribute("n_folds", n_folds)
+        optuna.logging.set_verbosity(optuna.logging.WARNING)
+        study = optuna.create_study(
+            direction="minimize",
+            sampler=optuna.samplers.TPESampler(seed=random_state),
+            pruner=(
+                optuna.pruners.SuccessiveHalvingPruner(
+                    min_resource=1, reduction_factor=REDUCTION_FACTOR
+                )
+                if len(rungs) > 1
+                else optuna.pruners.NopPruner()
+            ),
+        )
+        with warnings.catch_warnings():
+            # Lag lists are valid categorical choices for the in-memory study
+            warnings.filterwarnings(
+                "ignore", message="Choices for a categorical distribution should be*"
+            )
+            study.optimize(objective, n_trials=n_trials, timeout=timeout)
+
+        best = _best_trial(study)
+        if best is None:
+            return default_search_result(
+                score_on(rungs[0], {}, DEFAULT_LAGS), random_state
+            )
+        pruned = sum(t.state == TrialState.PRUNED for t in study.trials)
+        completed = sum(t.state == TrialState.COMPLETE for t in study.trials)
+        span.set_attribute("trials_pruned", pruned)
+        span.set_attribute("trials_completed", completed)
+        logger.info(
+            "Multi-fidelity search finished.",
+            rungs=rungs,
+            trials=len(study.trials),
+            pruned=pruned,
+            seconds=round(time.monotonic() - start, 3),
+        )
+
+    best_params = {k: v for k, v in best.params.items() if k != "lags"}
+    best_params["random_state"] = random_state
+    best_params["verbose"] = -1
+    best_score = best.value
+    if best_score is None:
+        best_score = best.intermediate_values[best.last_step]
+    return {
+        "best_params": best_params,
+        "best_lags": best.params["lags"],
+        "best_score": float(best_score),
+        "n_trials": completed,
+    }
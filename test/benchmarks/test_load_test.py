@@ -0,0 +1,26 @@
+import argparse
+
+import pytest
+
+from benchmarks.load_test import parse_mix, summarize_latencies
+
+
+def test_parse_mix_normalizes_weights():
+    mix = parse_mix("data-range=3,predict-tuning-db=1")
+    assert mix == {"data-range": 0.75, "predict-tuning-db": 0.25}
+
+
+def test_parse_mix_rejects_unknown_endpoint():
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("predict=1")
+
+
+def test_summarize_latencies_reports_percentiles_and_errors():
+    latencies = [i / 1000 for i in range(1, 101)]
+    summary = summarize_latencies(latencies, errors=5, elapsed_s=10.0)
+
+    assert summary["requests"] == 100
+    assert summary["error_rate"] == 0.05
+    assert summary["throughput_rps"] == 10.0
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["max_ms"] == pytest.approx(100.0)
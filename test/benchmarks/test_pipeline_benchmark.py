@@ -0,0 +1,50 @@
+import pandas as pd
+
+from benchmarks.pipeline_benchmark import compare_reports, parse_cases
+from benchmarks.synthetic import make_hourly_frame
+
+
+def _report(seconds_by_stage):
+    return {
+        "cases": [
+            {
+                "case": "1000x1",
+                "stages": {
+                    stage: {"seconds": seconds, "peak_rss_mb": 1.0}
+                    for stage, seconds in seconds_by_stage.items()
+                },
+            }
+        ]
+    }
+
+
+def test_make_hourly_frame_multi_series_shape():
+    data = make_hourly_frame(1_000, n_series=4)
+
+    assert len(data) == 1_000
+    assert data["series_id"].nunique() == 4
+    assert isinstance(data.index, pd.DatetimeIndex)
+    assert set(data["weather"]) <= {"clear", "mist", "rain"}
+    assert (data["users"] >= 0).all()
+
+
+def test_compare_reports_flags_only_regressions_above_threshold():
+    baseline = _report({"training": 1.0, "tuning": 2.0, "serialization": 0.001})
+    current = _report({"training": 1.5, "tuning": 2.1, "serialization": 0.005})
+
+    regressions = compare_reports(baseline, current, threshold=0.2)
+
+    assert [item["stage"] for item in regressions] == ["training"]
+    assert regressions[0]["change"] == 0.5
+
+
+def test_compare_reports_ignores_skipped_stages():
+    baseline = _report({"tuning": 1.0})
+    current = _report({"tuning": 5.0})
+    current["cases"][0]["stages"]["tuning"]["skipped"] = True
+
+    assert compare_reports(baseline, current) == []
+
+
+def test_parse_cases():
+    assert parse_cases("1000x1, 100000x100") == [(1000, 1), (100000, 100)]
@@ -631,3 +631,28 @@ def mock_combine_forecast_with_truth():
         )
         mock.return_value = mock_df
         yield mock
+
+
+@pytest.fixture(scope="session")
+def small_fitted_forecaster():
+    """A quickly trained ForecasterRecursive on synthetic hourly data."""
+    from lightgbm import LGBMRegressor
+    from skforecast.preprocessing import RollingFeatures
+    from skforecast.recursive import ForecasterRecursive
+
+    from benchmarks.synthetic import make_hourly_frame
+    from src.data.data_loader import create_encoder
+
+    data = make_hourly_frame(24 * 30)
+    data.index.freq = "h"
+    exog_features = [col for col in data.columns if col != "users"]
+    train = data.iloc[:-48]
+    forecaster = ForecasterRecursive(
+        regressor=LGBMRegressor(n_estimators=30, random_state=2025, verbose=-1),
+        lags=[1, 2, 24],
+        window_features=RollingFeatures(stats=["mean"], window_sizes=24),
+        transformer_exog=create_encoder(),
+    )
+    forecaster.fit(y=train["users"], exog=train[exog_features])
+    exog_pred = data.iloc[-48:][exog_features]
+    return forecaster, exog_pred
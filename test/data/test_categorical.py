@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMRegressor
+from sklearn.base import clone
+
+from src.data.categorical import CategoricalCodec
+from src.data.data_loader import create_encoder
+
+
+def make_exog(weather):
+    index = pd.date_range("2025-01-01", periods=len(weather), freq="h", tz="UTC")
+    return pd.DataFrame(
+        {"weather": weather, "temp": np.arange(len(weather), dtype=np.float32)},
+        index=index,
+    )
+
+
+def test_known_values_get_codes_and_unknown_values_minus_one():
+    codec = CategoricalCodec().fit(make_exog(["rain", "clear", "mist", "clear"]))
+    exog = make_exog(["mist", "snow", None, "rain"])
+
+    transformed = codec.transform(exog)
+
+    assert codec.categories_ == {"weather": ["clear", "mist", "rain"]}
+    assert transformed["weather"].cat.codes.tolist() == [1, -1, -1, 2]
+    assert list(transformed.columns) == ["weather", "temp"]
+    assert np.shares_memory(transformed["temp"].to_numpy(), exog["temp"].to_numpy())
+
+
+def test_categorical_input_uses_the_fitted_codes():
+    codec = CategoricalCodec().fit(
+        make_exog(
+            pd.Categorical(["rain", "rain"], categories=["clear", "mist", "rain"])
+        )
+    )
+    exog = make_exog(
+        pd.Categorical(["rain", "snow", "clear", None], categories=["snow", "rain"])
+    )
+
+    transformed = codec.transform(exog)
+
+    assert codec.categories_ == {"weather": ["clear", "mist", "rain"]}
+    assert transformed["weather"].cat.codes.tolist() == [2, -1, -1, -1]
+
+
+def test_lightgbm_splits_on_the_codes_natively():
+    rng = np.random.default_rng(0)
+    weather = rng.choice(["clear", "mist", "rain"], size=500)
+    exog = make_exog(weather)
+    y = np.select([weather == "clear", weather == "mist"], [10.0, 5.0], default=1.0)
+
+    encoder = clone(create_encoder())
+    model = LGBMRegressor(n_estimators=5, min_child_samples=5, verbose=-1)
+    model.fit(encoder.fit_transform(exog), y, categorical_feature="auto")
+
+    assert isinstance(encoder, CategoricalCodec)
+    assert "'=='" in str(model.booster_.dump_model()["tree_info"])
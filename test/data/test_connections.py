@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from psycopg2 import OperationalError
+
+from src.data import connections
+from src.data.connections import (
+    QueryCancelledError,
+    QueryScope,
+    ReplicaRouter,
+    active_queries,
+    connect_for_read,
+)
+
+
+def test_round_robin_skips_failed_replicas():
+    router = ReplicaRouter(["r1", "r2"], "round_robin")
+
+    assert [router.pick("primary") for _ in range(3)] == ["r1", "r2", "r1"]
+    router.record_failure("r2")
+    assert [router.pick("primary") for _ in range(2)] == ["r1", "r1"]
+    router.record_failure("r1")
+    assert router.pick("primary") == "primary"
+
+
+def test_least_latency_samples_every_replica_first():
+    router = ReplicaRouter(["r1", "r2"], "least_latency")
+    router.record("r1", 0.05)
+
+    assert router.pick("primary") == "r2"
+    router.record("r2", 0.01)
+    assert router.pick("primary") == "r2"
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        ReplicaRouter(["r1"], "random")
+
+
+def test_read_falls_back_to_the_primary(monkeypatch):
+    monkeypatch.setattr(connections, "replica_router", ReplicaRouter(["r1"]))
+    monkeypatch.setattr(connections, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    primary_connection = MagicMock()
+
+    def connect(**kwargs):
+        if kwargs["host"] == "r1":
+            raise OperationalError("replica down")
+        return primary_connection
+
+    with patch("src.data.connections.psycopg2.connect", side_effect=connect) as mock:
+        assert connect_for_read("primary", "db", "user", "pw") is primary_connection
+
+    assert mock.call_args.kwargs["options"] == "-c statement_timeout=5000"
+    assert connections.replica_router.pick("primary") == "primary"
+
+
+def test_cancelled_scope_cancels_and_refuses_connections():
+    scope = QueryScope()
+    token = active_queries.set(scope)
+    connection = MagicMock()
+    try:
+        with patch("src.data.connections.psycopg2.connect", return_value=connection):
+            connect_for_read("primary", "db", "user", "pw")
+            scope.cancel()
+            connection.cancel.assert_called_once()
+
+            with pytest.raises(QueryCancelledError):
+                connect_for_read("primary", "db", "user", "pw")
+    finally:
+        active_queries.reset(token)
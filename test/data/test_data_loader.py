@@ -2,6 +2,7 @@ import os
 from datetime import datetime
 from unittest.mock import patch
 
+import numpy as np
 import pandas as pd
 import pytest
 from fastapi import HTTPException
@@ -12,7 +13,11 @@ from src.data.data_loader import (
     get_min_max_time_from_db,
     load_data_from_csv,
 )
-from src.data.preprocessing import extract_target_and_exog, prepare_time_series_data
+from src.data.preprocessing import (
+    compact_dtypes,
+    extract_target_and_exog,
+    prepare_time_series_data,
+)
 
 DEFAULT_DB_HOST = "localhost"
 DEFAULT_DB_NAME = "postgres"
@@ -67,6 +72,29 @@ def test_extract_target_and_exog_with_real_csv(dataframe_from_csv):
     assert len(y) == len(exog)  # aligned
 
 
+def test_compact_dtypes_downcasts_and_keeps_values(dataframe_from_csv):
+    data = dataframe_from_csv.copy()
+    data.loc[data.index[1], "weather"] = "snow"
+
+    compact = compact_dtypes(data.copy())
+
+    assert compact["users"].dtype == np.int16
+    assert compact["holiday"].dtype == np.int8
+    assert compact["temp"].dtype == np.float32
+    assert list(compact["weather"].cat.categories) == ["clear", "mist", "rain", "snow"]
+    assert compact["weather"].tolist() == ["clear", "snow"]
+    np.testing.assert_allclose(compact["temp"], data["temp"], rtol=1e-6)
+
+
+def test_extract_target_and_exog_returns_views(dataframe_from_csv):
+    df_prepared = prepare_time_series_data(dataframe_from_csv)
+    y, exog, _ = extract_target_and_exog(df_prepared)
+
+    assert np.shares_memory(y.to_numpy(), df_prepared["users"].to_numpy())
+    assert np.shares_memory(exog["temp"].to_numpy(), df_prepared["temp"].to_numpy())
+    assert exog.index.freqstr == "h"
+
+
 def test_load_data_from_csv_invalid_datetime_format(
     create_mock_upload_file, sample_csv_content_invalid_datetime_format
 ):
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fixtures.fake_db import FakeConnection, FakeCursor
+
+from benchmarks.synthetic import make_hourly_frame
+from src.data import feature_store
+from src.data.feature_store import (
+    build_store_query,
+    compute_features,
+    incremental_features,
+    load_data_with_store_features,
+    materialize_features,
+)
+
+PARAMS = ("db", "postgres", "postgres", "", "application", "feature", "date_time")
+
+
+@pytest.fixture
+def raw_rows():
+    data = make_hourly_frame(24 * 14)
+    return data[["users", "holiday"]]
+
+
+def test_compute_features_matches_shifted_history(raw_rows):
+    features = compute_features(raw_rows, lags=[1, 24], windows=[3])
+    users = raw_rows["users"].to_numpy(dtype=float)
+
+    assert features["users_lag_24"].iloc[30] == users[6]
+    assert features["users_rolling_mean_3"].iloc[10] == pytest.approx(
+        users[7:10].mean()
+    )
+    assert features["users_rolling_mean_3"].iloc[:3].isna().all()
+    assert list(features["hour"].iloc[:2]) == list(raw_rows.index.hour[:2])
+
+
+def test_incremental_features_match_a_full_rebuild(raw_rows):
+    lags, windows = [1, 24, 168], [24, 72]
+    full = compute_features(raw_rows, lags, windows)
+
+    watermark = raw_rows.index[250]
+    context = raw_rows.loc[watermark - pd.Timedelta(hours=167) :]
+    incremental = incremental_features(context, watermark, lags, windows)
+
+    assert incremental.index[0] == raw_rows.index[251]
+    expected = full.loc[incremental.index]
+    np.testing.assert_allclose(
+        incremental.drop(columns=["is_weekend", "is_holiday"]).to_numpy(dtype=float),
+        expected.drop(columns=["is_weekend", "is_holiday"]).to_numpy(dtype=float),
+    )
+
+
+def test_store_query_joins_calendar_columns():
+    sql = build_store_query("application", "feature", "date_time", ["hour"])
+
+    assert 's."hour"' in sql
+    assert '"application"."feature_store" s' in sql
+
+
+@pytest.mark.parametrize(
+    "columns", [["hour", "users_lag_1"], ["users_rolling_mean_24"], ["temp"]]
+)
+def test_store_query_rejects_columns_unknown_over_the_horizon(columns):
+    with pytest.raises(ValueError):
+        build_store_query("application", "feature", "date_time", columns)
+
+
+def test_load_with_store_features_indexes_by_time(monkeypatch):
+    cursor = FakeCursor(
+        {"LEFT JOIN": [("2025-01-01 00:00:00+00", 5, 0)]},
+        columns=["date_time", "users", "hour"],
+    )
+    connection = FakeConnection(cursor)
+    monkeypatch.setattr(feature_store, "get_db_connection_params", lambda: PARAMS)
+    monkeypatch.setattr(feature_store, "connect_for_read", lambda *a: connection)
+
+    data = load_data_with_store_features("2025-01-01", "2025-01-02", ["hour"])
+
+    assert list(data.columns) == ["users", "hour"]
+    assert data.index[0] == pd.Timestamp("2025-01-01", tz="UTC")
+    assert cursor.sql("LEFT JOIN")[0][1] == ("2025-01-01", "2025-01-02")
+    assert connection.closed
+
+
+def test_materialize_reads_context_after_the_watermark(monkeypatch, raw_rows):
+    watermark = raw_rows.index[199]
+    rows = [
+        (timestamp.to_pydatetime(), users, holiday)
+        for timestamp, users, holiday in raw_rows.loc[
+            raw_rows.index > watermark - pd.Timedelta(hours=168)
+        ].itertuples()
+    ]
+    cursor = FakeCursor(
+        {
+            "SELECT MAX(date_time)": [(watermark.to_pydatetime(),)],
+            "users, holiday": rows,
+        }
+    )
+    connection = FakeConnection(cursor)
+    upserted = []
+    monkeypatch.setattr(feature_store, "get_db_connection_params", lambda: PARAMS)
+    monkeypatch.setattr(feature_store.psycopg2, "connect", lambda **kw: connection)
+    monkeypatch.setattr(
+        feature_store,
+        "execute_values",
+        lambda cursor, sql, rows, page_size: upserted.extend(rows),
+    )
+
+    written = materialize_features()
+
+    assert written == len(raw_rows) - 200
+    assert upserted[0][0] == raw_rows.index[200].to_pydatetime()
+    assert cursor.sql("users, holiday")[0][1] == (
+        (watermark - pd.Timedelta(hours=168)).to_pydatetime(),
+    )
+    assert cursor.sql("CREATE TABLE IF NOT EXISTS")
+    assert connection.committed and connection.closed
@@ -30,6 +30,21 @@ def test_combine_forecast_with_truth_with_numpy(mock_exog_pred, mock_data_with_u
     assert all(result["predicted_users"] == np.ceil(predictions).astype(int))
 
 
+def test_combine_forecast_with_truth_with_quantiles(
+    mock_predictions, mock_exog_pred, mock_data_with_users
+):
+    quantiles = pd.DataFrame(
+        {"p10": [90.2, 140.0, 120.5], "p90": [110.1, 160.7, 140.0]},
+        index=mock_exog_pred.index,
+    )
+    result = combine_forecast_with_truth(
+        mock_predictions, mock_exog_pred, mock_data_with_users, quantiles
+    )
+
+    assert list(result.columns[:4]) == ["predicted_users", "p10", "p90", "real_users"]
+    assert list(result["p10"]) == [91, 140, 121]
+
+
 def test_combine_forecast_with_truth_missing_users_column(mock_exog_pred):
     index = pd.date_range("2025-01-01 00:00", periods=5, freq="h", tz="UTC")
     bad_data = pd.DataFrame({"temp": [22.0, 23.0, 24.0, 25.0, 26.0]}, index=index)
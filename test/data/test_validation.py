@@ -1,8 +1,13 @@
+import numpy as np
 import pandas as pd
 import pytest
 from sklearn.metrics import mean_absolute_error
 
-from src.data.validation import get_validation_cutoff
+from src.data.validation import (
+    DataValidationError,
+    get_validation_cutoff,
+    validate_data,
+)
 from src.model.forecast_model import evaluate_forecast
 
 
@@ -14,6 +19,74 @@ def test_get_validation_cutoff_raises_when_data_insufficient():
         get_validation_cutoff(df, forecast_hours=2)
 
 
+def make_hourly_data(periods=48):
+    index = pd.date_range("2025-01-01", periods=periods, freq="h", tz="UTC")
+    return pd.DataFrame(
+        {"users": np.arange(periods, dtype=float), "hum": 50.0}, index=index
+    )
+
+
+def failed_checks(data, **kwargs):
+    with pytest.raises(DataValidationError) as error:
+        validate_data(data, **kwargs)
+    return [failure["check"] for failure in error.value.failures]
+
+
+def test_validate_data_accepts_clean_data():
+    validate_data(make_hourly_data(), min_rows=26)
+
+
+def test_validate_data_reports_every_failed_check():
+    data = make_hourly_data()
+    data = pd.concat([data, data.iloc[:5]]).sort_index()  # 10% duplicates
+    data.iloc[:20, 0] = np.nan
+    data.iloc[-1, 1] = 140.0
+
+    assert failed_checks(data, min_rows=60) == [
+        "rows",
+        "duplicates",
+        "missing",
+        "range",
+    ]
+
+
+def test_validate_data_rejects_gaps_and_constant_series():
+    data = make_hourly_data().iloc[::2]
+    data["users"] = 3.0
+
+    assert failed_checks(data) == ["gaps", "constant"]
+
+
+def test_validate_data_checks_database_resampled_rows_for_gaps():
+    # Gap-free hours, of which the raw table only had every other one
+    data = make_hourly_data()
+    data.attrs.update(raw_rows=24, raw_hours=24)
+
+    assert failed_checks(data) == ["gaps"]
+
+
+def test_validate_data_stops_at_schema_failures():
+    data = make_hourly_data().rename(columns={"users": "riders"})
+    data["hum"] = "humid"
+
+    with pytest.raises(DataValidationError) as error:
+        validate_data(data)
+
+    assert error.value.to_dict()["failures"] == [
+        {
+            "check": "schema",
+            "message": "Missing required column 'users'.",
+            "column": "users",
+        },
+        {
+            "check": "schema",
+            "message": "Column 'hum' must be numeric.",
+            "column": "hum",
+        },
+    ]
+    assert isinstance(error.value, ValueError)
+
+
 def test_evaluate_forecast_valid_case():
     index = pd.date_range("2025-01-01", periods=3, freq="h", tz="UTC")
     real = [100, 120, 110]
@@ -0,0 +1,149 @@
+"""
+In-memory stand-ins for psycopg2 and asyncpg connections, for testing the
+data layer without a database.
+"""
+
+import threading
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+
+class FakeCursor:
+    """
+    Answers each query with the rows of the first `responses` key found in
+    its SQL (queries that match nothing return no rows). A response can be
+    a list of rows or a function of the query parameters returning one.
+    """
+
+    def __init__(self, responses=None, columns=(), error=None):
+        self.responses = responses or {}
+        self.columns = list(columns)
+        self.error = error
+        self.executed = []
+        self.description = None
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        if self.error is not None:
+            raise self.error
+        self._rows = []
+        for fragment, rows in self.responses.items():
+            if fragment in sql:
+                self._rows = list(rows(params) if callable(rows) else rows)
+                break
+        self.description = [(name,) for name in self.columns]
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def sql(self, fragment):
+        """The executed statements containing `fragment`, with their parameters."""
+        return [(sql, params) for sql, params in self.executed if fragment in sql]
+
+
+class FakeConnection:
+    def __init__(self, cursor=None):
+        self._cursor = cursor or FakeCursor()
+        self.committed = False
+        self.rolled_back = False
+        self.closed = False
+        self.cancelled = False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakeAsyncStatement:
+    def __init__(self, cursor, sql):
+        self._cursor = cursor
+        self._sql = sql
+
+    async def fetch(self, *params):
+        self._cursor.execute(self._sql, params)
+        return self._cursor.fetchall()
+
+    def get_attributes(self):
+        return [SimpleNamespace(name=name) for name in self._cursor.columns]
+
+
+class FakeAsyncConnection:
+    """An asyncpg connection answering from a FakeCursor."""
+
+    def __init__(self, cursor=None):
+        self.cursor = cursor or FakeCursor()
+
+    async def prepare(self, sql):
+        return FakeAsyncStatement(self.cursor, sql)
+
+    async def fetchrow(self, sql, *params):
+        self.cursor.execute(sql, params)
+        return self.cursor.fetchone()
+
+    async def fetchval(self, sql, *params):
+        row = await self.fetchrow(sql, *params)
+        return None if row is None else row[0]
+
+
+class FakeAsyncPool:
+    def __init__(self, connection=None):
+        self.connection = connection or FakeAsyncConnection()
+        self.closed = False
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.connection
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePool:
+    """
+    A psycopg2 connection pool handing out a new FakeConnection per getconn,
+    each with its own FakeCursor over the same responses.
+    """
+
+    def __init__(self, responses=None, columns=()):
+        self.responses = responses or {}
+        self.columns = columns
+        self.connections = []
+        self.returned = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        connection = FakeConnection(FakeCursor(self.responses, self.columns))
+        with self._lock:
+            self.connections.append(connection)
+        return connection
+
+    def putconn(self, connection, close=False):
+        with self._lock:
+            self.returned.append((connection, close))
+
+    def closeall(self):
+        self.closed = True
+
+    def sql(self, fragment):
+        """The statements containing `fragment` run on any connection."""
+        return [
+            statement
+            for connection in self.connections
+            for statement in connection.cursor().sql(fragment)
+        ]
@@ -0,0 +1,63 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from src.model.artifact import SHELL_FILE, load_artifact, read_header, save_artifact
+
+
+def test_artifact_round_trip_predicts_identically(small_fitted_forecaster, tmp_path):
+    forecaster, exog_pred = small_fitted_forecaster
+    directory = str(tmp_path / "station-1.model")
+
+    save_artifact(forecaster, directory, metadata={"mae": 1.5})
+    loaded, header = load_artifact(directory)
+
+    pd.testing.assert_series_equal(
+        loaded.predict(steps=len(exog_pred), exog=exog_pred),
+        forecaster.predict(steps=len(exog_pred), exog=exog_pred),
+    )
+    assert header["boosters"] == ["booster.txt"]
+    assert header["load_ms"] >= 0
+    # The original forecaster keeps its booster
+    assert forecaster.regressor.booster_ is not None
+
+
+def test_header_describes_the_forecaster(small_fitted_forecaster, tmp_path):
+    forecaster, _ = small_fitted_forecaster
+    directory = str(tmp_path / "station-1.model")
+    save_artifact(forecaster, directory, metadata={"mae": 1.5})
+
+    header = read_header(directory)
+    assert header["lags"] == [1, 2, 24]
+    assert header["window_features"][0]["stats"] == ["mean"]
+    assert header["encoder_categories"]["weather"] == ["clear", "mist", "rain"]
+    assert header["last_window"]["length"] == len(forecaster.last_window_)
+    assert header["metadata"] == {"mae": 1.5}
+
+
+def test_last_window_is_memory_mapped(small_fitted_forecaster, tmp_path):
+    forecaster, _ = small_fitted_forecaster
+    directory = str(tmp_path / "station-1.model")
+    save_artifact(forecaster, directory)
+
+    _, header = load_artifact(directory)
+    values = header["last_window_values"]
+    assert isinstance(values, np.memmap)
+    np.testing.assert_allclose(values, forecaster.last_window_.to_numpy().ravel())
+
+
+def test_last_window_is_restored_from_the_memory_map(small_fitted_forecaster, tmp_path):
+    forecaster, _ = small_fitted_forecaster
+    directory = str(tmp_path / "station-1.model")
+    save_artifact(forecaster, directory)
+
+    with open(os.path.join(directory, SHELL_FILE), "rb") as f:
+        assert pickle.load(f).last_window_ is None
+    loaded, header = load_artifact(directory)
+
+    pd.testing.assert_frame_equal(loaded.last_window_, forecaster.last_window_)
+    assert np.shares_memory(
+        loaded.last_window_.to_numpy(), header["last_window_values"]
+    )
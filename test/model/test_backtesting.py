@@ -0,0 +1,88 @@
+import pytest
+
+from benchmarks.synthetic import make_hourly_frame
+from src.model import backtesting
+from src.model.backtesting import (
+    backtest_forecaster,
+    build_design,
+    fold_origins,
+    should_fan_out,
+)
+
+PARAMS = {"n_estimators": 20, "num_leaves": 8, "verbose": -1}
+
+
+@pytest.fixture
+def series():
+    data = make_hourly_frame(24 * 21)
+    data.index.freq = "h"
+    return data["users"], data.drop(columns=["users"])
+
+
+def test_backtest_reports_folds_and_steps(series):
+    y, exog = series
+    result = backtest_forecaster(
+        y,
+        exog,
+        steps=12,
+        n_folds=3,
+        lags=[1, 24],
+        window_sizes=24,
+        params=PARAMS,
+        n_workers=1,
+    )
+
+    assert [fold["fold"] for fold in result["folds"]] == [0, 1, 2]
+    assert result["folds"][-1]["test_end"] == str(y.index[-1])
+    assert [step["step"] for step in result["per_step"]] == list(range(1, 13))
+    assert result["overall"]["mae"] > 0
+
+
+def test_design_matrix_is_cached(series):
+    y, exog = series
+    first = build_design(y, exog, [1, 24], 24)
+    assert build_design(y, exog, [1, 24], 24) is first
+    assert build_design(y, exog, [1, 2, 24], 24) is not first
+
+
+def test_fold_origins_need_enough_history():
+    assert fold_origins(100, 10, 3, min_train_rows=48) == [70, 80, 90]
+    with pytest.raises(ValueError):
+        fold_origins(100, 10, 9, min_train_rows=48)
+
+
+def test_folds_fan_out_to_a_pool_with_the_same_results(series, monkeypatch):
+    monkeypatch.setattr(backtesting, "BACKTEST_POOL_STARTUP_S", 0.0)
+    y, exog = series
+    kwargs = dict(steps=12, n_folds=3, lags=[1, 24], window_sizes=24)
+    params = dict(PARAMS, n_jobs=1)
+
+    serial = backtest_forecaster(y, exog, **kwargs, params=params, n_workers=1)
+    pooled = backtest_forecaster(y, exog, **kwargs, params=params, n_workers=2)
+
+    assert serial["n_workers"] == 1 and pooled["n_workers"] == 2
+    assert pooled["folds"] == serial["folds"]
+
+
+def test_cheap_folds_stay_in_process(series, monkeypatch):
+    monkeypatch.setattr(backtesting, "BACKTEST_POOL_STARTUP_S", 1e9)
+    y, exog = series
+    result = backtest_forecaster(
+        y,
+        exog,
+        steps=12,
+        n_folds=3,
+        lags=[1, 24],
+        window_sizes=24,
+        params=PARAMS,
+        n_workers=4,
+    )
+
+    assert result["n_workers"] == 1
+
+
+def test_fan_out_must_beat_the_pool_startup(monkeypatch):
+    monkeypatch.setattr(backtesting, "BACKTEST_POOL_STARTUP_S", 5.0)
+    assert should_fan_out(fold_s=2.0, n_folds=8, n_workers=4)
+    assert not should_fan_out(fold_s=0.2, n_folds=8, n_workers=4)
+    assert not should_fan_out(fold_s=60.0, n_folds=8, n_workers=1)
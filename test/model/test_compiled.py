@@ -0,0 +1,84 @@
+import copy
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_hourly_frame
+from src.model import forecast_model
+from src.model.artifact import load_artifact, save_artifact
+from src.model.compiled import compile_booster, compile_dump
+from src.model.inference import FastRecursivePredictor, _CompiledRowScorer
+
+
+def test_compiled_booster_matches_lightgbm():
+    from lightgbm import LGBMRegressor
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 6))
+    X[:, 5] = rng.integers(0, 4, size=500)
+    X[rng.random(500) < 0.05, 2] = np.nan
+    y = X[:, 0] * 3 + np.sin(X[:, 1]) + X[:, 5]
+    model = LGBMRegressor(n_estimators=40, num_leaves=15, verbose=-1)
+    model.fit(X, y, categorical_feature=[5])
+
+    X_test = rng.normal(size=(200, 6))
+    X_test[:, 5] = rng.integers(-1, 6, size=200)
+    X_test[::7, 2] = np.nan
+    compiled = compile_booster(model.booster_)
+
+    np.testing.assert_allclose(
+        compiled.predict(X_test), model.predict(X_test), rtol=1e-12
+    )
+
+
+def test_fast_predictor_uses_compiled_booster(small_fitted_forecaster, tmp_path):
+    forecaster, exog_pred = small_fitted_forecaster
+    forecaster = copy.deepcopy(forecaster)
+    forecaster.compiled_booster_ = compile_booster(forecaster.regressor.booster_)
+    expected = forecaster.predict(steps=len(exog_pred), exog=exog_pred)
+
+    save_artifact(forecaster, str(tmp_path / "compiled.model"))
+    loaded, _ = load_artifact(str(tmp_path / "compiled.model"))
+    assert isinstance(loaded.compiled_booster_.leaf_value, np.memmap)
+    loaded.regressor._Booster = None
+
+    result = FastRecursivePredictor(loaded).predict(
+        steps=len(exog_pred), exog=exog_pred
+    )
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_unsupported_objective_is_rejected():
+    with pytest.raises(ValueError):
+        compile_dump({"objective": "binary sigmoid:1", "tree_info": []})
+
+
+def test_exported_compiled_booster_scores_predictions(small_fitted_forecaster):
+    forecaster, exog_pred = small_fitted_forecaster
+    forecaster = copy.deepcopy(forecaster)
+    forecaster.compiled_booster_ = compile_booster(forecaster.regressor.booster_)
+    predictor = FastRecursivePredictor(forecaster)
+
+    assert isinstance(predictor._row_scorer(), _CompiledRowScorer)
+    np.testing.assert_allclose(
+        predictor.predict(steps=len(exog_pred), exog=exog_pred).to_numpy(),
+        forecaster.predict(steps=len(exog_pred), exog=exog_pred).to_numpy(),
+        rtol=1e-12,
+    )
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_training_compiles_only_when_enabled(monkeypatch, enabled):
+    monkeypatch.setattr(forecast_model, "COMPILE_BOOSTER", enabled)
+    data = make_hourly_frame(24 * 20)
+    data.index.freq = "h"
+
+    model = forecast_model.train_forecaster_with_best_params(
+        data=data,
+        end_validation=data.index[-7],
+        exog_features=[],
+        best_params={"n_estimators": 10, "num_leaves": 8, "verbose": -1},
+        best_lags=[1, 24],
+    )
+
+    assert (getattr(model, "compiled_booster_", None) is not None) == enabled
@@ -0,0 +1,56 @@
+import pytest
+from skforecast.direct import ForecasterDirect
+
+from benchmarks.synthetic import make_hourly_frame
+from src.data.data_loader import create_encoder
+from src.model.artifact import load_artifact, save_artifact
+from src.model.forecast_model import train_forecaster_with_best_params
+from src.model.rolling import IncrementalRollingFeatures
+
+BEST_PARAMS = {"n_estimators": 10, "num_leaves": 8, "random_state": 1, "verbose": -1}
+
+
+@pytest.fixture
+def hourly_data():
+    data = make_hourly_frame(24 * 20)
+    data.index.freq = "h"
+    return data
+
+
+def test_direct_model_predicts_every_step(hourly_data, tmp_path):
+    exog_features = [col for col in hourly_data.columns if col != "users"]
+    end_validation = hourly_data.index[-7]
+
+    model = train_forecaster_with_best_params(
+        data=hourly_data,
+        end_validation=end_validation,
+        exog_features=exog_features,
+        window_features=IncrementalRollingFeatures(stats=["mean"], window_sizes=24),
+        transformer_exog=create_encoder(),
+        best_params=BEST_PARAMS,
+        best_lags=[1, 24],
+        model_type="direct",
+        steps=6,
+    )
+    exog_pred = hourly_data.loc[end_validation:, exog_features].iloc[1:]
+    predictions = model.predict(steps=6, exog=exog_pred)
+
+    assert isinstance(model, ForecasterDirect)
+    assert len(predictions) == 6
+
+    save_artifact(model, str(tmp_path / "direct.model"))
+    loaded, header = load_artifact(str(tmp_path / "direct.model"))
+    assert len(header["boosters"]) == 6
+    assert loaded.predict(steps=6, exog=exog_pred).equals(predictions)
+
+
+def test_direct_model_requires_steps(hourly_data):
+    with pytest.raises(ValueError):
+        train_forecaster_with_best_params(
+            data=hourly_data,
+            end_validation=hourly_data.index[-7],
+            exog_features=[],
+            best_params=BEST_PARAMS,
+            best_lags=[1, 24],
+            model_type="direct",
+        )
@@ -0,0 +1,110 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from src.model import forecast_model, predict_utils
+from src.model.inference import FastRecursivePredictor, fast_predict
+
+
+def test_fast_predictor_matches_forecaster(small_fitted_forecaster):
+    forecaster, exog_pred = small_fitted_forecaster
+
+    expected = forecaster.predict(steps=len(exog_pred), exog=exog_pred)
+    result = FastRecursivePredictor(forecaster).predict(
+        steps=len(exog_pred), exog=exog_pred
+    )
+
+    pd.testing.assert_index_equal(result.index, expected.index)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_fast_predictor_matches_forecaster_with_last_window(small_fitted_forecaster):
+    forecaster, exog_pred = small_fitted_forecaster
+    # Same timestamps as the training window, different history
+    last_window = forecaster.last_window_["users"] * 1.1
+
+    expected = forecaster.predict(steps=12, last_window=last_window, exog=exog_pred)
+    result = fast_predict(forecaster, steps=12, exog=exog_pred, last_window=last_window)
+
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_fast_predict_skips_unsupported_models(fake_forecast_model):
+    assert fast_predict(fake_forecast_model, steps=3) is None
+
+
+def test_fast_predictor_with_incremental_rolling_features(small_fitted_forecaster):
+    from lightgbm import LGBMRegressor
+    from skforecast.recursive import ForecasterRecursive
+
+    from src.model.rolling import IncrementalRollingFeatures
+
+    fitted, exog_pred = small_fitted_forecaster
+    forecaster = ForecasterRecursive(
+        regressor=LGBMRegressor(n_estimators=10, random_state=2025, verbose=-1),
+        lags=[1, 24],
+        window_features=IncrementalRollingFeatures(
+            stats=["mean", "std", "max"], window_sizes=24
+        ),
+    )
+    y = fitted.last_window_["users"]
+    history = pd.Series(
+        np.resize(y.to_numpy(), 24 * 10),
+        index=pd.date_range(end=y.index[-1], periods=24 * 10, freq="h"),
+        name="users",
+    )
+    forecaster.fit(y=history)
+
+    expected = forecaster.predict(steps=48)
+    result = fast_predict(forecaster, steps=48)
+
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-9)
+
+
+def test_bootstrapped_quantiles_are_ordered(small_fitted_forecaster):
+    forecaster, exog_pred = small_fitted_forecaster
+    forecaster = copy.deepcopy(forecaster)
+    forecaster.in_sample_residuals_ = np.random.default_rng(0).normal(0, 5, 200)
+
+    result = FastRecursivePredictor(forecaster).predict_quantiles(
+        steps=24, quantiles=[0.1, 0.5, 0.9], exog=exog_pred, n_boot=100
+    )
+
+    assert list(result.columns) == ["p10", "p50", "p90"]
+    assert len(result) == 24
+    assert (result["p10"] <= result["p50"]).all()
+    assert (result["p50"] <= result["p90"]).all()
+
+
+def test_csv_forecast_uses_the_fast_predictor(
+    monkeypatch, csv_file_path, create_mock_upload_file
+):
+    def search(data, **kwargs):
+        data.index.freq = "h"  # as the real search does
+        return {
+            "best_params": {"n_estimators": 20, "random_state": 0, "verbose": -1},
+            "best_lags": 24,
+            "best_score": 0.0,
+            "n_trials": 1,
+        }
+
+    monkeypatch.setattr(
+        forecast_model, "run_bayesian_hyperparameter_search_and_fit", search
+    )
+    engines = []
+
+    def recording_fast_predict(*args, **kwargs):
+        predictions = fast_predict(*args, **kwargs)
+        engines.append("fast" if predictions is not None else "forecaster")
+        return predictions
+
+    monkeypatch.setattr(predict_utils, "fast_predict", recording_fast_predict)
+
+    forecast_df, mae = forecast_model.forecast_with_tuning(
+        create_mock_upload_file(csv_file_path.read_bytes()), 24, 24
+    )
+
+    assert engines == ["fast"]
+    assert len(forecast_df) == 24
+    assert mae >= 0
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+from lightgbm import LGBMRegressor
+from skforecast.recursive import ForecasterRecursive
+
+from benchmarks.synthetic import make_hourly_frame
+from src.data.data_loader import create_encoder
+from src.model import forecast_model, out_of_core, tuning
+from src.model.out_of_core import (
+    chunk_rows,
+    fit_out_of_core,
+    sample_rows,
+    tuning_rows,
+    write_design_matrix,
+)
+from src.model.rolling import IncrementalRollingFeatures
+from src.model.tuning import PROBE_LAGS, tuning_history
+
+PARAMS = {"n_estimators": 30, "num_leaves": 8, "verbose": -1, "random_state": 7}
+
+
+def make_forecaster():
+    return ForecasterRecursive(
+        regressor=LGBMRegressor(**PARAMS),
+        lags=[1, 2, 24],
+        window_features=IncrementalRollingFeatures(stats=["mean"], window_sizes=12),
+        transformer_exog=create_encoder(),
+        fit_kwargs={"categorical_feature": "auto"},
+    )
+
+
+@pytest.fixture
+def series():
+    data = make_hourly_frame(24 * 21)
+    data.index.freq = "h"
+    return data["users"], data.drop(columns=["users"])
+
+
+def test_chunked_matrix_matches_the_in_memory_one(series):
+    y, exog = series
+    forecaster = make_forecaster()
+    forecaster.fit(y=y, exog=exog)
+    X, y_train = forecaster.create_train_X_y(y=y, exog=exog)
+
+    builder = ForecasterRecursive(
+        regressor=LGBMRegressor(),
+        lags=forecaster.lags,
+        window_features=forecaster.window_features,
+    )
+    matrix = np.empty(X.shape, dtype=np.float32)
+    targets = write_design_matrix(
+        builder, y, forecaster.transformer_exog.transform(exog), matrix, 37
+    )
+
+    np.testing.assert_array_equal(matrix, X.to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(targets, y_train.to_numpy())
+
+
+def test_out_of_core_fit_matches_an_in_memory_fit(series, tmp_path):
+    y, exog = series
+    history, future = y.iloc[:-24], exog.iloc[-24:]
+    in_memory = make_forecaster()
+    in_memory.fit(y=history, exog=exog.iloc[:-24], store_in_sample_residuals=True)
+
+    out_of_core = fit_out_of_core(
+        make_forecaster(),
+        history,
+        exog.iloc[:-24],
+        memory_mb=0.05,
+        directory=str(tmp_path),
+    )
+
+    assert list(tmp_path.iterdir()) == []
+    assert out_of_core.training_range_.equals(in_memory.training_range_)
+    assert out_of_core.regressor.n_estimators == PARAMS["n_estimators"]
+    assert len(out_of_core.in_sample_residuals_) == len(history) - 24
+    np.testing.assert_allclose(
+        out_of_core.predict(steps=24, exog=future),
+        in_memory.predict(steps=24, exog=future),
+        rtol=1e-3,
+    )
+
+
+def test_chunk_and_sample_rows_follow_the_budget():
+    assert chunk_rows(n_features=64, memory_mb=1) == 512
+    assert chunk_rows(n_features=10**9, memory_mb=1) == 1
+    assert sample_rows(n_features=64, memory_mb=64) == 65536
+    assert sample_rows(n_features=64, memory_mb=1) == 20000
+    assert sample_rows(n_features=1, memory_mb=512) == 200000
+
+
+def test_out_of_core_histories_are_tuned_on_their_latest_rows(series, monkeypatch):
+    y, exog = series
+    window_features = IncrementalRollingFeatures(stats=["mean"], window_sizes=12)
+    n_features = PROBE_LAGS + 1 + exog.shape[1]
+    assert tuning_history(y, exog, window_features)[0] is y
+
+    monkeypatch.setattr(out_of_core, "OUT_OF_CORE_THRESHOLD_MB", 0.5)
+    rows = tuning_rows(len(y), n_features, memory_mb=1.0)
+    assert rows == chunk_rows(n_features, memory_mb=1.0) < len(y)
+
+    counted = []
+    monkeypatch.setattr(
+        tuning, "tuning_rows", lambda n_rows, n: counted.append(n) or rows
+    )
+    y_tune, exog_tune = tuning_history(y, exog, window_features)
+    assert counted == [n_features]
+    assert y_tune.index.equals(y.index[-rows:])
+    assert exog_tune.index.equals(y_tune.index)
+
+
+def test_search_keeps_the_training_share_of_a_cut_history(series, monkeypatch):
+    y, exog = series
+    data = exog.assign(users=y)
+    monkeypatch.setattr(
+        forecast_model,
+        "tuning_history",
+        lambda y, exog, window_features: (y.iloc[-200:], exog.iloc[-200:]),
+    )
+    searched = {}
+
+    def search(forecaster, y, exog, cv, **kwargs):
+        searched.update(rows=len(y), initial_train_size=cv.initial_train_size)
+        raise StopIteration
+
+    monkeypatch.setattr(forecast_model, "bayesian_search_forecaster", search)
+
+    with pytest.raises(StopIteration):
+        forecast_model.run_bayesian_hyperparameter_search_and_fit(
+            data,
+            data.index[-1],
+            list(exog.columns),
+            steps=24,
+            initial_train_size=round(len(data) * 0.9),
+        )
+
+    assert searched == {"rows": 200, "initial_train_size": 180}
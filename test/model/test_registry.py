@@ -0,0 +1,59 @@
+import pytest
+
+from src.model.registry import ModelNotFoundError, ModelRegistry
+
+
+def test_save_and_get_round_trip(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.save("station-1", {"weights": [1, 2, 3]}, metadata={"mae": 4.2})
+
+    fresh = ModelRegistry(str(tmp_path))
+    assert fresh.get("station-1") == {"weights": [1, 2, 3]}
+    (info,) = fresh.info()
+    assert info["metadata"]["mae"] == 4.2
+    assert info["load_ms"] is not None
+
+
+def test_invalid_model_name_is_rejected(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    with pytest.raises(ValueError):
+        registry.save("../escape", object())
+
+
+def test_unknown_model_raises(tmp_path):
+    with pytest.raises(ModelNotFoundError):
+        ModelRegistry(str(tmp_path)).get("missing")
+
+
+def test_reload_picks_up_models_saved_elsewhere(tmp_path):
+    serving = ModelRegistry(str(tmp_path))
+    assert serving.load_all() == []
+
+    ModelRegistry(str(tmp_path)).save("new-model", [1.0])
+
+    assert serving.reload() == ["new-model"]
+    assert serving.get("new-model") == [1.0]
+
+
+def test_list_models_endpoint(client):
+    response = client.get("/models")
+    assert response.status_code == 200
+    assert "models" in response.json()
+
+
+def test_get_reloads_a_model_saved_again_elsewhere(tmp_path, monkeypatch):
+    serving = ModelRegistry(str(tmp_path))
+    training = ModelRegistry(str(tmp_path))
+    training.save("station-1", [1.0])
+    assert serving.get("station-1") == [1.0]
+
+    loads = []
+    load = serving.load
+    monkeypatch.setattr(serving, "load", lambda name: loads.append(name) or load(name))
+    assert serving.get("station-1") == [1.0]
+    assert loads == []
+
+    training.save("station-1", [2.0])
+    assert serving.get("station-1") == [2.0]
+    assert training.get("station-1") == [2.0]
+    assert loads == ["station-1"]
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from skforecast.preprocessing import RollingFeatures
+
+from src.model.rolling import IncrementalRollingFeatures, RollingWindow
+
+STATS = ["mean", "std", "min", "max", "sum"]
+
+
+def test_rolling_window_matches_numpy():
+    values = np.random.default_rng(0).normal(1000.0, 5.0, size=200)
+    window = RollingWindow(24)
+
+    for i, value in enumerate(values):
+        window.push(value)
+        current = values[max(i - 23, 0) : i + 1]
+        assert window.mean() == pytest.approx(current.mean())
+        assert window.sum() == pytest.approx(current.sum())
+        assert window.min() == current.min()
+        assert window.max() == current.max()
+        if len(current) > 1:
+            assert window.std() == pytest.approx(current.std(ddof=1))
+
+
+def test_transform_batch_matches_rolling_features():
+    y = pd.Series(
+        np.random.default_rng(1).normal(size=100),
+        index=pd.date_range("2025-01-01", periods=100, freq="h"),
+        name="users",
+    )
+    expected = RollingFeatures(stats=STATS, window_sizes=12).transform_batch(y)
+    result = IncrementalRollingFeatures(stats=STATS, window_sizes=12).transform_batch(y)
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_incremental_state_matches_transform():
+    values = np.random.default_rng(2).normal(size=60)
+    feature = IncrementalRollingFeatures(stats=STATS, window_sizes=[6, 6, 12, 12, 24])
+
+    state = feature.start(values[:24])
+    for i in range(24, 60):
+        np.testing.assert_allclose(state.features(), feature.transform(values[:i]))
+        state.push(values[i])
+
+
+def test_invalid_stat_is_rejected():
+    with pytest.raises(ValueError):
+        IncrementalRollingFeatures(stats=["median"], window_sizes=3)
@@ -0,0 +1,291 @@
+import time
+
+import optuna
+import pytest
+from lightgbm import LGBMRegressor
+
+from benchmarks.synthetic import make_hourly_frame
+from src.data.data_loader import create_encoder
+from src.model import forecast_model, tuning
+from src.model.rolling import IncrementalRollingFeatures
+from src.model.tuning import (
+    DEFAULT_LAGS,
+    MAX_ESTIMATORS,
+    MAX_TUNING_TRIALS,
+    MIN_ESTIMATORS,
+    PROBE_LAGS,
+    fidelity_rungs,
+    plan_tuning,
+    run_multi_fidelity_search,
+)
+
+
+def test_cheap_trials_keep_the_full_search():
+    plan = plan_tuning(n_rows=2000, steps=24, budget_s=600, fit_s=0.01, predict_s=0.001)
+
+    assert plan["n_estimators"] == (300, MAX_ESTIMATORS)
+    assert plan["n_trials"] == MAX_TUNING_TRIALS
+    assert plan["n_folds"] == 8
+    assert plan["initial_train_size"] == 2000 - 8 * 24
+
+
+def test_expensive_trials_shrink_folds_and_rounds():
+    plan = plan_tuning(n_rows=50000, steps=24, budget_s=60, fit_s=2.0, predict_s=0.5)
+    low, high = plan["n_estimators"]
+
+    assert plan["n_folds"] == 1
+    assert MIN_ESTIMATORS <= low <= high < MAX_ESTIMATORS
+    assert plan["n_trials"] >= 1
+    assert plan["trial_seconds"] * plan["n_trials"] <= 60
+
+
+def test_folds_leave_enough_training_rows():
+    plan = plan_tuning(
+        n_rows=400,
+        steps=24,
+        budget_s=600,
+        fit_s=0.01,
+        predict_s=0.001,
+        min_train_rows=350,
+    )
+
+    assert plan["n_folds"] == 2
+    assert plan["initial_train_size"] >= 350
+
+
+def test_probe_uses_the_largest_lag_of_the_grid(monkeypatch):
+    probes = []
+
+    def plan(*args, **kwargs):
+        probes.append(kwargs)
+        raise StopIteration
+
+    monkeypatch.setattr(forecast_model, "plan_tuning_for_deadline", plan)
+    data = make_hourly_frame(24 * 30)
+
+    with pytest.raises(StopIteration):
+        forecast_model.run_bayesian_hyperparameter_search_and_fit(
+            data, data.index[-25], [], steps=24, time_budget_s=30
+        )
+
+    assert probes[0]["lags"] == PROBE_LAGS == 169
+    assert probes[0]["min_train_rows"] == 2 * PROBE_LAGS
+
+
+def test_budget_smaller_than_the_probe_still_runs_a_trial(monkeypatch):
+    count_boosting_work(monkeypatch)
+
+    def slow_probe(*args, **kwargs):
+        time.sleep(0.1)
+        return {"fit_s": 1.0, "predict_s": 0.1, "estimators": 100}
+
+    monkeypatch.setattr(tuning, "measure_trial_cost", slow_probe)
+    data = make_hourly_frame(3000)
+
+    result = forecast_model.run_bayesian_hyperparameter_search_and_fit(
+        data,
+        data.index[-25],
+        [col for col in data.columns if col != "users"],
+        transformer_exog=create_encoder(),
+        steps=24,
+        time_budget_s=0.05,
+    )
+
+    assert result["n_trials"] == 1
+    assert result["best_score"] >= 0
+
+
+def test_search_without_completed_trials_falls_back_to_defaults(monkeypatch):
+    count_boosting_work(monkeypatch)
+
+    def no_trials(**kwargs):
+        raise ValueError("No trials are completed yet.")
+
+    monkeypatch.setattr(forecast_model, "bayesian_search_forecaster", no_trials)
+    data = make_hourly_frame(24 * 30)
+
+    result = forecast_model.run_bayesian_hyperparameter_search_and_fit(
+        data,
+        data.index[-25],
+        [col for col in data.columns if col != "users"],
+        transformer_exog=create_encoder(),
+        steps=24,
+        initial_train_size=24 * 25,
+    )
+
+    assert result["best_lags"] == DEFAULT_LAGS
+    assert result["n_trials"] == 0
+    assert result["best_score"] >= 0
+
+
+def test_fidelity_rungs_end_with_the_full_history():
+    rungs = fidelity_rungs(
+        n_rows=20000, validation_rows=240, min_train_rows=672, reduction_factor=3
+    )
+
+    assert rungs == [971, 2435, 6826, 20000]
+    assert fidelity_rungs(1000, 240, 672) == [1000]
+
+
+def test_multi_fidelity_search_returns_best_trial(monkeypatch):
+    monkeypatch.setattr(tuning, "MULTI_FIDELITY_MIN_TRAIN_ROWS", 200)
+    data = make_hourly_frame(24 * 60)
+    data.index.freq = "h"
+    exog_features = [col for col in data.columns if col != "users"]
+
+    result = run_multi_fidelity_search(
+        data=data,
+        end_validation=data.index[-25],
+        exog_features=exog_features,
+        window_features=IncrementalRollingFeatures(stats=["mean"], window_sizes=24),
+        transformer_exog=create_encoder(),
+        steps=24,
+        n_trials=2,
+        random_state=1,
+    )
+
+    assert "lags" not in result["best_params"]
+    assert result["best_lags"] in tuning.LAGS_GRID
+    assert result["best_score"] >= 0
+
+
+def count_boosting_work(monkeypatch):
+    """
+    Records rows x boosting rounds of every LightGBM fit, and fits 5 rounds
+    instead so that a search runs fast.
+    """
+    work = []
+    fit = LGBMRegressor.fit
+
+    def counting_fit(self, X, y, **kwargs):
+        n_estimators = self.n_estimators
+        work.append(len(X) * n_estimators)
+        self.set_params(n_estimators=5)
+        try:
+            return fit(self, X, y, **kwargs)
+        finally:
+            self.set_params(n_estimators=n_estimators)
+
+    monkeypatch.setattr(LGBMRegressor, "fit", counting_fit)
+    return work
+
+
+def test_multi_fidelity_costs_less_than_bayesian_on_a_long_history(monkeypatch):
+    monkeypatch.setattr(tuning, "MULTI_FIDELITY_MIN_TRAIN_ROWS", 200)
+    monkeypatch.setattr(tuning, "MAX_TUNING_FOLDS", 3)
+    work = count_boosting_work(monkeypatch)
+    data = make_hourly_frame(24 * 150)
+    data.index.freq = "h"
+    end_validation = data.index[-25]
+    n_rows = len(data.loc[:end_validation])
+    n_folds = tuning.default_fold_count(n_rows, 24, 2 * PROBE_LAGS)
+    exog_features = [col for col in data.columns if col != "users"]
+    kwargs = dict(
+        data=data,
+        end_validation=end_validation,
+        exog_features=exog_features,
+        window_features=IncrementalRollingFeatures(stats=["mean"], window_sizes=24),
+        transformer_exog=create_encoder(),
+        steps=24,
+        n_trials=10,
+        random_state=1,
+    )
+
+    forecast_model.run_bayesian_hyperparameter_search_and_fit(
+        **kwargs, initial_train_size=n_rows - n_folds * 24
+    )
+    bayesian, work[:] = sum(work), []
+    run_multi_fidelity_search(**kwargs)
+    multi_fidelity = sum(work)
+
+    assert multi_fidelity < bayesian
+
+
+def test_multi_fidelity_is_planned_for_the_deadline(monkeypatch):
+    monkeypatch.setattr(tuning, "MULTI_FIDELITY_MIN_TRAIN_ROWS", 200)
+    count_boosting_work(monkeypatch)
+    probes = []
+
+    def plan(y, exog, **kwargs):
+        probes.append(kwargs)
+        return {
+            "n_trials": 3,
+            "n_folds": 2,
+            "n_estimators": (100, 200),
+            "timeout": 60.0,
+        }
+
+    monkeypatch.setattr(tuning, "plan_tuning_for_deadline", plan)
+    data = make_hourly_frame(24 * 60)
+    data.index.freq = "h"
+
+    result = run_multi_fidelity_search(
+        data=data,
+        end_validation=data.index[-25],
+        exog_features=[col for col in data.columns if col != "users"],
+        transformer_exog=create_encoder(),
+        steps=24,
+        random_state=1,
+        time_budget_s=60,
+    )
+
+    assert probes[0]["lags"] == PROBE_LAGS
+    assert result["n_trials"] == 3
+    assert 100 <= result["best_params"]["n_estimators"] <= 200
+
+
+def test_multi_fidelity_reports_rungs_where_the_pruner_decides(monkeypatch):
+    monkeypatch.setattr(tuning, "MULTI_FIDELITY_MIN_TRAIN_ROWS", 200)
+    monkeypatch.setattr(tuning, "MAX_TUNING_FOLDS", 3)
+    count_boosting_work(monkeypatch)
+    steps = []
+    report = optuna.trial.Trial.report
+
+    def recording_report(self, value, step):
+        steps.append(step)
+        return report(self, value, step)
+
+    monkeypatch.setattr(optuna.trial.Trial, "report", recording_report)
+    data = make_hourly_frame(24 * 150)
+    data.index.freq = "h"
+
+    run_multi_fidelity_search(
+        data=data,
+        end_validation=data.index[-25],
+        exog_features=[col for col in data.columns if col != "users"],
+        transformer_exog=create_encoder(),
+        steps=24,
+        n_trials=6,
+        random_state=1,
+    )
+
+    # Three rungs: the full history is the last one and is never reported
+    assert set(steps) == {1, 3}
+
+
+def test_multi_fidelity_past_the_deadline_scores_the_defaults(monkeypatch):
+    monkeypatch.setattr(tuning, "MULTI_FIDELITY_MIN_TRAIN_ROWS", 200)
+    work = count_boosting_work(monkeypatch)
+
+    def plan(y, exog, **kwargs):
+        return {"n_trials": 3, "n_folds": 2, "n_estimators": (100, 200), "timeout": 0}
+
+    monkeypatch.setattr(tuning, "plan_tuning_for_deadline", plan)
+    data = make_hourly_frame(24 * 150)
+    data.index.freq = "h"
+
+    result = run_multi_fidelity_search(
+        data=data,
+        end_validation=data.index[-25],
+        exog_features=[col for col in data.columns if col != "users"],
+        transformer_exog=create_encoder(),
+        steps=24,
+        random_state=1,
+        time_budget_s=60,
+    )
+
+    assert result["best_lags"] == DEFAULT_LAGS
+    assert result["n_trials"] == 0
+    assert result["best_score"] >= 0
+    # One fit on the shortest slice only
+    assert len(work) == 1 and work[0] < 100 * 24 * 50
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+from fastapi import FastAPI
+
+from src.api.disconnect import CancelQueriesOnDisconnect
+from src.data.connections import active_queries
+
+HTTP_SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/slow",
+    "raw_path": b"/slow",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [],
+    "client": ("testclient", 50000),
+    "server": ("testserver", 80),
+}
+
+
+def make_app(cancelled: threading.Event):
+    app = FastAPI()
+
+    @app.get("/slow")
+    def slow():
+        # Stands in for a running query: returns once it is cancelled
+        active_queries.get().add(cancelled.set)
+        cancelled.wait(timeout=5)
+        return {"cancelled": cancelled.is_set()}
+
+    app.add_middleware(CancelQueriesOnDisconnect)
+    return app
+
+
+def call(app, disconnect_after_s):
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(disconnect_after_s)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(dict(HTTP_SCOPE), receive, send))
+    return sent
+
+
+def test_client_disconnect_cancels_the_running_query():
+    cancelled = threading.Event()
+
+    sent = call(make_app(cancelled), disconnect_after_s=0.1)
+
+    assert cancelled.is_set()
+    assert sent[-1]["body"] == b'{"cancelled":true}'
+
+
+def test_completed_requests_are_not_cancelled():
+    cancelled = threading.Event()
+    app = FastAPI()
+
+    @app.get("/slow")
+    def fast():
+        active_queries.get().add(cancelled.set)
+        return {}
+
+    app.add_middleware(CancelQueriesOnDisconnect)
+    call(app, disconnect_after_s=10)
+
+    assert not cancelled.is_set()
@@ -1,4 +1,20 @@
+from unittest.mock import MagicMock
+
 import pandas as pd
+import pytest
+from loguru import logger
+
+
+@pytest.fixture
+def caught_errors():
+    """Messages logged by logger.catch while the test runs."""
+    messages = []
+    sink = logger.add(
+        lambda message: messages.append(str(message)),
+        filter=lambda record: "An error has been caught" in record["message"],
+    )
+    yield messages
+    logger.remove(sink)
 
 
 def test_read_root(client):
@@ -153,6 +169,12 @@ def test_predict_tuning_db_success(
         window_sizes=window_sizes,
         start_time=start_time,
         stop_time=stop_time,
+        save_as=None,
+        quantiles=None,
+        n_boot=None,
+        model_type="recursive",
+        time_budget_s=None,
+        tuning_mode="bayesian",
     )
     api_mock_logger.info.assert_any_call(
         "Prediction request received (DB-based).",
@@ -273,3 +295,121 @@ def test_predict_tuning_db_backend_error(
     mock_span.set_attribute.assert_any_call(
         "error.message", "Simulated DB forecast error"
     )
+
+
+def test_predict_model_unknown_model_returns_404(client, api_mock_tracer):
+    response = client.post(
+        "/predict-model",
+        params={
+            "model_name": "does-not-exist",
+            "forecast_hours": 24,
+            "start_time": "2024-01-01 00:00:00+00",
+            "stop_time": "2024-01-07 23:00:00+00",
+        },
+    )
+    assert response.status_code == 404
+
+
+def test_predict_model_errors_keep_their_status_through_the_catch(
+    client, api_mock_tracer, caught_errors
+):
+    response = client.post(
+        "/predict-model",
+        params={
+            "model_name": "../escape",
+            "forecast_hours": 24,
+            "start_time": "2024-01-01 00:00:00+00",
+            "stop_time": "2024-01-07 23:00:00+00",
+        },
+    )
+    assert response.status_code == 400
+    assert caught_errors
+
+
+def test_data_summary_returns_404_when_not_configured(
+    client, api_mock_tracer, monkeypatch
+):
+    monkeypatch.setattr("src.data.summary.DB_SUMMARY_TABLE", "")
+    response = client.get("/data-summary")
+    assert response.status_code == 404
+    assert "DB_SUMMARY_TABLE" in response.json()["detail"]
+
+
+def test_bad_data_is_rejected_with_422_before_tuning(
+    client, api_mock_tracer, monkeypatch
+):
+    index = pd.date_range("2024-01-01", periods=48, freq="2h", tz="UTC")
+    data = pd.DataFrame({"users": 5.0, "holiday": 0.0}, index=index)
+    monkeypatch.setattr(
+        "src.model.forecast_model.load_data_from_db", lambda *args: data
+    )
+    tuning = MagicMock()
+    monkeypatch.setattr(
+        "src.model.forecast_model.run_bayesian_hyperparameter_search_and_fit", tuning
+    )
+
+    response = client.post(
+        "/predict-tuning-db",
+        params={
+            "forecast_hours": 24,
+            "window_sizes": 7,
+            "start_time": "2024-01-01 00:00:00+00",
+            "stop_time": "2024-01-04 23:00:00+00",
+        },
+    )
+
+    assert response.status_code == 422
+    checks = [failure["check"] for failure in response.json()["detail"]["failures"]]
+    assert checks == ["gaps", "constant"]
+    tuning.assert_not_called()
+
+
+def test_invalid_quantiles_are_rejected(
+    client, mock_forecast_with_tuning_db_success, caught_errors
+):
+    response = client.post(
+        "/predict-tuning-db",
+        params={
+            "forecast_hours": 24,
+            "window_sizes": 7,
+            "start_time": "2024-01-01 00:00:00+00",
+            "stop_time": "2024-01-07 23:00:00+00",
+            "quantiles": "0.1,1.5",
+        },
+    )
+    assert response.status_code == 400
+    assert caught_errors
+    mock_forecast_with_tuning_db_success.assert_not_called()
+
+
+def test_backtest_rejects_invalid_lags(client):
+    response = client.post(
+        "/backtest",
+        params={
+            "forecast_hours": 24,
+            "start_time": "2024-01-01 00:00:00+00",
+            "stop_time": "2024-01-07 23:00:00+00",
+            "lags": "1,x",
+        },
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "params, status",
+    [({"lags": "1,x"}, 400), ({"model_name": "does-not-exist"}, 404)],
+)
+def test_backtest_errors_keep_their_status_through_the_catch(
+    client, api_mock_tracer, caught_errors, params, status
+):
+    response = client.post(
+        "/backtest",
+        params={
+            "forecast_hours": 24,
+            "start_time": "2024-01-01 00:00:00+00",
+            "stop_time": "2024-01-07 23:00:00+00",
+            **params,
+        },
+    )
+    assert response.status_code == status
+    assert caught_errors
@@ -0,0 +1,65 @@
+from loguru import logger
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import Decision
+
+from src.api.observability import (
+    CountingSpanProcessor,
+    EndpointSampler,
+    LogSampler,
+    get_observability_counters,
+    parse_sampling_rates,
+)
+
+TRACE_ID = 0x5CE0E9A56015FEC5AADFA328AE398115
+
+
+def test_parse_sampling_rates_clamps_values():
+    rates = parse_sampling_rates("get-data-range-request=0.1, predict-tuning-request=2")
+    assert rates == {"get-data-range-request": 0.1, "predict-tuning-request": 1.0}
+
+
+def test_endpoint_sampler_uses_rate_per_span_name():
+    sampler = EndpointSampler({"get-data-range-request": 0.0}, default_rate=1.0)
+
+    dropped = sampler.should_sample(None, TRACE_ID, "get-data-range-request")
+    kept = sampler.should_sample(None, TRACE_ID, "predict-tuning-db-request")
+
+    assert dropped.decision == Decision.DROP
+    assert kept.decision == Decision.RECORD_AND_SAMPLE
+
+
+def test_counting_span_processor_drops_when_queue_is_full():
+    exporter = InMemorySpanExporter()
+    processor = CountingSpanProcessor(
+        exporter, max_queue_size=1, schedule_delay_millis=60_000
+    )
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    tracer = provider.get_tracer("test")
+    dropped_before = get_observability_counters()["spans_dropped"]
+
+    for name in ("first", "second", "third"):
+        tracer.start_span(name).end()
+    processor.force_flush()
+
+    assert get_observability_counters()["spans_dropped"] - dropped_before == 2
+    assert [span.name for span in exporter.get_finished_spans()] == ["first"]
+    processor.shutdown()
+
+
+def test_log_sampler_keeps_warnings_and_counts_dropped_info():
+    sampler = LogSampler(rate=0.0, max_level="INFO")
+    dropped_before = get_observability_counters()["logs_sampled_out"]
+
+    assert not sampler({"level": logger.level("INFO")})
+    assert sampler({"level": logger.level("WARNING")})
+    assert get_observability_counters()["logs_sampled_out"] - dropped_before == 1
+
+
+def test_observability_metrics_endpoint(client):
+    response = client.get("/metrics/observability")
+    assert response.status_code == 200
+    assert {"spans_dropped", "logs_sampled_out"} <= set(response.json())
@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from src.api import profiling
+from src.api.profiling import get_profile_path, profile_call, should_profile
+
+
+def _busy_work(duration_s=0.1):
+    deadline = time.perf_counter() + duration_s
+    values = []
+    while time.perf_counter() < deadline:
+        values.append(sum(range(1000)))
+    return values
+
+
+def test_should_profile_with_header():
+    assert should_profile("1")
+    assert should_profile("true")
+    assert not should_profile("0")
+
+
+def test_should_profile_respects_sample_rate():
+    with patch.object(profiling, "PROFILE_SAMPLE_RATE", 0.0):
+        assert not should_profile(None)
+    with patch.object(profiling, "PROFILE_SAMPLE_RATE", 1.0):
+        assert should_profile(None)
+
+
+def test_profile_call_disabled_yields_none():
+    with profile_call("noop", enabled=False) as profile:
+        _busy_work(0.01)
+    assert profile is None
+
+
+def test_profile_call_writes_downloadable_artifact(tmp_path):
+    with patch.object(profiling, "PROFILE_DIR", str(tmp_path)), patch.object(
+        profiling, "PROFILE_INTERVAL_MS", 1.0
+    ):
+        with profile_call("busy", enabled=True) as profile:
+            _busy_work()
+
+        path = get_profile_path(profile["profile_id"])
+        assert path is not None
+        assert get_profile_path(profile["profile_id"], "collapsed") is not None
+
+    with open(path) as f:
+        report = json.load(f)
+    assert report["name"] == "busy"
+    assert report["samples"] > 0
+    assert any("_busy_work" in row["function"] for row in report["top_functions"])
+    assert report["peak_traced_bytes"] > 0
+
+
+def test_overlapping_profiles_share_tracemalloc(tmp_path):
+    first_started, second_started = threading.Event(), threading.Event()
+    errors = []
+
+    def first():
+        with profile_call("first", enabled=True):
+            first_started.set()
+            second_started.wait(timeout=5)
+
+    def second():
+        first_started.wait(timeout=5)
+        try:
+            with profile_call("second", enabled=True):
+                second_started.set()
+                # The first call finishes while this one is still tracing
+                first_thread.join(timeout=5)
+        except RuntimeError as e:
+            errors.append(e)
+
+    with patch.object(profiling, "PROFILE_DIR", str(tmp_path)):
+        first_thread = threading.Thread(target=first)
+        second_thread = threading.Thread(target=second)
+        first_thread.start()
+        second_thread.start()
+        second_thread.join(timeout=10)
+
+    assert errors == []
+    assert not tracemalloc.is_tracing()
+
+
+def test_old_profiles_are_pruned(tmp_path):
+    with patch.object(profiling, "PROFILE_DIR", str(tmp_path)), patch.object(
+        profiling, "PROFILE_MAX_FILES", 2
+    ):
+        profile_ids = []
+        for _ in range(3):
+            with profile_call("noop", enabled=True) as profile:
+                pass
+            profile_ids.append(profile["profile_id"])
+            time.sleep(0.01)
+
+        assert get_profile_path(profile_ids[0]) is None
+        assert get_profile_path(profile_ids[0], "collapsed") is None
+        assert all(get_profile_path(profile_id) for profile_id in profile_ids[1:])
+
+
+def test_get_profile_path_rejects_invalid_ids():
+    assert get_profile_path("../etc/passwd") is None
+
+
+def test_get_profile_unknown_id_returns_404(client):
+    response = client.get(f"/profiles/{'0' * 32}")
+    assert response.status_code == 404
@@ -0,0 +1,78 @@
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.api.startup import ModelStackLoader
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+# Cold import budget for src.api.main, in seconds. The median of a few runs
+# is checked so that one run slowed down by a busy machine does not fail
+STARTUP_BUDGET_S = 5.0
+STARTUP_RUNS = 3
+HEAVY_MODULES = ("lightgbm", "optuna", "skforecast", "sklearn")
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import src.api.main
+print(time.perf_counter() - start)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def import_main():
+    """
+    Seconds to import src.api.main in a new interpreter, and the ML modules
+    it loaded.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(heavy=HEAVY_MODULES)],
+        cwd=ROOT_DIR,
+        env=dict(os.environ, ENV="test"),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, loaded_heavy = result.stdout.splitlines()[-2:]
+    return float(elapsed), loaded_heavy
+
+
+def test_import_main_within_startup_budget_without_ml_stack():
+    runs = [import_main() for _ in range(STARTUP_RUNS)]
+
+    assert statistics.median(elapsed for elapsed, _ in runs) < STARTUP_BUDGET_S
+    assert all(loaded_heavy == "" for _, loaded_heavy in runs)
+
+
+def test_model_stack_loader_loads_once():
+    loader = ModelStackLoader("json")
+    assert loader.state == "cold"
+
+    module = loader.load()
+
+    assert loader.is_ready
+    assert loader.load() is module
+    assert loader.load_seconds is not None
+
+
+def test_model_stack_loader_records_failure():
+    loader = ModelStackLoader("src.does_not_exist")
+    with pytest.raises(ImportError):
+        loader.load()
+    assert loader.state == "failed"
+
+
+def test_liveness(client):
+    response = client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+def test_readiness_reports_model_stack_state(client):
+    response = client.get("/readyz")
+    assert response.status_code in (200, 503)
+    assert response.json()["status"] in ("cold", "warming", "ready")